@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+__title__ = 'Check Dimensions'
+__author__ = 'Goran Jovic'
+__doc__ = 'Checks the dimensions of doors, windows, generic models and ceilings in the active view against the modules in rules.json and writes CHECK_STATUS (curtain panels: Check Panel Dimensions). Shift+click picks another rules file'
+
+from gjtools import telemetry
+
+with telemetry.bundle(__file__):
+    import os
+
+    from pyrevit import forms, script, EXEC_PARAMS
+
+    from gjtools import dimension_rules, profiling, tool_log
+
+doc = __revit__.ActiveUIDocument.Document
+config = script.get_config()
+DEFAULT_RULES = os.path.join(os.path.dirname(__file__), "rules.json")
+
+with profiling.tool(__file__), tool_log.session(__file__):
+    rules_path = config.get_option("rules_file", "") or DEFAULT_RULES
+
+    # Shift-click to use a rules file of the project instead of the one next to the button
+    if EXEC_PARAMS.config_mode:
+        with profiling.phase("dialog"):
+            picked = forms.pick_file(file_ext="json", init_dir=os.path.dirname(rules_path),
+                                     title="Select Dimension Rules")
+        if not picked:
+            script.exit()
+        rules_path = picked
+        config.rules_file = rules_path
+        script.save_config()
+
+    try:
+        rule_set = dimension_rules.load_rules(rules_path)
+    except (IOError, ValueError) as e:
+        forms.alert("Could not read the dimension rules: {}".format(e), exitscript=True)
+
+    results = dimension_rules.check_dimensions(doc, rule_set, __revit__.ActiveUIDocument.ActiveView)
+
+    with profiling.phase("output"):
+        script.get_output().print_table(
+            table_data=[result.row() for result in results],
+            title="Dimension check ({})".format(os.path.basename(rules_path)),
+            columns=dimension_rules.SUMMARY_COLUMNS,
+        )
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+__title__ = 'Panel Sizes'
+__author__ = 'Goran Jovic'
+__doc__ = 'Groups the curtain panels of the model into size classes for fabrication, with CSV export. Shift+click sets the tolerance and the size code parameter'
+
+from gjtools import telemetry
+
+with telemetry.bundle(__file__):
+    from pyrevit import DB, forms, script, EXEC_PARAMS
+
+    from gjtools import panel_sizes, profiling
+    from gjtools.revit_transactions import transaction
+
+doc = __revit__.ActiveUIDocument.Document
+config = script.get_config()
+TOP_CLASSES = 50
+
+with profiling.tool(__file__):
+    tolerance = config.get_option("tolerance", panel_sizes.DEFAULT_TOLERANCE)
+    code_parameter = config.get_option("code_parameter", "")
+
+    # Shift-click to set the size tolerance and the parameter that receives the size codes
+    if EXEC_PARAMS.config_mode:
+        with profiling.phase("dialog"):
+            value = forms.ask_for_string(default=str(tolerance), prompt="Size tolerance in mm:", title="Panel Sizes")
+            if not value:
+                script.exit()
+            try:
+                tolerance = float(value)
+            except ValueError:
+                forms.alert("'{}' is not a number.".format(value), exitscript=True)
+            if tolerance <= 0:
+                forms.alert("The tolerance must be positive.", exitscript=True)
+            code_parameter = forms.ask_for_string(
+                default=code_parameter, title="Panel Sizes",
+                prompt="Text parameter for the size code (empty = do not write codes):") or ""
+        config.tolerance = tolerance
+        config.code_parameter = code_parameter
+        script.save_config()
+
+    snapshot = panel_sizes.panel_snapshot(doc, code_parameter or None)
+    panels = panel_sizes.read_panels(snapshot)
+    if not panels:
+        forms.alert("No curtain panels with a Height and Width found.", exitscript=True)
+
+    classes = panel_sizes.group_panels(panels, tolerance)
+    singles = panel_sizes.outliers(classes)
+
+    with profiling.phase("dialog"):
+        output = script.get_output()
+        print("{} panels in {} size classes (tolerance {:g} mm), {} one-off sizes.".format(
+            len(panels), len(classes), tolerance, len(singles)))
+        largest = sorted(classes, key=lambda c: -c.count)[:TOP_CLASSES]
+        output.print_table(
+            table_data=[[c.code, "{:g}".format(c.height), "{:g}".format(c.width), c.count,
+                         "{:.1f}".format(100.0 * c.count / len(panels))] for c in largest],
+            title="Largest size classes" if len(classes) > TOP_CLASSES else "Size classes",
+            columns=["Code", "Height", "Width", "Panels", "%"],
+        )
+        for dimension in ("height", "width"):
+            output.print_table(
+                table_data=panel_sizes.histogram(classes, dimension),
+                title="Panels per {}".format(dimension),
+                columns=[dimension.capitalize(), "Panels"],
+            )
+        if singles:
+            output.print_table(
+                table_data=[[c.code, "{:g}".format(c.height), "{:g}".format(c.width),
+                             output.linkify([DB.ElementId(i) for i in c.element_ids])] for c in singles[:TOP_CLASSES]],
+                title="One-off sizes",
+                columns=["Code", "Height", "Width", "Panels"],
+            )
+
+        csv_path = forms.save_file(file_ext="csv", default_name="Panel Sizes.csv")
+    if csv_path:
+        with profiling.phase("write"):
+            panel_sizes.write_csv(csv_path, classes, total=len(panels))
+        print("Size classes written to {}".format(csv_path))
+
+    if code_parameter and forms.alert("Write the size codes to '{}' of the panels?".format(code_parameter),
+                                      yes=True, no=True):
+        changes, checkout, missing = panel_sizes.code_changes(doc, snapshot, classes, code_parameter)
+        written = []
+        read_only = 0
+        if changes:
+            with transaction(doc, "Write Panel Size Codes"):
+                written, read_only = panel_sizes.write_codes(doc, changes, code_parameter)
+            panel_sizes.remember_codes(snapshot, written, code_parameter)
+        print("Size codes written to {} panels.".format(len(written)))
+        if missing or read_only:
+            print("{} panels have no writable '{}'.".format(missing + read_only, code_parameter))
+        if checkout.blocked:
+            print("{} panels are owned by other users and were left unchanged ({}).".format(
+                len(checkout.blocked), checkout.summary()))
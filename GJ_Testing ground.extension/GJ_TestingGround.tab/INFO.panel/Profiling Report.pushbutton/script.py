@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+__title__ = 'Profiling Report'
+__author__ = 'Goran Jovic'
+__doc__ = 'Shows where the buttons spend their time, per tool and phase. Shift+click turns profiling on or off and sets the message level, log file and background I/O'
+
+from pyrevit import forms, script, EXEC_PARAMS
+
+from gjtools import background, profiling, tool_log
+
+path = profiling.default_path()
+
+# Shift-click to switch profiling on or off, and to set the tool messages and background I/O
+if EXEC_PARAMS.config_mode:
+    profiling_labels = {"Profiling on": True, "Profiling off": False}
+    level_labels = {"Messages: debug": tool_log.DEBUG, "Messages: info": tool_log.INFO,
+                    "Messages: warnings only": tool_log.WARNING}
+    file_labels = {"Log file on": True, "Log file off": False}
+    one_tool = "Messages of one tool..."
+    background_labels = {"Background I/O on": True, "Background I/O off": False}
+    io_workers = "I/O workers..."
+    choice = forms.CommandSwitchWindow.show(
+        sorted(profiling_labels) + sorted(level_labels) + [one_tool] + sorted(file_labels)
+        + sorted(background_labels) + [io_workers],
+        message="Profiling is {}, log file is {}, background I/O is {} ({} workers):".format(
+            "on" if profiling.is_enabled() else "off", "on" if tool_log.file_enabled() else "off",
+            "on" if background.is_enabled() else "off", background.io_workers()))
+    if not choice:
+        script.exit()
+    if choice in background_labels:
+        background.set_enabled(background_labels[choice])
+        forms.alert("{} for Plugin Checker and version-INFO.".format(choice), exitscript=True)
+    if choice == io_workers:
+        workers = forms.ask_for_string(default=str(background.io_workers()),
+                                       prompt="Threads reading files and shares at once:", title=io_workers)
+        if not workers:
+            script.exit()
+        try:
+            background.set_io_workers(int(workers))
+        except ValueError:
+            forms.alert("Not a number: {}".format(workers), exitscript=True)
+        forms.alert("I/O workers: {}".format(background.io_workers()), exitscript=True)
+    if choice in profiling_labels:
+        profiling.set_enabled(profiling_labels[choice])
+        forms.alert("{}. Run the tools, then open this report again.".format(choice), exitscript=True)
+    if choice in file_labels:
+        tool_log.set_file_enabled(file_labels[choice])
+        forms.alert("{}: {}".format(choice, tool_log.default_path()), exitscript=True)
+    if choice in level_labels:
+        tool_log.set_level(level_labels[choice])
+        forms.alert("{} for all tools.".format(choice), exitscript=True)
+    # Tools are known from their profiles
+    tools = sorted(row[0] for row in profiling.summarize(profiling.read_records(path))[1])
+    if not tools:
+        forms.alert("No tools profiled yet. Turn profiling on and run the tool first.", exitscript=True)
+    tool = forms.CommandSwitchWindow.show(tools, message="Tool:")
+    level = tool and forms.CommandSwitchWindow.show(sorted(level_labels), message="{}:".format(tool))
+    if not level:
+        script.exit()
+    tool_log.set_level(level_labels[level], tool)
+    forms.alert("{} for {}.".format(level, tool), exitscript=True)
+
+phase_rows, tool_rows = profiling.summarize(profiling.read_records(path))
+if not tool_rows:
+    forms.alert("No profiles recorded yet. Shift+click this button to turn profiling on.\n{}".format(path),
+                exitscript=True)
+
+
+def ms(value):
+    return "{:.1f}".format(value) if value is not None else "-"
+
+
+output = script.get_output()
+output.print_table(
+    table_data=[[name, runs, errors, ms(p50), ms(p90), elements if elements is not None else "-"]
+                for name, runs, errors, p50, p90, elements in tool_rows],
+    title="Tools (ms)",
+    columns=["Tool", "Runs", "Errors", "Median", "P90", "Elements (median)"],
+)
+output.print_table(
+    table_data=[[name, phase, runs, ms(p50), ms(p90), ms(slowest)]
+                for name, phase, runs, p50, p90, slowest in phase_rows],
+    title="Phases (ms)",
+    columns=["Tool", "Phase", "Runs", "Median", "P90", "Max"],
+)
+print("Profiling is {}. Profile file: {}".format("on" if profiling.is_enabled() else "off", path))
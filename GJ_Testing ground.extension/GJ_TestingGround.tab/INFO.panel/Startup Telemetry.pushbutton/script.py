@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+__title__ = 'Startup Telemetry'
+__author__ = 'Goran Jovic'
+__doc__ = 'Shows how long the extension startup hooks and buttons take to load'
+
+from pyrevit import forms, script
+
+from gjtools import profiling, telemetry
+
+with profiling.tool(__file__):
+    path = telemetry.default_path()
+    with profiling.phase("collect"):
+        rows = telemetry.summarize(telemetry.read_records([path + ".1", path]))
+    if not rows:
+        forms.alert("No telemetry recorded yet.\n{}".format(path), exitscript=True)
+
+    output = script.get_output()
+    output.print_table(
+        table_data=[[kind, name, count, "{:.1f}".format(last), "{:.1f}".format(p50), "{:.1f}".format(p90),
+                     "{:.1f}".format(slowest)]
+                    for kind, name, count, last, p50, p90, slowest in rows],
+        title="Extension load times (ms)",
+        columns=["Kind", "Name", "Runs", "Last", "Median", "P90", "Max"],
+    )
+    print("Telemetry file: {}".format(path))
@@ -1,106 +1,125 @@
-import os
-import clr
-clr.AddReference("Microsoft.Office.Interop.Excel")
-from Microsoft.Office.Interop import Excel
-from pyrevit import forms
-
-# Allow user to select the Excel file
-excel_file = forms.pick_file(file_ext="xlsx", title="Select Excel File")
-if not excel_file:
-    forms.alert("No Excel file selected. Exiting...", exitscript=True)
-
-# Allow user to select the folder with TXT files
-txt_folder = forms.pick_folder(title="Select Folder Containing TXT Files")
-if not txt_folder:
-    forms.alert("No folder selected. Exiting...", exitscript=True)
+from gjtools import telemetry
+
+# The I/O runs on after the script returns; pyRevit must keep the engine for its finish step
+__persistentengine__ = True
+
+with telemetry.bundle(__file__):
+    from pyrevit import forms, script, EXEC_PARAMS
+
+    from gjtools import (background, fleet_audit, plugin_history, plugin_reports, plugin_status, profiling,
+                         status_backends)
+
+config = script.get_config()
 
 worksheet_name = "STATUS"
+WRITE_STAGE = "Updating the STATUS sheets"
 
-# Color codes for formatting
-GREEN = 5296274   # RGB(85, 255, 85)
-RED = 255         # RGB(255, 0, 0)
-GRAY = 12632256   # RGB(192, 192, 192)
-
-# Read plugin statuses from TXT files
-plugin_status = {}
-for file in os.listdir(txt_folder):
-    if file.endswith("Revit Plugins 2024.txt"):
-        pc_name = file.split(" - ")[0]  # Extract PC name
-        plugin_status[pc_name] = {}
-        with open(os.path.join(txt_folder, file), "r") as f:
-            lines = f.readlines()
-        for line in lines[1:]:
-            parts = line.strip().split(",")
-            if len(parts) == 3:
-                plugin_name = parts[1]
-                status = parts[2]
-                plugin_status[pc_name][plugin_name] = status
-
-print("Plugin statuses from TXT files: {}".format(plugin_status))  # Debugging
-
-# Open Excel and update
-try:
-    excel_app = Excel.ApplicationClass()
-    excel_app.Visible = False
-    workbook = excel_app.Workbooks.Open(excel_file, ReadOnly=False)
-    sheet = workbook.Worksheets(worksheet_name)
-
-    # Get plugin names from row 11
-    plugin_columns = {}
-    for col in range(7, 14):  # Columns G to M
-        plugin_name = sheet.Cells(11, col).Value2
-        print("Plugin in column {}: {}".format(col, plugin_name))  # Debugging
-        if plugin_name:
-            plugin_columns[plugin_name] = col
-
-    print("Plugin columns mapping: {}".format(plugin_columns))  # Debugging
-
-    # Update statuses for each PC in column F
-    row = 12  # Starting row for PC names
-    empty_count = 0  # Counter for consecutive empty rows
-
-    while True:
-        pc_name = sheet.Cells(row, 6).Value2  # Column F (PC names)
-        if pc_name:  # Process rows with PC names
-            pc_name = pc_name.strip()
-            empty_count = 0  # Reset empty counter
-            print("Processing PC: {}".format(pc_name))  # Debugging
-            if pc_name in plugin_status:
-                # Update plugin statuses for this PC
-                for plugin_name, col in plugin_columns.items():
-                    status = plugin_status[pc_name].get(plugin_name, "NOT INSTALLED")
-                    cell = sheet.Cells(row, col)
-                    cell.Value2 = status
-                    if status == "INSTALLED":
-                        cell.Interior.Color = GREEN
-                    elif status == "NOT INSTALLED":
-                        cell.Interior.Color = RED
-                    else:
-                        cell.Interior.Color = GRAY
-                    print("Writing '{}' for plugin '{}' at row {}, column {}".format(
-                        status, plugin_name, row, col))  # Debugging
-            else:
-                # Write 'NO DATA' if no TXT file exists for this PC
-                for plugin_name, col in plugin_columns.items():
-                    cell = sheet.Cells(row, col)
-                    cell.Value2 = "NO DATA"
-                    cell.Interior.Color = GRAY
-                    print("Writing 'NO DATA' for plugin '{}' at row {}, column {}".format(
-                        plugin_name, row, col))  # Debugging
-        else:
-            empty_count += 1
-            print("Skipping empty row at {}, consecutive empty rows: {}".format(row, empty_count))  # Debugging
-            if empty_count > 5:
-                print("Encountered more than 5 consecutive empty rows. Stopping.")
-                break
 
-        row += 1  # Move to the next row
+def read_reports(job):
+    # Read plugin statuses from TXT files, skipping reports unchanged since the last run
+    report_cache = plugin_reports.ReportCache(report_cache_path)
+    statuses_by_year, ingest_stats = plugin_reports.ingest_reports(txt_folder, report_cache, job.workers,
+                                                                   job.progress)
+    job.results["statuses"] = statuses_by_year
+    job.log.info("Plugin reports for Revit {} ({}).", ", ".join(sorted(statuses_by_year)) or "-", ingest_stats)
+    for path, error in ingest_stats.errors:
+        job.log.warning("Could not read {}: {}", path, error)
+
+
+def read_audits(job):
+    # Add-in audit records written by version-INFO fill in PCs without a TXT report
+    audit_errors = []
+    audit_matrix, audit_files, audit_count = fleet_audit.aggregate(
+        txt_folder, errors=audit_errors, cache=plugin_reports.ReportCache(audit_cache_path), workers=job.workers,
+        progress=job.progress)
+    if audit_files:
+        fleet_audit.merge_statuses(job.results["statuses"], audit_matrix.statuses_by_year())
+        job.log.info("Add-in audit records: {} files, {} records, {} PCs.",
+                     audit_files, audit_count, len(audit_matrix.pcs))
+    for path, line_number, message in audit_errors:
+        job.log.warning("{}:{}: {}", path, line_number, message)
+    job.profile.count(elements=audit_count)
+
 
-    # Save the workbook
-    workbook.SaveAs(excel_file)
-    workbook.Close(SaveChanges=True)
-    excel_app.Quit()
+def record_history(job):
+    # Only the status changes since the last run are stored
+    with plugin_history.open_history(history_path) as history:
+        run_id, pcs, changes = history.record(job.results["statuses"], source=txt_folder)
+    job.log.info("Plugin history run {}: {} PCs, {} changes.", run_id, pcs, changes)
 
+
+def write_status(job):
+    # Open the workbook and update every STATUS sheet (and "STATUS <year>" copies)
+    backend = status_backends.open_backend(backend_name, excel_file)
+    try:
+        job.results["sheets"] = plugin_status.update_status_workbook(
+            backend, job.results["statuses"], worksheet_name, status_year)
+        backend.save()
+    finally:
+        backend.close()
+
+
+def show_result(job):
+    if job.error is not None:
+        if job.error_stage == WRITE_STAGE:
+            forms.alert("Error while updating Excel: {}".format(job.error))
+        else:
+            forms.alert("{} failed: {}".format(job.error_stage, job.error))
+        return
+    if job.cancelled:
+        return
+    for sheet_name, summary in job.results["sheets"]:
+        job.log.info(plugin_status.format_summary(sheet_name, summary))
     forms.alert("Write operation completed with formatting! Check the 'STATUS' sheet.")
-except Exception as e:
-    forms.alert("Error while updating Excel: {}".format(e))
+
+with profiling.tool(__file__):
+    # Shift-click to choose between editing the .xlsx directly and driving Excel,
+    # and the Revit year of the plain STATUS sheet
+    backend_name = config.get_option("status_backend", status_backends.DEFAULT_BACKEND)
+    status_year = config.get_option("status_year", plugin_status.DEFAULT_YEAR)
+    if EXEC_PARAMS.config_mode:
+        labels = {"Edit .xlsx directly (no Excel)": "xlsx", "Excel (COM interop)": "com"}
+        with profiling.phase("dialog"):
+            choice = forms.CommandSwitchWindow.show(sorted(labels), message="STATUS sheet backend:")
+            if not choice:
+                script.exit()
+            year = forms.ask_for_string(default=status_year, title="Plugin Checker",
+                                        prompt="Revit year of the 'STATUS' sheet (copies named 'STATUS <year>' "
+                                               "use their own year):")
+        if not year:
+            script.exit()
+        if not plugin_status.find_year(year):
+            forms.alert("'{}' is not a Revit year.".format(year), exitscript=True)
+        backend_name = labels[choice]
+        status_year = plugin_status.find_year(year)
+        config.status_backend = backend_name
+        config.status_year = status_year
+        script.save_config()
+
+    with profiling.phase("dialog"):
+        # Allow user to select the Excel file
+        excel_file = forms.pick_file(file_ext="xlsx", title="Select Excel File")
+        if not excel_file:
+            forms.alert("No Excel file selected. Exiting...", exitscript=True)
+
+        # Allow user to select the folder with TXT files
+        txt_folder = forms.pick_folder(title="Select Folder Containing TXT Files")
+        if not txt_folder:
+            forms.alert("No folder selected. Exiting...", exitscript=True)
+
+    # Reports, audits and the workbook are read and written in the background
+    report_cache_path = script.get_appdata_file("plugin_reports_cache", "json")
+    audit_cache_path = script.get_appdata_file("fleet_audit_cache", "json")
+    job = background.Job(__file__, finish=show_result)
+    job.stage("collect", "Reading plugin reports", read_reports)
+    job.stage("collect", "Reading add-in audits", read_audits)
+    history_path = config.get_option("history_db", "") or script.get_appdata_file("plugin_history", "sqlite")
+    if plugin_history.available():
+        job.stage("write", "Recording plugin history", record_history)
+    else:
+        # IronPython has no sqlite3; the scheduled command line run records the history instead
+        job.log.warning("Plugin history not recorded: this pyRevit engine has no sqlite3. Schedule "
+                        "'python -m gjtools.plugin_cli \"{}\" \"{}\" --history \"{}\"' with CPython "
+                        "to record it (see gjtools.plugin_history).", excel_file, txt_folder, history_path)
+    job.stage("write", WRITE_STAGE, write_status)
+    background.start(job, "Plugin Checker")
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+__title__ = 'Project Bootstrap'
+__author__ = 'Goran Jovic'
+__doc__ = 'Sets up a new model from a discipline profile: worksets, workset views, CHECK filters and user views in one undo step'
+
+import os
+
+from gjtools import telemetry
+
+with telemetry.bundle(__file__):
+    from pyrevit import forms, script
+
+    from gjtools import bootstrap, profiling, revit_failures
+
+doc = __revit__.ActiveUIDocument.Document
+view = __revit__.ActiveUIDocument.ActiveView
+
+# Profiles are the *.json files in the profiles folder next to this script
+profiles_folder = os.path.join(os.path.dirname(__file__), 'profiles')
+
+with profiling.tool(__file__):
+    profiles = bootstrap.list_profiles(profiles_folder)
+    if not profiles:
+        forms.alert('No bootstrap profiles found in:\n{}'.format(profiles_folder), exitscript=True)
+
+    with profiling.phase("dialog"):
+        choice = forms.CommandSwitchWindow.show(sorted(profiles), message='Bootstrap the model for:')
+    if not choice:
+        script.exit()
+
+    try:
+        profile = bootstrap.load_profile(profiles[choice])
+    except Exception as e:
+        forms.alert('Failed to read the {} profile.\n{}'.format(choice, e), exitscript=True)
+
+    try:
+        with revit_failures.session(report=False) as failures:
+            results = bootstrap.run(doc, view, profile)
+    except Exception as e:
+        forms.alert('Bootstrap failed, nothing was changed.\n{}'.format(e), exitscript=True)
+
+    with profiling.phase("dialog"):
+        output = script.get_output()
+        output.print_table(
+            table_data=bootstrap.report_rows(results),
+            title='Project Bootstrap - {}'.format(profile['name']),
+            columns=bootstrap.REPORT_COLUMNS,
+        )
+        if failures.total:
+            output.print_table(
+                table_data=failures.summary_rows(),
+                title='Revit Warnings',
+                columns=revit_failures.SUMMARY_COLUMNS,
+            )
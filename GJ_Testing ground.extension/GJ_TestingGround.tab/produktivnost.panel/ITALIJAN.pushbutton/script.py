@@ -6,6 +6,8 @@ from System.Windows.Media.Imaging import BitmapImage
 from System.Windows import HorizontalAlignment, SizeToContent, ResizeMode, TextWrapping
 from System import Uri, UriKind
 
+from gjtools import profiling
+
 ITALIJAN_LENGTH_CM = 7.5
 AVG_ITALIAN_HEIGHT = {
     'Musko': 175.0,
@@ -102,4 +104,5 @@ def show_results_with_image(message, img_path):
     wnd.Content = stack_panel
     wnd.ShowDialog()
 
-show_results_with_image(msg, image_path)
+with profiling.tool(__file__), profiling.phase("dialog"):
+    show_results_with_image(msg, image_path)
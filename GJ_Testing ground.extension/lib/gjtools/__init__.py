@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""Shared helpers for the GJ_TestingGround extension.
+
+pyRevit puts the extension ``lib`` folder on ``sys.path``, so buttons can
+simply ``import gjtools``. Modules in this package stay pure Python unless
+their name or docstring says otherwise, so they can be exercised outside
+Revit. Revit and .NET namespaces are reached through ``gjtools.lazy`` and only
+loaded when a button actually uses them.
+"""
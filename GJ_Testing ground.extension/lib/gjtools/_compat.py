@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""Small IronPython 2.7 / CPython 3 compatibility shims."""
+import time
+
+try:
+    string_types = (str, unicode)  # noqa: F821 - IronPython 2.7
+except NameError:
+    string_types = (str,)
+
+# time.perf_counter does not exist on IronPython 2.7
+perf_counter = getattr(time, 'perf_counter', time.time)
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""The add-in audit behind the version-INFO (and TEST) buttons.
+
+``main`` needs pyRevit and runs the scan and the file writing as a
+``background`` job; the text report writer is plain Python.
+"""
+import os
+
+from gjtools import addin_drift, addins, fleet_audit
+
+SCOPE_OPTIONS = ["Running Revit only", "All installed Revit years", "Add extra add-in folder...", "Clear extra folders",
+                 "Save current add-ins as baseline"]
+
+
+def revit_year(version_name):
+    if version_name and version_name[-4:].isdigit():
+        return version_name[-4:]
+    return ""
+
+
+def choose_scope(config, forms, all_years, extra_folders):
+    """Shift-click menu; returns ``(all_years, extra_folders, save_baseline)`` or None when cancelled."""
+    save_baseline = False
+    choice = forms.CommandSwitchWindow.show(SCOPE_OPTIONS, message="Add-in audit scope:")
+    if not choice:
+        return None
+    if choice == "Add extra add-in folder...":
+        folder = forms.pick_folder(title="Extra folder with .addin manifests")
+        if folder and folder not in extra_folders:
+            extra_folders.append(folder)
+    elif choice == "Clear extra folders":
+        extra_folders = []
+    elif choice == "Save current add-ins as baseline":
+        save_baseline = True
+    else:
+        all_years = choice == "All installed Revit years"
+    config.audit_all_years = all_years
+    config.extra_addin_folders = extra_folders
+    return all_years, extra_folders, save_baseline
+
+
+def compare_with_baselines(pc_name, year, records, baseline_path, save_baseline=False):
+    """Snapshot each Revit year and diff it with its baseline; the first run becomes the baseline.
+
+    ``baseline_path(year)`` gives the baseline file. Returns ``(snapshots, drifts)``
+    with ``drifts[year] = (baseline_created, Drift)``.
+    """
+    records_by_year = {}
+    for record in records:
+        records_by_year.setdefault(record.year or year or "Unknown", []).append(record)
+    snapshots = {}
+    drifts = {}
+    for snapshot_year, year_records in sorted(records_by_year.items()):
+        snapshot = addin_drift.make_snapshot(pc_name, snapshot_year, year_records)
+        path = baseline_path(snapshot_year)
+        baseline = None
+        if os.path.exists(path) and not save_baseline:
+            try:
+                baseline = addin_drift.load_snapshot(path)
+            except ValueError:
+                pass
+        if baseline is None:
+            addin_drift.save_snapshot(path, snapshot)
+        else:
+            drifts[snapshot_year] = (baseline["created"], addin_drift.diff(baseline, snapshot))
+        snapshots[snapshot_year] = snapshot
+    return snapshots, drifts
+
+
+def write_text_audit(path, version_name, version_build, release_date, plugins, show_years,
+                     snapshots, drifts, audit_errors):
+    with open(path, 'w') as f:
+        f.write("Revit Version Information\n")
+        f.write("========================\n")
+        f.write("Version Name: " + version_name + "\n")
+        f.write("Build Number: " + version_build + "\n")
+        f.write("Release Date: " + release_date + "\n\n")
+
+        f.write("Installed Extensions/Plugins\n")
+        f.write("============================\n")
+        if plugins:
+            for pname, pvers, pyear in plugins:
+                line = "Name: " + pname + ", Version: " + pvers
+                if show_years and pyear:
+                    line += ", Revit: " + pyear
+                f.write(line + "\n")
+        else:
+            f.write("No extension information available.\n")
+
+        f.write("\nChanges Since Baseline\n")
+        f.write("======================\n")
+        for snapshot_year in sorted(snapshots):
+            if snapshot_year not in drifts:
+                f.write("Revit " + snapshot_year + ": baseline saved\n")
+                continue
+            created, drift = drifts[snapshot_year]
+            f.write("Revit " + snapshot_year + " (baseline " + created + "): ")
+            f.write(("{} change(s)".format(len(drift.lines())) if drift else "no changes") + "\n")
+            for line in drift.lines():
+                f.write("    " + line + "\n")
+
+        if audit_errors:
+            f.write("\nErrors\n")
+            f.write("======\n")
+            for error in audit_errors:
+                f.write(str(error) + "\n")
+
+
+def main(script_path="version-INFO"):
+    """Ask for the scope and save folder, then scan, compare and write in a ``background`` job."""
+    from pyrevit import revit, script, forms, EXEC_PARAMS
+    from gjtools import background, profiling
+
+    app = revit.doc.Application
+    version_name = app.VersionName if app else "Unknown_Version"
+    version_build = app.VersionBuild if app else "Unknown_Build"
+    try:
+        release_date = app.VersionNumber if app else "Unknown_ReleaseDate"
+    except Exception:
+        release_date = "Unknown_ReleaseDate"
+    year = revit_year(version_name)
+
+    # Shift-click to audit every installed Revit year and/or add extra add-in folders
+    config = script.get_config()
+    all_years = config.get_option("audit_all_years", False)
+    extra_folders = config.get_option("extra_addin_folders", [])
+    save_baseline = False
+    if EXEC_PARAMS.config_mode:
+        with profiling.phase("dialog"):
+            scope = choose_scope(config, forms, all_years, extra_folders)
+        if scope is None:
+            return
+        all_years, extra_folders, save_baseline = scope
+        script.save_config()
+
+    directories = addins.addin_directories(years=None if all_years else [year], extra_folders=extra_folders)
+
+    # Asked before the scan, so everything after it can run in the background
+    with profiling.phase("dialog"):
+        save_folder = forms.pick_folder()
+    if not save_folder:
+        return
+
+    audit_filepath = os.path.join(save_folder, version_name.replace(" ", "_") + "_ExtensionsAudit.txt")
+
+    # Machine-readable copy for the fleet aggregator and Plugin Checker, which only
+    # pick up file names with a Revit year
+    pc_name = os.environ.get("COMPUTERNAME", "Unknown_PC")
+    records_filepath = os.path.join(save_folder, fleet_audit.audit_file_name(pc_name, year)) if year else None
+    cache_path = script.get_appdata_file("addin_manifest_cache", "json")
+
+    def scan(job):
+        # Parsed manifests and assembly versions are cached between runs; folders are
+        # listed and manifests parsed on a thread pool, duplicates are dropped
+        addin_cache = addins.AddinCache(cache_path)
+        records, audit_errors = addins.scan_addins(directories, addin_cache, workers=job.workers,
+                                                   progress=job.progress)
+        addin_cache.save()
+        job.results["records"] = records
+        job.results["errors"] = audit_errors
+        job.profile.count(elements=len(records))
+
+    def compare(job):
+        job.results["snapshots"], job.results["drifts"] = compare_with_baselines(
+            pc_name, year, job.results["records"],
+            lambda snapshot_year: script.get_appdata_file("addin_baseline_{}".format(snapshot_year), "json"),
+            save_baseline)
+
+    def write(job):
+        records = job.results["records"]
+        snapshots = job.results["snapshots"]
+        unique_plugins = sorted(set((record.name, record.version, record.year or year) for record in records),
+                                key=lambda x: (x[0], x[2]))
+        write_text_audit(audit_filepath, version_name, version_build, release_date, unique_plugins, all_years,
+                         snapshots, job.results["drifts"], job.results["errors"])
+        if records_filepath:
+            fleet_audit.write_jsonl(records_filepath, fleet_audit.make_records(
+                pc_name, version_name, version_build, records))
+        for snapshot_year, snapshot in snapshots.items():
+            addin_drift.save_snapshot(
+                os.path.join(save_folder, addin_drift.snapshot_file_name(pc_name, snapshot_year)), snapshot)
+
+    def report(job):
+        if job.error is None and not job.cancelled:
+            job.log.info("File saved at: {}", audit_filepath)
+            if records_filepath:
+                job.log.info("Audit records saved at: {}", records_filepath)
+            else:
+                job.log.warning("Audit records not saved: no Revit year in '{}'.", version_name)
+            job.log.info("Add-in snapshots saved for Revit: {}", ", ".join(sorted(job.results["snapshots"])))
+
+    job = background.Job(script_path, finish=report)
+    job.stage("collect", "Scanning add-in folders", scan)
+    job.stage("compute", "Comparing with baselines", compare)
+    job.stage("write", "Writing the audit files", write)
+    background.start(job, "Add-in Audit")
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""Add-in drift detection against a baseline snapshot.
+
+A snapshot is a compact JSON document: per add-in its name, assembly
+version and a hash of its manifest contents, plus one hash over all of
+them. Comparing a machine with its baseline is a set difference of add-in
+keys; comparing a whole fleet with a reference machine, year by year, only
+compares the snapshot hashes, so machines that did not drift cost one
+lookup each.
+
+    cd "GJ_Testing ground.extension/lib"
+    python -m gjtools.addin_drift SNAPSHOT_FOLDER --reference PC-REF
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import time
+
+SCHEMA_VERSION = 1
+SNAPSHOT_PATTERN = re.compile(r"^(?P<pc>.+?) - Revit Addins (?P<year>\d{4}|Unknown)\.snapshot\.json$", re.IGNORECASE)
+
+
+def snapshot_file_name(pc, year):
+    return u"{} - Revit Addins {}.snapshot.json".format(pc, year)
+
+
+def _file_hash(path, hashes):
+    digest = hashes.get(path)
+    if digest is None:
+        try:
+            with open(path, "rb") as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+        except (IOError, OSError):
+            digest = ""
+        hashes[path] = digest
+    return digest
+
+
+def addin_key(record):
+    """Stable key of an add-in: its AddInId, else its name and assembly file name."""
+    if record.addin_id:
+        return record.addin_id
+    return u"{}|{}".format(record.name, os.path.basename(record.assembly).lower())
+
+
+def make_snapshot(pc, year, records):
+    """Snapshot dict for ``gjtools.addins.AddinRecord`` objects."""
+    hashes = {}
+    entries = {}
+    for record in records:
+        entries[addin_key(record)] = {
+            "name": record.name,
+            "version": record.version,
+            "manifest_hash": _file_hash(record.manifest, hashes),
+        }
+    return {
+        "schema": SCHEMA_VERSION,
+        "pc": pc,
+        "year": year,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "addins": entries,
+        "hash": snapshot_hash(entries),
+    }
+
+
+def snapshot_hash(entries):
+    digest = hashlib.sha1()
+    for key in sorted(entries):
+        entry = entries[key]
+        digest.update(u"{}\0{}\0{}\n".format(key, entry["version"], entry["manifest_hash"]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def save_snapshot(path, snapshot):
+    with io.open(path, "w", encoding="utf-8") as f:
+        f.write(u"{}".format(json.dumps(snapshot, indent=1, sort_keys=True)))
+
+
+def load_snapshot(path):
+    with io.open(path, "r", encoding="utf-8") as f:
+        snapshot = json.load(f)
+    if snapshot.get("schema") != SCHEMA_VERSION:
+        raise ValueError("{}: unsupported snapshot schema {!r}".format(path, snapshot.get("schema")))
+    return snapshot
+
+
+class Drift(object):
+    """Differences between two snapshots, as sorted add-in name lists."""
+
+    def __init__(self, added, removed, upgraded, changed):
+        self.added = added
+        self.removed = removed
+        self.upgraded = upgraded    # [(name, old_version, new_version)]
+        self.changed = changed      # same version, different manifest
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.upgraded or self.changed)
+
+    __nonzero__ = __bool__  # IronPython 2.7
+
+    def lines(self):
+        lines = []
+        lines.extend("Added: {}".format(name) for name in self.added)
+        lines.extend("Removed: {}".format(name) for name in self.removed)
+        lines.extend("Upgraded: {} {} -> {}".format(*item) for item in self.upgraded)
+        lines.extend("Manifest changed: {}".format(name) for name in self.changed)
+        return lines
+
+
+def diff(baseline, current):
+    """``Drift`` from ``baseline`` to ``current`` snapshot."""
+    if baseline["hash"] == current["hash"]:
+        return Drift([], [], [], [])
+    old = baseline["addins"]
+    new = current["addins"]
+    old_keys = set(old)
+    new_keys = set(new)
+    added = sorted(new[key]["name"] for key in new_keys - old_keys)
+    removed = sorted(old[key]["name"] for key in old_keys - new_keys)
+    upgraded = []
+    changed = []
+    for key in old_keys & new_keys:
+        before, after = old[key], new[key]
+        if before["version"] != after["version"]:
+            upgraded.append((after["name"], before["version"], after["version"]))
+        elif before["manifest_hash"] != after["manifest_hash"]:
+            changed.append(after["name"])
+    return Drift(added, removed, sorted(upgraded), sorted(changed))
+
+
+def list_snapshots(folder):
+    return [os.path.join(folder, name) for name in sorted(os.listdir(folder))
+            if SNAPSHOT_PATTERN.match(name)]
+
+
+def fleet_drift(snapshots, reference):
+    """Group snapshots by hash and return ``(matching_pcs, drifted_snapshots)``.
+
+    Only the hash of each snapshot is compared with the reference; callers
+    can ``diff`` the drifted ones for details.
+    """
+    by_hash = {}
+    for snapshot in snapshots:
+        by_hash.setdefault(snapshot["hash"], []).append(snapshot)
+    matching = sorted(s["pc"] for s in by_hash.pop(reference["hash"], []))
+    drifted = sorted((s for group in by_hash.values() for s in group), key=lambda s: s["pc"])
+    return matching, drifted
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Flag machines whose add-ins differ from a reference machine.")
+    parser.add_argument("folder", help="folder with '<PC> - Revit Addins <year>.snapshot.json' files")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--reference", help="PC name of the reference machine")
+    group.add_argument("--reference-file", help="reference snapshot file")
+    parser.add_argument("--year", help="only compare snapshots of this Revit year")
+    parser.add_argument("--details", action="store_true", help="list the differences of drifted machines")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    snapshots = []
+    for path in list_snapshots(args.folder):
+        try:
+            snapshot = load_snapshot(path)
+        except ValueError as error:
+            print(error)
+            continue
+        if args.year is None or snapshot.get("year") == args.year:
+            snapshots.append(snapshot)
+
+    # Snapshots are only comparable within one Revit year
+    if args.reference_file:
+        reference = load_snapshot(args.reference_file)
+        references = {reference.get("year"): reference}
+        reference_pc = reference["pc"]
+    else:
+        references = dict((s.get("year"), s) for s in snapshots if s["pc"] == args.reference)
+        if not references:
+            print("No snapshot for reference PC '{}'.".format(args.reference))
+            return 1
+        reference_pc = args.reference
+
+    by_year = {}
+    for snapshot in snapshots:
+        by_year.setdefault(snapshot.get("year"), []).append(snapshot)
+    for year in sorted(by_year, key=lambda year: year or ""):
+        group = by_year[year]
+        reference = references.get(year)
+        if reference is None:
+            print("Revit {}: {} snapshots, no snapshot of {} to compare with.".format(
+                year or "?", len(group), reference_pc))
+            continue
+        matching, drifted = fleet_drift(group, reference)
+        print("Revit {}: {} snapshots: {} match {}, {} drifted.".format(
+            year or "?", len(group), len(matching), reference_pc, len(drifted)))
+        for snapshot in drifted:
+            print(snapshot["pc"])
+            if args.details:
+                for line in diff(reference, snapshot).lines():
+                    print("    " + line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""Revit ``.addin`` manifest parsing for the extension audit buttons.
+
+Parsed manifests are cached by (path, mtime) and assembly versions by
+(DLL path, mtime, size) in one JSON file, so a repeated audit only parses
+what changed. Versions come from the PE version resource of the referenced
+assembly (``gjtools.pe_version``) and are only read when first asked for.
+Problems are collected as ``AuditError`` records instead of being swallowed.
+"""
+import io
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+
+from gjtools.pe_version import VersionReader
+from gjtools.workers import DEFAULT_WORKERS, thread_map
+
+UNKNOWN = "Unknown"
+CACHE_VERSION = 1
+
+
+class AuditError(object):
+    __slots__ = ("path", "message")
+
+    def __init__(self, path, message):
+        self.path = path
+        self.message = message
+
+    def __str__(self):
+        return "{}: {}".format(self.path, self.message)
+
+
+class AddinRecord(object):
+    """One <AddIn> entry of a manifest; ``version`` is resolved lazily."""
+
+    __slots__ = ("name", "vendor", "addin_id", "addin_type", "assembly", "manifest", "year",
+                 "_reader", "_errors", "_version")
+
+    def __init__(self, fields, manifest, reader=None, errors=None, year=None):
+        self.name = fields.get("name") or UNKNOWN
+        self.vendor = fields.get("vendor") or ""
+        self.addin_id = fields.get("addin_id") or ""
+        self.addin_type = fields.get("type") or ""
+        self.assembly = fields.get("assembly") or ""
+        self.manifest = manifest
+        self.year = year
+        self._reader = reader
+        self._errors = errors
+        self._version = None
+
+    @property
+    def version(self):
+        if self._version is None:
+            self._version = self._resolve_version()
+        return self._version
+
+    def _resolve_version(self):
+        if not self.assembly or self._reader is None:
+            return UNKNOWN
+        if not os.path.isfile(self.assembly):
+            self._error("Assembly not found: {}".format(self.assembly))
+            return UNKNOWN
+        try:
+            return self._reader.version(self.assembly) or UNKNOWN
+        except Exception as error:
+            self._error("Cannot read version of {}: {}".format(self.assembly, error))
+            return UNKNOWN
+
+    def _error(self, message):
+        if self._errors is not None:
+            self._errors.append(AuditError(self.manifest, message))
+
+    @property
+    def key(self):
+        """Identity used to de-duplicate the same add-in found in several folders of one Revit year."""
+        return self.year, self.addin_id, os.path.normcase(self.assembly)
+
+    def __repr__(self):
+        return "AddinRecord({!r}, {!r})".format(self.name, self.assembly)
+
+
+class AddinCache(object):
+    """JSON file holding parsed manifests and assembly versions between runs."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.manifests = {}
+        self.versions = {}
+        if path and os.path.exists(path):
+            try:
+                with io.open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    self.manifests = data.get("manifests", {})
+                    self.versions = data.get("versions", {})
+            except (IOError, OSError, ValueError):
+                pass
+        self.reader = VersionReader(self.versions)
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with io.open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(u"{}".format(json.dumps({
+                "version": CACHE_VERSION, "manifests": self.manifests, "versions": self.versions})))
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rename(tmp_path, self.path)
+
+
+def _text(node, tag):
+    child = node.find(tag)
+    if child is None or child.text is None:
+        return None
+    return child.text.strip()
+
+
+def parse_manifest(path):
+    """``[fields]`` for every <AddIn> in a manifest, assembly paths made absolute."""
+    root = ET.parse(path).getroot()
+    directory = os.path.dirname(path)
+    entries = []
+    for node in root:
+        if node.tag != "AddIn":
+            continue
+        assembly = _text(node, "Assembly") or ""
+        if assembly and not os.path.isabs(assembly):
+            assembly = os.path.normpath(os.path.join(directory, assembly))
+        entries.append({
+            "name": _text(node, "Name") or _text(node, "Text") or _text(node, "FullClassName"),
+            "vendor": _text(node, "VendorDescription") or _text(node, "VendorId"),
+            "addin_id": (_text(node, "AddInId") or _text(node, "ClientId") or "").upper(),
+            "type": node.get("Type"),
+            "assembly": assembly,
+        })
+    return entries
+
+
+def list_manifests(directory):
+    """Paths of the ``.addin`` files directly inside ``directory``."""
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(".addin")]
+
+
+def _read_manifest(path, cache):
+    """``(path, mtime, fields, from_cache)``; safe to run on a worker thread."""
+    mtime = os.path.getmtime(path)
+    entry = cache.manifests.get(path)
+    if entry and entry["mtime"] == mtime:
+        return path, mtime, entry["addins"], True
+    return path, mtime, parse_manifest(path), False
+
+
+def load_manifest(path, cache, errors):
+    """Parsed fields of one manifest, from ``cache`` when its mtime is unchanged."""
+    try:
+        _, mtime, fields, from_cache = _read_manifest(path, cache)
+    except Exception as error:
+        errors.append(AuditError(path, "Cannot parse manifest: {}".format(error)))
+        return []
+    if not from_cache:
+        cache.manifests[path] = {"mtime": mtime, "addins": fields}
+    return fields
+
+
+def parse_addins(directory, cache=None, errors=None):
+    """``(records, errors)`` for every add-in manifest in ``directory``."""
+    cache = cache or AddinCache()
+    errors = errors if errors is not None else []
+    records = []
+    for path in list_manifests(directory):
+        for fields in load_manifest(path, cache, errors):
+            records.append(AddinRecord(fields, path, cache.reader, errors))
+    return records, errors
+
+
+_YEAR_FOLDER = re.compile(r"^\d{4}$")
+
+
+def addin_roots():
+    """Machine-wide and per-user ``Autodesk/Revit/Addins`` folders."""
+    return [os.path.join(os.environ.get(variable, ""), "Autodesk", "Revit", "Addins")
+            for variable in ("PROGRAMDATA", "APPDATA")]
+
+
+def addin_directories(years=None, extra_folders=(), roots=None):
+    """``[(year, directory)]`` to scan.
+
+    ``years=None`` finds every installed Revit year under the add-in roots.
+    ``extra_folders`` (e.g. pyRevit extension paths) are scanned with year None.
+    """
+    directories = []
+    for root in roots if roots is not None else addin_roots():
+        if years is None:
+            found = sorted(name for name in _listdir(root) if _YEAR_FOLDER.match(name))
+        else:
+            found = years
+        directories.extend((year, os.path.join(root, year)) for year in found)
+    directories.extend((None, folder) for folder in extra_folders)
+    return directories
+
+
+def _listdir(directory):
+    try:
+        return os.listdir(directory)
+    except OSError:
+        return []
+
+
+def scan_addins(directories, cache=None, errors=None, workers=DEFAULT_WORKERS, progress=None):
+    """Scan many add-in folders concurrently; returns ``(records, errors)``.
+
+    Folder listings and manifest parsing run on a thread pool (roaming
+    profile folders can be slow); cache and error bookkeeping stays on the
+    calling thread. The same add-in reached through several folders is kept
+    once, keyed by (AddInId, assembly path). ``progress(done, total)``
+    follows the manifests parsed.
+    """
+    cache = cache or AddinCache()
+    errors = errors if errors is not None else []
+
+    # An extra folder may repeat one of the standard ones
+    unique = []
+    seen_directories = set()
+    for year, directory in directories:
+        key = os.path.normcase(os.path.abspath(directory))
+        if key not in seen_directories:
+            seen_directories.add(key)
+            unique.append((year, directory))
+    directories = unique
+
+    listings = thread_map(lambda item: list_manifests(item[1]), directories, workers)
+    manifests = []
+    for (year, directory), (paths, error) in zip(directories, listings):
+        if error is not None:
+            errors.append(AuditError(directory, "Cannot list folder: {}".format(error)))
+            continue
+        manifests.extend((year, path) for path in paths)
+
+    parsed = thread_map(lambda item: _read_manifest(item[1], cache), manifests, workers, progress)
+    records = []
+    seen = set()
+    for (year, path), (result, error) in zip(manifests, parsed):
+        if error is not None:
+            errors.append(AuditError(path, "Cannot parse manifest: {}".format(error)))
+            continue
+        _, mtime, fields_list, from_cache = result
+        if not from_cache:
+            cache.manifests[path] = {"mtime": mtime, "addins": fields_list}
+        for fields in fields_list:
+            record = AddinRecord(fields, path, cache.reader, errors, year)
+            if record.key in seen:
+                continue
+            seen.add(record.key)
+            records.append(record)
+    return records, errors
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""The slow file, share and Excel stages of a button, off the Revit UI thread.
+
+A button asks for its inputs on the UI thread and hands the rest to a
+``Job``. Its stages run one after another on a background thread while a
+modeless progress window shows how far they got, and the script returns
+right away, so Revit stays responsive. Whatever needs Revit or the output
+window goes into ``finish``, which runs back on the UI thread through an
+``ExternalEvent``::
+
+    job = background.Job(__file__, finish=show_results)
+    job.stage("collect", "Reading reports", read_reports)
+    job.stage("write", "Updating STATUS", write_status)
+    background.start(job)
+
+A stage is ``func(job)`` and must not call the Revit API: ``job.results``
+passes data on, ``job.log`` buffers messages (emitted after ``finish``) and
+``job.progress`` moves the bar. Closing the window skips the stages not yet
+started. The thread pool size of the stages (``job.workers``) and whether
+jobs run in the background at all are set with Shift+click on the Profiling
+Report button, or with ``GJTOOLS_IO_WORKERS``. Outside Revit, or with
+background I/O off, ``start`` runs the job in place. The script has to set
+``__persistentengine__ = True`` so pyRevit keeps it loaded until ``finish``.
+"""
+import os
+import threading
+
+from gjtools import profiling, tool_log
+from gjtools._compat import perf_counter
+from gjtools.lazy import UI
+from gjtools.workers import DEFAULT_WORKERS
+
+CONFIG_SECTION = "GJToolsBackground"
+ENV_VAR = "GJTOOLS_IO_WORKERS"
+PROGRESS_INTERVAL = 0.1
+
+# Jobs between start and finish; the ExternalEvent must not be collected meanwhile
+_running = set()
+_handler_type = None
+
+
+def _config():
+    from pyrevit import script
+    return script.get_config(CONFIG_SECTION)
+
+
+def io_workers():
+    """Threads per I/O stage: environment, then the setting, then ``DEFAULT_WORKERS``."""
+    try:
+        value = os.environ.get(ENV_VAR) or _config().get_option("workers", DEFAULT_WORKERS)
+        return max(1, int(value))
+    except Exception:
+        return DEFAULT_WORKERS
+
+
+def set_io_workers(workers):
+    from pyrevit import script
+    _config().workers = max(1, int(workers))
+    script.save_config()
+
+
+def is_enabled():
+    try:
+        return bool(_config().get_option("enabled", True))
+    except Exception:
+        return True
+
+
+def set_enabled(enabled):
+    from pyrevit import script
+    _config().enabled = bool(enabled)
+    script.save_config()
+
+
+class Job(object):
+    """Stages of one button run plus what they share; ``run`` works through them on the calling thread."""
+
+    def __init__(self, script_path_or_name, finish=None, workers=None, emit=None):
+        self.name = profiling.tool_name(script_path_or_name)
+        self.finish = finish
+        self.workers = workers or io_workers()
+        self.stages = []
+        self.results = {}
+        self.log = tool_log.ToolLog(self.name, tool_log.level_for(self.name), emit)
+        if profiling.is_enabled():
+            self.profile = profiling.Profile(self.name + " (background)")
+        else:
+            self.profile = profiling.NULL_PROFILE
+        self.error = None
+        self.error_stage = None
+        self.cancelled = False
+        self.window = None
+        self.event = None
+        self._label = None
+        self._reported = 0.0
+
+    def stage(self, phase, label, func):
+        """Add ``func(job)``, timed as profiling ``phase`` and shown as ``label``."""
+        self.stages.append((phase, label, func))
+        return self
+
+    def progress(self, done, total):
+        """Move the bar of the current stage; safe from any thread, redrawn at most every ``PROGRESS_INTERVAL``."""
+        if self.window is None:
+            return
+        now = perf_counter()
+        if done < total and now - self._reported < PROGRESS_INTERVAL:
+            return
+        self._reported = now
+        self.window.update(self._label, done, total)
+
+    def _cancel_requested(self):
+        if not self.cancelled and self.window is not None and self.window.cancelled:
+            self.cancelled = True
+        return self.cancelled
+
+    def run(self):
+        """Run the stages in order; the first error stops them and is kept in ``error``."""
+        for index, (phase, label, func) in enumerate(self.stages):
+            if self._cancel_requested():
+                self.log.warning("Cancelled; skipped: {}.", ", ".join(stage[1] for stage in self.stages[index:]))
+                return
+            self._label = label
+            if self.window is not None:
+                self.window.update(label, 0, 1)
+            try:
+                with self.profile.phase(phase):
+                    func(self)
+            except Exception as e:
+                self.error = e
+                self.error_stage = label
+                self.log.error("{} failed: {}", label, e)
+                return
+
+    def complete(self):
+        """On the UI thread: close the window, call ``finish``, emit the messages and record the profile."""
+        _running.discard(self)
+        if self.window is not None:
+            self.window.close()
+        try:
+            if self.finish is not None:
+                self.finish(self)
+        finally:
+            self.log.flush()
+            fields = self.profile.finish(type(self.error).__name__ if self.error else None)
+            if self.profile.enabled:
+                profiling.record(self.profile, fields)
+            if self.event is not None:
+                self.event.Dispose()
+                self.event = None
+
+
+class ProgressWindow(object):
+    """Modeless pyRevit progress bar; ``update`` may be called from the worker thread."""
+
+    def __init__(self, title):
+        from pyrevit import forms
+        self.title = title
+        self.bar = forms.ProgressBar(title=title, cancellable=True)
+        self.bar.show()
+
+    @property
+    def cancelled(self):
+        return self.bar.cancelled
+
+    def update(self, label, done, total):
+        self.bar.title = "{}: {} ({{value}}/{{max_value}})".format(self.title, label)
+        self.bar.update_progress(done, max(total, 1))
+
+    def close(self):
+        self.bar.Close()
+
+
+def handler_type():
+    """``IExternalEventHandler`` completing a job in Revit's API context (built on first use)."""
+    global _handler_type
+    if _handler_type is None:
+        class JobFinisher(UI.IExternalEventHandler):
+            def __init__(self, job):
+                self.job = job
+
+            def Execute(self, uiapp):
+                self.job.complete()
+
+            def GetName(self):
+                return "gjtools: " + self.job.name
+
+        _handler_type = JobFinisher
+    return _handler_type
+
+
+def in_revit():
+    try:
+        UI.load()
+    except ImportError:
+        return False
+    return True
+
+
+def _start_thread(target):
+    """Background thread; a single-threaded apartment on .NET, as Excel COM interop wants."""
+    try:
+        from System.Threading import ApartmentState, Thread, ThreadStart
+    except ImportError:
+        thread = threading.Thread(target=target)
+        thread.daemon = True
+        thread.start()
+        return thread
+    thread = Thread(ThreadStart(target))
+    thread.SetApartmentState(ApartmentState.STA)
+    thread.IsBackground = True
+    thread.Start()
+    return thread
+
+
+def start(job, title=None, window=True):
+    """Run ``job`` in the background with a progress window; returns False when it ran in place."""
+    if not (is_enabled() and in_revit()):
+        job.run()
+        job.complete()
+        return False
+    job.event = UI.ExternalEvent.Create(handler_type()(job))
+    if window:
+        job.window = ProgressWindow(title or job.name)
+    _running.add(job)
+
+    def work():
+        try:
+            job.run()
+        finally:
+            job.event.Raise()
+
+    _start_thread(work)
+    return True
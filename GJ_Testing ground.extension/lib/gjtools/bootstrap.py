@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""One-shot setup of a fresh model from a per-discipline profile (Revit only).
+
+A bootstrap profile is a JSON file next to the Project Bootstrap button::
+
+    {
+        "name": "ARCH",
+        "worksets_file": "../../../../../00_ARCH - WorksetList.txt",
+        "worksets": ["X_LINKS_EXTRA"],
+        "workset_views": true,
+        "check_filters": true,
+        "users_file": "../../User Creation.pushbutton/usernames.txt",
+        "users_prefixes": ["ARCH_"]
+    }
+
+File paths are relative to the profile; the names of ``worksets_file``
+come first, then the ``worksets`` not already listed there.
+
+``run`` executes the stages (worksets, workset views, check filters on the
+active view, user views) in one ``TransactionGroup`` with one transaction
+per stage, so the whole setup is a single undo step. The model is scanned
+once into a ``ModelIndex`` that every stage reads and keeps up to date, and
+a stage whose result is already in the model is skipped.
+"""
+import glob
+import io
+import json
+import os
+
+from gjtools import panel_checks, profiling, revit_collectors, user_views, worksets
+from gjtools._compat import perf_counter
+from gjtools.lazy import DB
+from gjtools.revit_transactions import sub_transaction, transaction, transaction_group
+from gjtools.view_names import ViewNameIndex
+
+DONE = "done"
+SKIPPED = "skipped"
+FAILED = "failed"
+OFF = "off"
+REPORT_COLUMNS = ["Stage", "Result", "Created", "ms", "Notes"]
+
+
+def load_profile(path):
+    """Profile dict with ``name``, ``worksets``, ``workset_views``, ``check_filters`` and ``users``."""
+    with io.open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not data.get("name"):
+        raise ValueError("{}: a bootstrap profile needs a 'name'".format(path))
+    profile = {
+        "name": data["name"],
+        "worksets": [],
+        "workset_views": bool(data.get("workset_views", False)),
+        "check_filters": bool(data.get("check_filters", False)),
+        "users": [],
+    }
+    folder = os.path.dirname(os.path.abspath(path))
+    if data.get("worksets_file"):
+        profile["worksets"] = worksets.read_workset_names(
+            os.path.normpath(os.path.join(folder, data["worksets_file"])))
+    profile["worksets"] += [name for name in data.get("worksets", []) if name not in profile["worksets"]]
+    if data.get("users_file"):
+        users_path = os.path.normpath(os.path.join(folder, data["users_file"]))
+        prefixes = tuple(data.get("users_prefixes", [""]))
+        profile["users"] = [name for name in user_views.read_usernames(users_path) if name.startswith(prefixes)]
+    return profile
+
+
+def list_profiles(folder):
+    """``{profile file name: path}`` of the ``*.json`` profiles in ``folder``."""
+    return dict((os.path.splitext(os.path.basename(path))[0], path)
+                for path in glob.glob(os.path.join(folder, "*.json")))
+
+
+class ModelIndex(object):
+    """Worksets, views, filters and parameter ids of a document, scanned once per run."""
+
+    def __init__(self, doc):
+        with profiling.phase("collect"):
+            self.worksets = worksets.user_worksets(doc)
+            views = list(revit_collectors.of_class(doc, DB.View))
+            self.view_names = ViewNameIndex([view.Name for view in views])
+            self.example_views, self.view_categories = user_views.scan_views(views)
+            self.view_type_3d = worksets.view_family_type(doc, DB.ViewFamily.ThreeDimensional)
+            self.filter_ids = dict((f.Name, f.Id) for f in revit_collectors.of_class(doc, DB.ParameterFilterElement))
+            self.check_status_id = revit_collectors.parameter_element_id(doc, panel_checks.CHECK_STATUS)
+            self.solid_fill_pattern = revit_collectors.solid_fill_pattern(doc)
+        profiling.count(elements=len(views))
+
+
+class StageResult(object):
+    __slots__ = ("name", "status", "created", "seconds", "messages")
+
+    def __init__(self, name, status, created=0, seconds=0.0, messages=()):
+        self.name = name
+        self.status = status
+        self.created = created
+        self.seconds = seconds
+        self.messages = list(messages)
+
+
+def _worksets(doc, view, profile, index):
+    missing = [name for name in profile["worksets"] if name not in index.worksets]
+    if not missing:
+        return SKIPPED, 0, []
+    if not doc.IsWorkshared:
+        return FAILED, 0, ["The model is not workshared."]
+    with transaction(doc, "Bootstrap: Worksets"):
+        created = worksets.create_missing_worksets(doc, missing, index.worksets)
+    return DONE if created else FAILED, len(created), []
+
+
+def _workset_views(doc, view, profile, index):
+    wanted = [name for name in profile["worksets"] if worksets.VIEW_PREFIX + name not in index.view_names]
+    if not wanted:
+        return SKIPPED, 0, []
+    if index.view_type_3d is None:
+        return FAILED, 0, ["No 3D ViewFamilyType found."]
+    created = 0
+    messages = []
+    with transaction(doc, "Bootstrap: Workset Views"):
+        for name in wanted:
+            if name not in index.worksets:
+                messages.append("Workset '{}' not found.".format(name))
+                continue
+            try:
+                # A failed view is rolled back alone; the others stay in the stage transaction
+                with sub_transaction(doc):
+                    worksets.isolated_view(doc, name, index.view_type_3d, index.worksets, index.view_names)
+            except Exception as e:
+                messages.append("View for workset '{}': {}".format(name, e))
+                continue
+            created += 1
+    return DONE if created else FAILED, created, messages
+
+
+def _check_filters(doc, view, profile, index):
+    names = [name for name, _ in panel_checks.FILTER_COLORS]
+    applied = set(view.GetFilters())
+    if all(name in index.filter_ids and index.filter_ids[name] in applied for name in names):
+        return SKIPPED, 0, []
+    if view.ViewTemplateId.IntegerValue != -1:
+        return FAILED, 0, ["The active view has a view template."]
+    if index.check_status_id is None:
+        return FAILED, 0, ["Shared parameter {} is missing.".format(panel_checks.CHECK_STATUS)]
+    if index.solid_fill_pattern is None:
+        return FAILED, 0, ["Solid fill pattern not found."]
+    with transaction(doc, "Bootstrap: Check Filters"):
+        index.filter_ids.update(panel_checks.apply_check_filters(
+            doc, view, index.check_status_id, index.solid_fill_pattern))
+    return DONE, len(names), []
+
+
+def _user_views(doc, view, profile, index):
+    pending = [name for name in profile["users"] if name not in index.view_categories]
+    if not pending:
+        return SKIPPED, 0, []
+    if not index.example_views:
+        return FAILED, 0, ['No example views with View Category "{}" found.'.format(user_views.EXAMPLE_CATEGORY)]
+    missing = user_views.missing_parameters(index.example_views[0])
+    if missing:
+        return FAILED, 0, ["Missing parameters in the model: {}".format(", ".join(missing))]
+    with transaction(doc, "Bootstrap: User Views"):
+        created, _, errors = user_views.create_user_views(
+            doc, pending, index.example_views, index.view_categories, index.view_names)
+    return (DONE if created else FAILED, len(created),
+            ['Failed to duplicate view "{}": {}'.format(name, error) for name, error in errors])
+
+
+STAGES = (
+    ("worksets", _worksets, lambda profile: bool(profile["worksets"])),
+    ("workset_views", _workset_views, lambda profile: profile["workset_views"] and bool(profile["worksets"])),
+    ("check_filters", _check_filters, lambda profile: profile["check_filters"]),
+    ("user_views", _user_views, lambda profile: bool(profile["users"])),
+)
+
+
+def run(doc, view, profile, clock=perf_counter):
+    """Run the profile's stages in one transaction group; returns ``[StageResult]``.
+
+    The first result is the model scan. An unexpected error rolls back every stage.
+    """
+    start = clock()
+    index = ModelIndex(doc)
+    results = [StageResult("model index", DONE, seconds=clock() - start)]
+    with transaction_group(doc, "Project Bootstrap - {}".format(profile["name"])):
+        for name, stage, enabled in STAGES:
+            if not enabled(profile):
+                results.append(StageResult(name, OFF))
+                continue
+            start = clock()
+            with profiling.phase("write"):
+                status, created, messages = stage(doc, view, profile, index)
+            results.append(StageResult(name, status, created, clock() - start, messages))
+    return results
+
+
+def report_rows(results):
+    """Rows for ``output.print_table`` with ``REPORT_COLUMNS``."""
+    return [[result.name, result.status, result.created, "{:.1f}".format(result.seconds * 1000.0),
+             "; ".join(result.messages)] for result in results]
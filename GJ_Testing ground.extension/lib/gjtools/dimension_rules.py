@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""Dimension checks for several categories in one run, configured from a file.
+
+A rules file (JSON, next to the Check Dimensions button) names per
+category the parameters to check, their module and tolerance in
+millimetres, and the text parameter that receives the status::
+
+    {
+        "status_parameter": "CHECK_STATUS",
+        "categories": {
+            "OST_Doors": {"parameters": {"Width": {"module": 50}, "Height": {"module": 50}}},
+            "OST_Ceilings": {"status_parameter": "Comments",
+                             "parameters": {"Height Offset From Level": {"module": 10, "tolerance": 1}}}
+        }
+    }
+
+A value passes when it lies within ``tolerance`` of a multiple of
+``module``. The status is "CHECK <PARAMETER>" per failing parameter, or
+"CHECK ALL" when every checked parameter fails, like the Check Panel
+Dimensions comments, so the CHECK filters colour the results too. The
+``CHECK_STATUS`` of curtain panels belongs to Check Panel Dimensions alone,
+so a rules file may only check them into another status parameter.
+
+Each rule is compiled to a predicate once. The elements of all configured
+categories come from one shared element snapshot (a single
+``ElementMulticategoryFilter`` pass); parameters an instance does not have
+are read from its type, once per type. Only the statuses that change are
+checked out and written, in one transaction::
+
+    rule_set = dimension_rules.load_rules(path)
+    results = dimension_rules.check_dimensions(doc, rule_set, view)
+
+``load_rules`` and the predicates are plain Python; the rest needs a Revit
+document.
+"""
+import io
+import json
+
+from gjtools import element_snapshot, panel_checks, profiling, revit_collectors, tool_log, worksharing
+from gjtools.lazy import DB
+from gjtools.revit_params import parameter_value
+from gjtools.revit_transactions import transaction
+
+MM_PER_FOOT = 304.8
+DEFAULT_TOLERANCE = 0.5
+# Leaves room for the feet to millimetre conversion of exact values
+EPSILON = 1e-6
+SUMMARY_COLUMNS = ["Category", "Checked", "To check", "Changed", "No status parameter", "Blocked"]
+PANEL_CATEGORY = "OST_CurtainWallPanels"
+
+
+def module_predicate(module, tolerance=DEFAULT_TOLERANCE, scale=MM_PER_FOOT):
+    """``check(value)``: whether ``value * scale`` lies within ``tolerance`` of a multiple of ``module``."""
+    if module <= 0:
+        raise ValueError("The module must be positive.")
+    if tolerance < 0:
+        raise ValueError("The tolerance must not be negative.")
+    limit = tolerance + EPSILON
+    upper = module - limit
+
+    def check(value):
+        remainder = (value * scale) % module
+        return remainder <= limit or remainder >= upper
+    return check
+
+
+class ParameterRule(object):
+    """Module check of one parameter; ``label`` is its status text when it fails."""
+
+    __slots__ = ("name", "module", "tolerance", "label", "check")
+
+    def __init__(self, name, module, tolerance=DEFAULT_TOLERANCE, label=None, scale=MM_PER_FOOT):
+        self.name = name
+        self.module = module
+        self.tolerance = tolerance
+        self.label = label or "CHECK " + name.upper()
+        self.check = module_predicate(module, tolerance, scale)
+
+
+class CategoryRules(object):
+    """The parameter rules of one category and the parameter receiving their status."""
+
+    __slots__ = ("category", "status_parameter", "rules", "parameter_names")
+
+    def __init__(self, category, status_parameter, rules):
+        self.category = category
+        self.status_parameter = status_parameter
+        self.rules = rules
+        self.parameter_names = tuple(rule.name for rule in rules)
+
+    def built_in(self):
+        built_in = getattr(DB.BuiltInCategory, self.category, None)
+        if built_in is None:
+            raise ValueError("Unknown category '{}' in the dimension rules.".format(self.category))
+        return built_in
+
+    def status(self, values):
+        """Status text for the values of ``parameter_names`` (None = not checked)."""
+        failing = [rule.label for rule, value in zip(self.rules, values) if value is not None and not rule.check(value)]
+        if len(failing) > 1 and len(failing) == len(self.rules):
+            return panel_checks.CHECK_ALL
+        return ", ".join(failing)
+
+
+class RuleSet(object):
+    """All category rules of a rules file."""
+
+    def __init__(self, categories, source=""):
+        self.categories = categories
+        self.source = source
+
+    def snapshot_scopes(self, built_ins):
+        """``{parameter: [categories]}``: each parameter is only read for the categories whose rules use it."""
+        scopes = {}
+        for built_in, category in zip(built_ins, self.categories):
+            for name in (category.status_parameter,) + category.parameter_names:
+                if built_in not in scopes.setdefault(name, []):
+                    scopes[name].append(built_in)
+        return scopes
+
+
+def _parameter_rule(name, spec, scale, source):
+    if not isinstance(spec, dict):
+        spec = {"module": spec}
+    try:
+        return ParameterRule(name, float(spec["module"]), float(spec.get("tolerance", DEFAULT_TOLERANCE)),
+                             spec.get("label"), scale)
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError("{}: bad rule for '{}': {}".format(source, name, e))
+
+
+def parse_rules(data, source="rules"):
+    """``RuleSet`` from the decoded rules file."""
+    if not isinstance(data, dict) or not isinstance(data.get("categories"), dict) or not data["categories"]:
+        raise ValueError("{}: the dimension rules need a 'categories' object".format(source))
+    scale = float(data.get("scale", MM_PER_FOOT))
+    default_status = data.get("status_parameter", panel_checks.CHECK_STATUS)
+    categories = []
+    for category, spec in sorted(data["categories"].items()):
+        parameters = spec.get("parameters") if isinstance(spec, dict) else None
+        if not parameters:
+            raise ValueError("{}: no parameters to check for {}".format(source, category))
+        rules = [_parameter_rule(name, parameters[name], scale, source) for name in sorted(parameters)]
+        status_parameter = spec.get("status_parameter", default_status)
+        if category == PANEL_CATEGORY and status_parameter == panel_checks.CHECK_STATUS:
+            raise ValueError("{}: the {} of {} is written by Check Panel Dimensions; use another "
+                             "'status_parameter'".format(source, status_parameter, category))
+        categories.append(CategoryRules(category, status_parameter, rules))
+    return RuleSet(categories, source)
+
+
+def load_rules(path):
+    with io.open(path, "r", encoding="utf-8") as f:
+        return parse_rules(json.load(f), path)
+
+
+class CategoryResult(object):
+    """Counts of one category in a run."""
+
+    __slots__ = ("category", "checked", "flagged", "changed", "no_status", "blocked")
+
+    def __init__(self, category):
+        self.category = category
+        self.checked = 0
+        self.flagged = 0
+        self.changed = 0
+        self.no_status = 0
+        self.blocked = 0
+
+    def row(self):
+        return [self.category, self.checked, self.flagged, self.changed, self.no_status, self.blocked]
+
+
+# Revit -----------------------------------------------------------------------
+
+def _type_value(doc, type_id, name, cache):
+    key = (type_id, name)
+    if key not in cache:
+        element_type = doc.GetElement(DB.ElementId(type_id)) if type_id != element_snapshot.DELETED else None
+        param = element_type.LookupParameter(name) if element_type is not None else None
+        cache[key] = parameter_value(param) if param is not None else None
+    return cache[key]
+
+
+def evaluate(doc, rule_set, view=None):
+    """``(snapshot, changes, results)``: the ``(element id, CategoryRules, status)`` that differ, and counts.
+
+    Covers the elements of every configured category, only those in ``view`` if given.
+    """
+    built_ins = [category.built_in() for category in rule_set.categories]
+    scopes = rule_set.snapshot_scopes(built_ins)
+    snapshot = element_snapshot.get(doc, built_ins, parameters=sorted(scopes), scopes=scopes)
+    if view is not None:
+        from System.Collections.Generic import List
+        with profiling.phase("collect"):
+            element_ids = revit_collectors.collector(doc, view).WherePasses(
+                DB.ElementMulticategoryFilter(List[DB.BuiltInCategory](built_ins))).ToElementIds()
+        rows = [row for row in (snapshot.row(element_id) for element_id in element_ids) if row is not None]
+    else:
+        rows = list(snapshot.rows())
+    by_category = dict((int(built_in), category) for built_in, category in zip(built_ins, rule_set.categories))
+    results = dict((category.category, CategoryResult(category.category)) for category in rule_set.categories)
+    missing = snapshot.MISSING
+    category_ids = snapshot.category_ids
+    type_values = {}
+    changes = []
+    with profiling.phase("compute"):
+        for row in rows:
+            category = by_category.get(category_ids[row])
+            if category is None:
+                continue
+            result = results[category.category]
+            current = snapshot.value(row, category.status_parameter)
+            if current is missing:
+                result.no_status += 1
+                continue
+            result.checked += 1
+            values = []
+            for name in category.parameter_names:
+                value = snapshot.value(row, name)
+                if value is missing:
+                    value = _type_value(doc, snapshot.type_ids[row], name, type_values)
+                values.append(value if isinstance(value, float) else None)
+            status = category.status(values)
+            if status:
+                result.flagged += 1
+            if (current or "") != status:
+                changes.append((snapshot.ids[row], category, status))
+    profiling.count(elements=len(rows))
+    return snapshot, changes, [results[category.category] for category in rule_set.categories]
+
+
+def write_statuses(doc, snapshot, changes, results=None):
+    """Check out and write the ``evaluate`` changes in one transaction; returns the written changes."""
+    if not changes:
+        return []
+    results = dict((result.category, result) for result in results or [])
+    checkout = worksharing.checkout(doc, [DB.ElementId(element_id) for element_id, _, _ in changes])
+    if checkout.blocked:
+        for element_id, category, _ in changes:
+            if not checkout.can_edit(element_id) and category.category in results:
+                results[category.category].blocked += 1
+        changes = [change for change in changes if checkout.can_edit(change[0])]
+    written = []
+    if changes:
+        with transaction(doc, "Check Dimensions"), profiling.phase("write"):
+            for element_id, category, status in changes:
+                param = doc.GetElement(DB.ElementId(element_id)).LookupParameter(category.status_parameter)
+                if param is None or param.IsReadOnly:
+                    continue
+                param.Set(status)
+                written.append((element_id, category, status))
+        for element_id, category, status in written:
+            snapshot.set_value(element_id, category.status_parameter, status)
+            if category.category in results:
+                results[category.category].changed += 1
+    return written
+
+
+def check_dimensions(doc, rule_set, view=None):
+    """Evaluate the rules and write the changed statuses; returns the ``CategoryResult`` list."""
+    snapshot, changes, results = evaluate(doc, rule_set, view)
+    write_statuses(doc, snapshot, changes, results)
+    for category, result in zip(rule_set.categories, results):
+        if result.no_status:
+            tool_log.warning("{}: {} elements have no '{}' parameter.", result.category, result.no_status,
+                             category.status_parameter)
+        if result.blocked:
+            tool_log.warning("{}: {} elements are owned by other users and keep their status.",
+                             result.category, result.blocked)
+    tool_log.info("Dimension check complete: {} checked, {} to check, {} changed.",
+                  sum(r.checked for r in results), sum(r.flagged for r in results), sum(r.changed for r in results))
+    return results
@@ -0,0 +1,456 @@
+# -*- coding: utf-8 -*-
+"""Compact, document-scoped snapshot of model elements shared by the tools.
+
+One collector pass reads the element id, category id, type id, workset id
+and the requested parameter values into flat columns (``array`` for the
+ids, lists for the values), so no Revit element wrappers stay alive::
+
+    snapshot = element_snapshot.get(doc, [DB.BuiltInCategory.OST_CurtainWallPanels],
+                                    parameters=["CHECK_STATUS"], display=["Height", "Width"])
+    for row in snapshot.rows():
+        height = snapshot.display_value(row, "Height")
+
+Snapshots live in an AppDomain slot, so every button shares them for the
+whole Revit session. A ``DocumentChanged`` handler only records the added,
+modified and deleted ids; those rows are re-read on the next ``get``.
+Display strings also depend on the project units, so a change to those or
+to the Project Information re-reads the display columns of every row. The
+handler is subscribed by ``install`` from the extension's startup script,
+whose engine pyRevit keeps for the session; until then nothing tells a kept
+snapshot is out of date, so every ``get`` builds a new one.
+Each pyRevit engine imports its own copy of this module, so absent
+parameters are compared with ``snapshot.MISSING`` of the snapshot at hand.
+``scopes`` limits a parameter to some of the categories (``{name:
+[categories]}``); it reads as missing elsewhere without a lookup.
+Revit only.
+"""
+from array import array
+
+from gjtools import profiling
+from gjtools.lazy import DB
+from gjtools.revit_params import parameter_value
+
+REGISTRY_SLOT = "gjtools.element_snapshot.registry"
+DELETED = -1
+
+try:
+    array("q")
+    ID_TYPECODE = "q"
+except ValueError:  # Python 2.7 / IronPython: no 64-bit typecode
+    ID_TYPECODE = "l"
+
+
+def _int_id(element_id):
+    return element_id.IntegerValue if element_id is not None else DELETED
+
+
+class ElementSnapshot(object):
+    """Column store for the elements of ``categories`` (all model elements when empty)."""
+
+    # Parameter not present on the element (a present but empty one reads as None)
+    MISSING = object()
+
+    __slots__ = ("categories", "built_ins", "parameters", "display_parameters", "scopes", "ids", "category_ids",
+                 "type_ids", "workset_ids", "values", "display", "_rows", "_pending", "_deleted_count",
+                 "_display_stale")
+
+    def __init__(self, categories=(), parameters=(), display=(), scopes=None):
+        self.built_ins = dict((int(c), c) for c in categories)
+        self.categories = tuple(sorted(self.built_ins))
+        self.parameters = tuple(parameters)
+        self.display_parameters = tuple(display)
+        self.scopes = _scope_sets(scopes, self.parameters)
+        self.ids = array(ID_TYPECODE)
+        self.category_ids = array(ID_TYPECODE)
+        self.type_ids = array(ID_TYPECODE)
+        self.workset_ids = array(ID_TYPECODE)
+        self.values = dict((name, []) for name in self.parameters)
+        self.display = dict((name, []) for name in self.display_parameters)
+        self._rows = {}
+        self._pending = {}
+        self._deleted_count = 0
+        self._display_stale = False
+
+    def __len__(self):
+        return len(self._rows)
+
+    def covers(self, categories, parameters=(), display=(), scopes=None):
+        if not (self.categories == tuple(sorted(set(int(c) for c in categories)))
+                and set(parameters) <= set(self.parameters) and set(display) <= set(self.display_parameters)):
+            return False
+        wanted = _scope_sets(scopes, parameters)
+        for name in parameters:
+            mine = self.scopes.get(name)
+            if mine is not None and (name not in wanted or not wanted[name] <= mine):
+                return False
+        return True
+
+    # Building ---------------------------------------------------------------
+
+    def _collector(self, doc):
+        collector = DB.FilteredElementCollector(doc).WhereElementIsNotElementType()
+        if len(self.categories) == 1:
+            return collector.OfCategory(self.built_ins[self.categories[0]])
+        if self.categories:
+            from System.Collections.Generic import List
+            categories = List[DB.BuiltInCategory]([self.built_ins[c] for c in self.categories])
+            return collector.WherePasses(DB.ElementMulticategoryFilter(categories))
+        return collector
+
+    def _extract(self, element):
+        category = element.Category
+        fields = (_int_id(element.Id), category.Id.IntegerValue if category is not None else DELETED,
+                  _int_id(element.GetTypeId()), _int_id(element.WorksetId))
+        missing = self.MISSING
+        scopes = self.scopes
+        values = []
+        for name in self.parameters:
+            if scopes and name in scopes and fields[1] not in scopes[name]:
+                values.append(missing)
+                continue
+            param = element.LookupParameter(name)
+            values.append(parameter_value(param) if param is not None else missing)
+        return fields, values, self._extract_display(element)
+
+    def _extract_display(self, element):
+        display = []
+        for name in self.display_parameters:
+            param = element.LookupParameter(name)
+            display.append(param.AsValueString() if param is not None else self.MISSING)
+        return display
+
+    def _write(self, row, extracted):
+        fields, values, display = extracted
+        self.ids[row], self.category_ids[row], self.type_ids[row], self.workset_ids[row] = fields
+        for name, value in zip(self.parameters, values):
+            self.values[name][row] = value
+        for name, value in zip(self.display_parameters, display):
+            self.display[name][row] = value
+
+    def _append(self, extracted):
+        fields, values, display = extracted
+        row = len(self.ids)
+        self.ids.append(fields[0])
+        self.category_ids.append(fields[1])
+        self.type_ids.append(fields[2])
+        self.workset_ids.append(fields[3])
+        for name, value in zip(self.parameters, values):
+            self.values[name].append(value)
+        for name, value in zip(self.display_parameters, display):
+            self.display[name].append(value)
+        self._rows[fields[0]] = row
+
+    def build(self, doc):
+        """Read every matching element in one collector pass."""
+        with profiling.phase("collect"):
+            for element in self._collector(doc):
+                self._append(self._extract(element))
+        profiling.count(elements=len(self._rows))
+        return self
+
+    # Incremental updates ----------------------------------------------------
+
+    def invalidate(self, added=(), modified=(), deleted=()):
+        """Remember changed ids (ints); cheap enough for a ``DocumentChanged`` handler."""
+        pending = self._pending
+        for element_id in added:
+            pending[element_id] = True
+        for element_id in modified:
+            pending[element_id] = True
+        for element_id in deleted:
+            pending[element_id] = False
+
+    def invalidate_display(self):
+        """Mark every display string out of date (units or Project Information changed)."""
+        if self.display_parameters:
+            self._display_stale = True
+
+    def set_value(self, element_id, name, value):
+        """Store a value the caller just wrote and committed, instead of re-reading the element.
+
+        Only valid when that parameter was the element's only change in the transaction.
+        """
+        if not isinstance(element_id, int):
+            element_id = element_id.IntegerValue
+        row = self._rows.get(element_id)
+        if row is not None:
+            self.values[name][row] = value
+            self._pending.pop(element_id, None)
+
+    @property
+    def stale(self):
+        return bool(self._pending) or self._display_stale
+
+    def _matches(self, element):
+        if element is None or isinstance(element, DB.ElementType):
+            return False
+        if not self.categories:
+            return True
+        return element.Category is not None and element.Category.Id.IntegerValue in self.categories
+
+    def refresh(self, doc):
+        """Re-read the rows changed since the last refresh; returns how many were touched."""
+        pending, self._pending = self._pending, {}
+        if self._display_stale:
+            self._refresh_display(doc, pending)
+        for element_id, exists in pending.items():
+            element = doc.GetElement(DB.ElementId(element_id)) if exists else None
+            row = self._rows.get(element_id)
+            if not self._matches(element):
+                if row is not None:
+                    self._drop(element_id, row)
+            elif row is None:
+                self._append(self._extract(element))
+            else:
+                self._write(row, self._extract(element))
+        if self._deleted_count > 1000 and self._deleted_count * 4 > len(self.ids):
+            self.compact()
+        return len(pending)
+
+    def _refresh_display(self, doc, pending):
+        self._display_stale = False
+        for element_id, row in self._rows.items():
+            if element_id in pending:
+                continue
+            element = doc.GetElement(DB.ElementId(element_id))
+            if element is None:
+                pending[element_id] = False
+                continue
+            for name, value in zip(self.display_parameters, self._extract_display(element)):
+                self.display[name][row] = value
+
+    def _drop(self, element_id, row):
+        del self._rows[element_id]
+        self.ids[row] = DELETED
+        self._deleted_count += 1
+
+    def compact(self):
+        """Drop the rows of deleted elements."""
+        keep = [row for row in range(len(self.ids)) if self.ids[row] != DELETED]
+        for name in ("ids", "category_ids", "type_ids", "workset_ids"):
+            column = getattr(self, name)
+            setattr(self, name, array(ID_TYPECODE, [column[row] for row in keep]))
+        for columns in (self.values, self.display):
+            for name, column in columns.items():
+                columns[name] = [column[row] for row in keep]
+        self._rows = dict((self.ids[row], row) for row in range(len(keep)))
+        self._deleted_count = 0
+
+    # Queries ----------------------------------------------------------------
+
+    def row(self, element_id):
+        """Row of an element id (``ElementId`` or int), or None."""
+        if not isinstance(element_id, int):
+            element_id = element_id.IntegerValue
+        return self._rows.get(element_id)
+
+    def rows(self, category=None, workset_id=None):
+        """Live rows, optionally of one category / workset (ids as ints or enums)."""
+        category = int(category) if category is not None else None
+        for row in range(len(self.ids)):
+            if self.ids[row] == DELETED:
+                continue
+            if category is not None and self.category_ids[row] != category:
+                continue
+            if workset_id is not None and self.workset_ids[row] != workset_id:
+                continue
+            yield row
+
+    def value(self, row, name):
+        """Raw value of a snapshot parameter; None when empty, ``self.MISSING`` when absent."""
+        return self.values[name][row]
+
+    def display_value(self, row, name):
+        return self.display[name][row]
+
+    def element_id(self, row):
+        return DB.ElementId(self.ids[row])
+
+
+def _scope_sets(scopes, parameters):
+    return dict((name, frozenset(int(c) for c in categories)) for name, categories in (scopes or {}).items()
+                if name in parameters)
+
+
+def _merge_scopes(old, parameters, scopes):
+    """Scopes of ``old`` widened by a request; a parameter unscoped on either side is read everywhere."""
+    wanted = _scope_sets(scopes, parameters)
+    merged = {}
+    for name in set(old.parameters).union(parameters):
+        if (name in old.parameters and name not in old.scopes) or (name in parameters and name not in wanted):
+            continue
+        merged[name] = old.scopes.get(name, frozenset()) | wanted.get(name, frozenset())
+    return merged
+
+
+def document_key(doc):
+    """Registry key of an open document: its path, or its title while it is unsaved."""
+    return doc.PathName or doc.Title
+
+
+def _same_document(stored, doc):
+    return stored is doc or (stored.IsValidObject and stored.Equals(doc))
+
+
+def _project_info_id(doc):
+    project_info = doc.ProjectInformation
+    return project_info.Id.IntegerValue if project_info is not None else DELETED
+
+
+class SnapshotRegistry(object):
+    """Snapshots per document, kept current by ``DocumentChanged``."""
+
+    def __init__(self, app):
+        self.app = app
+        self.snapshots = {}
+        # Key -> the document its snapshots were built from
+        self.documents = {}
+        self.project_info_ids = {}
+        self.subscribed = False
+
+    def subscribe(self):
+        if not self.subscribed:
+            self.app.DocumentChanged += self._on_document_changed
+            self.app.DocumentClosing += self._on_document_closing
+            self.subscribed = True
+
+    def unsubscribe(self):
+        if self.subscribed:
+            self.app.DocumentChanged -= self._on_document_changed
+            self.app.DocumentClosing -= self._on_document_closing
+            self.subscribed = False
+
+    def _snapshots(self, doc):
+        """Snapshots built from ``doc``, or None; drops those of another document under the same key."""
+        key = document_key(doc)
+        stored = self.documents.get(key)
+        if stored is None:
+            return None
+        if not _same_document(stored, doc):
+            self._drop(key)
+            return None
+        return self.snapshots.get(key)
+
+    def _on_document_changed(self, sender, args):
+        doc = args.GetDocument()
+        snapshots = self._snapshots(doc)
+        if not snapshots:
+            return
+        added = [i.IntegerValue for i in args.GetAddedElementIds()]
+        modified = [i.IntegerValue for i in args.GetModifiedElementIds()]
+        deleted = [i.IntegerValue for i in args.GetDeletedElementIds()]
+        units_changed = any(s.display_parameters for s in snapshots) and self._units_changed(args, doc, modified)
+        for snapshot in snapshots:
+            snapshot.invalidate(added, modified, deleted)
+            if units_changed:
+                snapshot.invalidate_display()
+
+    def _units_changed(self, args, doc, modified):
+        """True when a change can alter display strings: the units or the Project Information."""
+        if any("units" in name.lower() for name in args.GetTransactionNames()):
+            return True
+        key = document_key(doc)
+        if key not in self.project_info_ids:
+            self.project_info_ids[key] = _project_info_id(doc)
+        return self.project_info_ids[key] in modified
+
+    def _on_document_closing(self, sender, args):
+        self.forget(args.Document)
+
+    def _drop(self, key):
+        self.snapshots.pop(key, None)
+        self.documents.pop(key, None)
+        self.project_info_ids.pop(key, None)
+
+    def forget(self, doc):
+        """Drop the snapshots of ``doc``, also those kept under its path before a Save As."""
+        for key, stored in list(self.documents.items()):
+            if key == document_key(doc) or not stored.IsValidObject or stored.Equals(doc):
+                self._drop(key)
+
+    def get(self, doc, categories=(), parameters=(), display=(), scopes=None):
+        """Current snapshot covering the request; built (or widened) when needed, always when not subscribed."""
+        if not self.subscribed:
+            self.forget(doc)
+        snapshots = self._snapshots(doc)
+        if snapshots is None:
+            key = document_key(doc)
+            snapshots = self.snapshots[key] = []
+            self.documents[key] = doc
+        for snapshot in snapshots:
+            if snapshot.covers(categories, parameters, display, scopes):
+                if snapshot.stale:
+                    with profiling.phase("collect"):
+                        snapshot.refresh(doc)
+                return snapshot
+        wanted = ElementSnapshot(categories)
+        # Keep the fields of a narrower snapshot of the same categories, then replace it
+        for snapshot in list(snapshots):
+            if snapshot.categories == wanted.categories:
+                scopes = _merge_scopes(snapshot, parameters, scopes)
+                parameters = list(snapshot.parameters) + [p for p in parameters if p not in snapshot.parameters]
+                display = list(snapshot.display_parameters) + [p for p in display
+                                                               if p not in snapshot.display_parameters]
+                snapshots.remove(snapshot)
+        snapshot = ElementSnapshot(categories, parameters, display, scopes).build(doc)
+        snapshots.append(snapshot)
+        return snapshot
+
+
+_local_registry = []
+
+
+def _app_domain():
+    try:
+        from System import AppDomain
+    except ImportError:
+        return None
+    return AppDomain.CurrentDomain
+
+
+def _stored_registry():
+    domain = _app_domain()
+    if domain is not None:
+        return domain.GetData(REGISTRY_SLOT)
+    return _local_registry[0] if _local_registry else None
+
+
+def _store_registry(current):
+    domain = _app_domain()
+    if domain is not None:
+        domain.SetData(REGISTRY_SLOT, current)
+    else:
+        _local_registry[:] = [current]
+
+
+def registry(app):
+    """The session's ``SnapshotRegistry`` (AppDomain slot, shared by all script engines).
+
+    Revit has one ``Application`` per session, so an existing registry is reused
+    as is. A registry made here is not subscribed: a button's engine may be
+    gone before the next ``DocumentChanged``, see ``install``.
+    """
+    current = _stored_registry()
+    if current is None:
+        current = SnapshotRegistry(app)
+        _store_registry(current)
+    return current
+
+
+def install(app):
+    """Replace any previous registry with a new subscribed one and return it.
+
+    Called from the startup script, whose engine outlives the buttons.
+    """
+    previous = _stored_registry()
+    if previous is not None:
+        previous.unsubscribe()
+    current = SnapshotRegistry(app)
+    current.subscribe()
+    _store_registry(current)
+    return current
+
+
+def get(doc, categories=(), parameters=(), display=(), scopes=None):
+    """Shared snapshot of ``doc``; see ``SnapshotRegistry.get``."""
+    return registry(doc.Application).get(doc, categories, parameters, display, scopes)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Bulk helpers for Excel COM interop (Windows / IronPython only).
+
+Every helper moves a whole block per call: crossing the process boundary to
+Excel costs far more than anything done to the data on the Python side.
+"""
+from gjtools.plugin_status import range_address
+
+
+def get_range(sheet, row1, col1, row2, col2):
+    return sheet.Range(range_address(row1, col1, row2, col2))
+
+
+def read_block(sheet, row1, col1, row2, col2):
+    """Values of a rectangular block as a list of rows, in one Value2 call."""
+    nrows = row2 - row1 + 1
+    ncols = col2 - col1 + 1
+    if nrows <= 0 or ncols <= 0:
+        return []
+    values = get_range(sheet, row1, col1, row2, col2).Value2
+    if nrows == 1 and ncols == 1:
+        return [[values]]
+    # Multi-cell Value2 is a 1-based object[,]
+    base_r = values.GetLowerBound(0)
+    base_c = values.GetLowerBound(1)
+    return [[values.GetValue(base_r + r, base_c + c) for c in range(ncols)]
+            for r in range(nrows)]
+
+
+def write_block(sheet, row1, col1, rows):
+    """Write a list of equally long rows starting at (row1, col1) in one call."""
+    if not rows or not rows[0]:
+        return
+    from System import Array, Object
+    nrows = len(rows)
+    ncols = len(rows[0])
+    data = Array.CreateInstance(Object, nrows, ncols)
+    for r, row_values in enumerate(rows):
+        for c, value in enumerate(row_values):
+            data[r, c] = value
+    get_range(sheet, row1, col1, row1 + nrows - 1, col1 + ncols - 1).Value2 = data
+
+
+def last_used_row(sheet):
+    used = sheet.UsedRange
+    return used.Row + used.Rows.Count - 1
+
+
+def last_used_column(sheet):
+    used = sheet.UsedRange
+    return used.Column + used.Columns.Count - 1
+
+
+def fill_addresses(sheet, addresses, color):
+    """Apply one Interior color to each comma separated address chunk."""
+    for address in addresses:
+        sheet.Range(address).Interior.Color = color
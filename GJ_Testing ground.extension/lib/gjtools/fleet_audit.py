@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""Machine-readable fleet audit records and their streaming aggregator.
+
+version-INFO writes one ``<PC> - Revit Addins <year>.jsonl`` (or ``.csv``)
+file per workstation, one record per add-in. The aggregator reads the
+files on a thread pool, skipping those whose (mtime, size) did not change
+since a ``plugin_reports.ReportCache`` saw them, into one consolidated CSV
+table and a PC x add-in matrix. The matrix converts directly into the
+``{year: {pc: {plugin: status}}}`` shape the STATUS workbook is updated from.
+
+    cd "GJ_Testing ground.extension/lib"
+    python -m gjtools.fleet_audit AUDIT_FOLDER --table fleet.csv --matrix matrix.csv
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import sys
+
+from gjtools.plugin_reports import ReportCache
+from gjtools.plugin_status import INSTALLED, find_year
+from gjtools.workers import DEFAULT_WORKERS, thread_map
+
+SCHEMA_VERSION = 1
+FIELDS = ("schema", "pc", "revit_version", "revit_build", "addin_name", "vendor",
+          "addin_id", "assembly_version", "assembly_path", "manifest")
+AUDIT_PATTERN = re.compile(r"^(?P<pc>.+?) - Revit Addins (?P<year>\d{4})\.(?P<ext>jsonl|csv)$", re.IGNORECASE)
+
+
+def audit_file_name(pc, year, ext="jsonl"):
+    return u"{} - Revit Addins {}.{}".format(pc, year, ext)
+
+
+def audit_key(file_name):
+    """``(pc, year)`` for an audit file name, or None for other files."""
+    match = AUDIT_PATTERN.match(file_name)
+    if not match:
+        return None
+    return match.group("pc").strip(), match.group("year")
+
+
+def make_records(pc, revit_version, revit_build, addin_records):
+    """Audit dicts for ``gjtools.addins.AddinRecord`` objects of one workstation.
+
+    Records found in another Revit year's add-in folder carry that year
+    instead of the running Revit's version and build.
+    """
+    running_year = find_year(revit_version)
+    records = []
+    for record in addin_records:
+        year = getattr(record, "year", None)
+        if year and year != running_year:
+            version, build = u"Autodesk Revit {}".format(year), u""
+        else:
+            version, build = revit_version, revit_build
+        records.append({
+            "schema": SCHEMA_VERSION,
+            "pc": pc,
+            "revit_version": version,
+            "revit_build": build,
+            "addin_name": record.name,
+            "vendor": record.vendor,
+            "addin_id": record.addin_id,
+            "assembly_version": record.version,
+            "assembly_path": record.assembly,
+            "manifest": record.manifest,
+        })
+    return records
+
+
+def write_jsonl(path, records):
+    with io.open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(u"{}\n".format(json.dumps(record, sort_keys=True)))
+
+
+def _open_csv(path, mode):
+    if sys.version_info[0] < 3:
+        return open(path, mode + "b")
+    return io.open(path, mode, encoding="utf-8-sig" if mode == "r" else "utf-8", newline="")
+
+
+def write_csv(path, records, fields=FIELDS):
+    with _open_csv(path, "w") as f:
+        writer = csv.DictWriter(f, fields, extrasaction="ignore")
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+
+
+def list_audit_files(folder):
+    """``[(path, mtime, size)]`` of the audit files, sorted by name."""
+    files = []
+    for name in sorted(os.listdir(folder)):
+        if AUDIT_PATTERN.match(name):
+            path = os.path.join(folder, name)
+            st = os.stat(path)
+            files.append((path, st.st_mtime, st.st_size))
+    return files
+
+
+def iter_records(path, errors=None):
+    """Stream the records of one audit file; bad lines go to ``errors``."""
+    if path.lower().endswith(".csv"):
+        with _open_csv(path, "r") as f:
+            for line_number, record in enumerate(csv.DictReader(f), 2):
+                if _valid(record, path, line_number, errors):
+                    yield record
+        return
+    with io.open(path, "r", encoding="utf-8-sig") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                if errors is not None:
+                    errors.append((path, line_number, "invalid JSON: {}".format(error)))
+                continue
+            if _valid(record, path, line_number, errors):
+                yield record
+
+
+def _valid(record, path, line_number, errors):
+    try:
+        schema = int(record.get("schema") or 0)
+    except ValueError:
+        schema = 0
+    if schema != SCHEMA_VERSION:
+        if errors is not None:
+            errors.append((path, line_number, "unsupported schema {!r}".format(record.get("schema"))))
+        return False
+    if not record.get("pc") or not record.get("addin_name"):
+        if errors is not None:
+            errors.append((path, line_number, "missing pc or addin_name"))
+        return False
+    return True
+
+
+class AddinMatrix(object):
+    """PC x add-in presence (with versions) per Revit year."""
+
+    def __init__(self):
+        self.cells = {}   # year -> pc -> addin name -> assembly version
+        self.addins = {}  # year -> set of addin names
+
+    def add(self, record):
+        year = find_year(record.get("revit_version")) or ""
+        name = record["addin_name"]
+        self.cells.setdefault(year, {}).setdefault(record["pc"], {})[name] = record.get("assembly_version") or ""
+        self.addins.setdefault(year, set()).add(name)
+
+    @property
+    def pcs(self):
+        return sorted(set(pc for by_pc in self.cells.values() for pc in by_pc))
+
+    def statuses_by_year(self):
+        """``{year: {pc: {addin: INSTALLED}}}``; absent add-ins become NOT INSTALLED in the sheet."""
+        return {year: {pc: {name: INSTALLED for name in names} for pc, names in by_pc.items()}
+                for year, by_pc in self.cells.items()}
+
+    def rows(self, year):
+        """Header and rows of the matrix for one year, versions in the cells."""
+        names = sorted(self.addins.get(year, ()))
+        by_pc = self.cells.get(year, {})
+        yield ["pc"] + names
+        for pc in sorted(by_pc):
+            present = by_pc[pc]
+            yield [pc] + [present.get(name, "") for name in names]
+
+
+def read_audit_file(path):
+    """``{"records": [...], "errors": [[line_number, message]]}`` of one audit file, as cached."""
+    errors = []
+    records = list(iter_records(path, errors))
+    return {"records": records, "errors": [[line_number, message] for _, line_number, message in errors]}
+
+
+def aggregate(folder, table_path=None, errors=None, cache=None, workers=DEFAULT_WORKERS, progress=None):
+    """Read every audit file of ``folder``, unchanged files from ``cache``.
+
+    Writes the consolidated table to ``table_path`` (CSV) when given and
+    returns ``(AddinMatrix, file_count, record_count)``. A file that cannot
+    be read is listed in ``errors`` and keeps its records from the cache.
+    """
+    cache = cache or ReportCache()
+    files = list_audit_files(folder)
+    entries = [cache.get(path, mtime, size) for path, mtime, size in files]
+    to_read = [index for index, entry in enumerate(entries) if entry is None]
+    results = thread_map(lambda index: read_audit_file(files[index][0]), to_read, workers, progress)
+    for index, (entry, error) in zip(to_read, results):
+        path, mtime, size = files[index]
+        if error is not None:
+            if errors is not None:
+                errors.append((path, 0, "could not read: {}".format(error)))
+            entries[index] = cache.last(path)
+            continue
+        entries[index] = entry
+        cache.put(path, mtime, size, entry)
+    cache.prune([path for path, _, _ in files])
+    cache.save()
+
+    matrix = AddinMatrix()
+    count = 0
+    table = writer = None
+    if table_path:
+        table = _open_csv(table_path, "w")
+        writer = csv.DictWriter(table, FIELDS, extrasaction="ignore")
+        writer.writeheader()
+    try:
+        for (path, _, _), entry in zip(files, entries):
+            if entry is None:
+                continue
+            if errors is not None:
+                errors.extend((path, line_number, message) for line_number, message in entry["errors"])
+            for record in entry["records"]:
+                matrix.add(record)
+                if writer is not None:
+                    writer.writerow(record)
+                count += 1
+    finally:
+        if table is not None:
+            table.close()
+    return matrix, len(files), count
+
+
+def merge_statuses(target, source):
+    """Merge ``{year: {pc: {plugin: status}}}`` ``source`` into ``target``; ``target`` wins."""
+    for year, by_pc in source.items():
+        target_year = target.setdefault(year, {})
+        for pc, statuses in by_pc.items():
+            merged = dict(statuses)
+            merged.update(target_year.get(pc, {}))
+            target_year[pc] = merged
+    return target
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Aggregate per-PC add-in audit files.")
+    parser.add_argument("folder", help="folder with '<PC> - Revit Addins <year>.jsonl/.csv' files")
+    parser.add_argument("--table", help="write the consolidated table to this CSV")
+    parser.add_argument("--matrix", help="write the PC x add-in matrix to this CSV (one per year if several)")
+    parser.add_argument("--cache", help="JSON file caching parsed audit files between runs")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="threads reading audit files (default: %(default)s)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    errors = []
+    matrix, files, records = aggregate(args.folder, args.table, errors, ReportCache(args.cache), args.workers)
+    print("{} files, {} records, {} PCs.".format(files, records, len(matrix.pcs)))
+    if args.matrix:
+        years = sorted(matrix.cells)
+        for year in years:
+            path = args.matrix
+            if len(years) > 1:
+                root, ext = os.path.splitext(args.matrix)
+                path = "{} {}{}".format(root, year, ext)
+            with _open_csv(path, "w") as f:
+                csv.writer(f).writerows(matrix.rows(year))
+    for path, line_number, message in errors:
+        print("{}:{}: {}".format(path, line_number, message))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
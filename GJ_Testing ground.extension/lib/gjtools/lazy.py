@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Lazily imported .NET namespaces.
+
+``from Autodesk.Revit.DB import *`` copies thousands of names into every
+button module, and WinForms/WPF/Excel interop assemblies take a while to
+load. A ``LazyNamespace`` stands in for the namespace and only adds the
+assembly reference and imports it on first attribute access; resolved
+attributes are cached on the instance, so later lookups are plain
+attribute reads.
+
+    from gjtools.lazy import DB
+    collector = DB.FilteredElementCollector(doc)    # RevitAPI imported here
+"""
+import importlib
+
+
+class LazyNamespace(object):
+    """Module proxy that imports ``name`` (after ``clr.AddReference(assembly)``) when first used."""
+
+    def __init__(self, name, assembly=None):
+        self.__dict__["_name"] = name
+        self.__dict__["_assembly"] = assembly
+        self.__dict__["_module"] = None
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def load(self):
+        module = self._module
+        if module is None:
+            if self._assembly:
+                import clr
+                clr.AddReference(self._assembly)
+            module = importlib.import_module(self._name)
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        value = getattr(self.load(), attr)
+        self.__dict__[attr] = value
+        return value
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("{} is read-only".format(self._name))
+
+    def __repr__(self):
+        return "<LazyNamespace {!r}{}>".format(self._name, " (loaded)" if self.loaded else "")
+
+
+DB = LazyNamespace("Autodesk.Revit.DB", "RevitAPI")
+UI = LazyNamespace("Autodesk.Revit.UI", "RevitAPIUI")
+WinForms = LazyNamespace("System.Windows.Forms", "System.Windows.Forms")
+Wpf = LazyNamespace("System.Windows", "PresentationFramework")
+Excel = LazyNamespace("Microsoft.Office.Interop.Excel", "Microsoft.Office.Interop.Excel")
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""Curtain panel dimension checks behind the Filter&Stuff buttons.
+
+Panels whose Height/Width display strings do not end in a "nice" digit get
+a CHECK_STATUS comment, and view filters colour them by that comment.
+Panel values are read from the shared element snapshot, so repeated checks
+only touch the panels whose comment changes; in a workshared model those
+are checked out in bulk first and panels owned by others are left alone.
+``check_comment`` is plain Python; the rest needs a Revit document.
+"""
+from gjtools import element_snapshot, profiling, revit_collectors, tool_log, worksharing
+from gjtools.lazy import DB
+from gjtools.revit_transactions import transaction
+
+CHECK_STATUS = "CHECK_STATUS"
+CHECK_HEIGHT = "CHECK HEIGHT"
+CHECK_WIDTH = "CHECK WIDTH"
+CHECK_ALL = "CHECK ALL"
+FILTER_COLORS = [(CHECK_HEIGHT, (255, 0, 0)), (CHECK_WIDTH, (0, 255, 64)), (CHECK_ALL, (0, 255, 255))]
+
+HEIGHT_ENDINGS = ("5", "0", "0.1")
+WIDTH_ENDINGS = ("5", "0")
+# The Copy Paste button only accepts heights on a 10 step
+STRICT_HEIGHT_ENDINGS = ("0", "0.1")
+
+_OVERRIDE_PATTERNS = ("SetSurfaceForegroundPatternId", "SetSurfaceBackgroundPatternId",
+                      "SetCutForegroundPatternId", "SetCutBackgroundPatternId")
+_OVERRIDE_COLORS = ("SetSurfaceForegroundPatternColor", "SetSurfaceBackgroundPatternColor",
+                    "SetCutForegroundPatternColor", "SetCutBackgroundPatternColor")
+
+
+def check_comment(height, width, height_endings=HEIGHT_ENDINGS, width_endings=WIDTH_ENDINGS):
+    """CHECK_STATUS text for a panel's Height/Width strings (None = parameter missing)."""
+    comments = []
+    if height is not None and not height.endswith(height_endings):
+        comments.append(CHECK_HEIGHT)
+    if width is not None and not width.endswith(width_endings):
+        comments.append(CHECK_WIDTH)
+    if len(comments) == 2:
+        return CHECK_ALL
+    return ", ".join(comments)
+
+
+def panel_snapshot(doc):
+    return element_snapshot.get(doc, [DB.BuiltInCategory.OST_CurtainWallPanels],
+                                parameters=[CHECK_STATUS], display=["Height", "Width"])
+
+
+def check_panel_dimensions(doc, view, height_endings=HEIGHT_ENDINGS):
+    """Update CHECK_STATUS on the curtain panels in ``view``; returns ``(modified, status_found)``."""
+    snapshot = panel_snapshot(doc)
+    with profiling.phase("collect"):
+        panel_ids = revit_collectors.collector(doc, view).OfCategory(
+            DB.BuiltInCategory.OST_CurtainWallPanels).ToElementIds()
+    missing = snapshot.MISSING
+    updates = []
+    checked_count = 0
+    with profiling.phase("compute"):
+        for panel_id in panel_ids:
+            row = snapshot.row(panel_id)
+            if row is None or snapshot.value(row, CHECK_STATUS) is missing:
+                continue
+            checked_count += 1
+            height = snapshot.display_value(row, "Height")
+            width = snapshot.display_value(row, "Width")
+            new_comment = check_comment(None if height is missing else height,
+                                        None if width is missing else width, height_endings)
+            if snapshot.value(row, CHECK_STATUS) != new_comment:
+                updates.append((panel_id, new_comment))
+                tool_log.debug("Panel {}: {} x {} -> '{}'", snapshot.ids[row], height, width, new_comment)
+    if updates:
+        checkout = worksharing.checkout(doc, [panel_id for panel_id, _ in updates])
+        if checkout.blocked:
+            tool_log.warning("{} panels are owned by other users and keep their comment ({}).",
+                             len(checkout.blocked), checkout.summary())
+            updates = [(panel_id, comment) for panel_id, comment in updates if checkout.can_edit(panel_id)]
+    if updates:
+        with transaction(doc, "Update Comments on Curtain Panels"), profiling.phase("write"):
+            for panel_id, new_comment in updates:
+                doc.GetElement(panel_id).LookupParameter(CHECK_STATUS).Set(new_comment)
+        for panel_id, new_comment in updates:
+            snapshot.set_value(panel_id, CHECK_STATUS, new_comment)
+    profiling.count(elements=len(panel_ids))
+    return len(updates), checked_count > 0
+
+
+def run_dimension_check(doc, view, height_endings=HEIGHT_ENDINGS):
+    modified_count, check_status_found = check_panel_dimensions(doc, view, height_endings)
+    if check_status_found:
+        tool_log.info("Operation complete. {} elements were modified.", modified_count)
+    else:
+        tool_log.warning("Dodajte shared parameter CHECK_STATUS za Curtain Panels da bi skripta pravilno radila")
+
+
+def _delete_check_filters(doc):
+    for element_id in revit_collectors.ids_by_name(doc, DB.ParameterFilterElement, [name for name, _ in FILTER_COLORS]).values():
+        doc.Delete(element_id)
+
+
+def _create_filter(doc, view, filter_name, color, solid_fill_pattern, parameter_id):
+    from System.Collections.Generic import List
+    categories = List[DB.ElementId]([DB.ElementId(DB.BuiltInCategory.OST_CurtainWallPanels)])
+    filter_element = DB.ParameterFilterElement.Create(doc, filter_name, categories)
+    rule = DB.FilterStringRule(DB.ParameterValueProvider(parameter_id), DB.FilterStringEquals(), filter_name, False)
+    filter_element.SetElementFilter(DB.ElementParameterFilter(rule))
+    view.AddFilter(filter_element.Id)
+
+    overrides = DB.OverrideGraphicSettings()
+    for method in _OVERRIDE_PATTERNS:
+        getattr(overrides, method)(solid_fill_pattern.Id)
+    for method in _OVERRIDE_COLORS:
+        getattr(overrides, method)(DB.Color(*color))
+    view.SetFilterOverrides(filter_element.Id, overrides)
+    return filter_element.Id
+
+
+def apply_check_filters(doc, view, check_status_param_id, solid_fill_pattern):
+    """Replace the CHECK filters and apply them to ``view`` (call inside a transaction).
+
+    Returns ``{filter name: ElementId}`` of the new filters.
+    """
+    _delete_check_filters(doc)
+    return dict((filter_name, _create_filter(doc, view, filter_name, color, solid_fill_pattern, check_status_param_id))
+                for filter_name, color in FILTER_COLORS)
+
+
+def create_check_filters(doc, view):
+    """(Re)create the CHECK filters with solid colour overrides in ``view``."""
+    check_status_param_id = revit_collectors.parameter_element_id(doc, CHECK_STATUS)
+    if view.ViewTemplateId.IntegerValue != -1 or check_status_param_id is None:
+        tool_log.error("CREATION OF FILTERS NOT POSSIBLE WHILE VIEW TEMPLATE IS APPLIED. PLEASE CHECK IF YOU ARE ON CORRECT WORKING VIEW.")
+        return
+    with transaction(doc, "Create Filters"), profiling.phase("write"):
+        solid_fill_pattern = revit_collectors.solid_fill_pattern(doc)
+        if solid_fill_pattern is None:
+            tool_log.error("Solid fill pattern not found. Add logic to create one if needed.")
+            return
+        apply_check_filters(doc, view, check_status_param_id, solid_fill_pattern)
+
+
+def remove_check_filters(doc):
+    with transaction(doc, "Delete Filters"), profiling.phase("write"):
+        _delete_check_filters(doc)
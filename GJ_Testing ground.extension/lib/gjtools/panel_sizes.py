@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Curtain panel size classes for fabrication, behind the Panel Sizes button.
+
+Panel Height/Width are read as numbers from the shared element snapshot,
+converted to millimetres and quantized to a tolerance; panels with the same
+quantized size form one size class::
+
+    snapshot = panel_snapshot(doc)
+    classes = group_panels(read_panels(snapshot), tolerance=1.0)
+    write_csv(path, classes)
+
+Classes are ordered by height, then width, and coded ``P001``, ``P002``...
+so the codes only change when sizes are added or removed. ``group_panels``,
+``histogram``, ``outliers`` and ``write_csv`` are plain Python; reading the
+panels and writing the codes back need a Revit document.
+"""
+import csv
+import io
+import math
+import sys
+
+from gjtools import element_snapshot, profiling, revit_collectors, worksharing
+from gjtools.lazy import DB
+
+HEIGHT = "Height"
+WIDTH = "Width"
+MM_PER_FOOT = 304.8
+DEFAULT_TOLERANCE = 1.0
+CODE_PREFIX = "P"
+CSV_FIELDS = ("Code", "Height", "Width", "Panels", "Share %", "Outlier")
+
+
+class SizeClass(object):
+    """Panels whose quantized height and width are equal; sizes are nominal (mm)."""
+
+    __slots__ = ("code", "height", "width", "element_ids")
+
+    def __init__(self, height, width, element_ids):
+        self.code = None
+        self.height = height
+        self.width = width
+        self.element_ids = element_ids
+
+    @property
+    def count(self):
+        return len(self.element_ids)
+
+
+def quantize(value, tolerance):
+    """Index of the ``tolerance`` step nearest to ``value`` (halves round up)."""
+    return int(math.floor(value / tolerance + 0.5))
+
+
+def _nominal(step, tolerance):
+    return round(step * tolerance, 6)
+
+
+@profiling.phased("compute")
+def group_panels(panels, tolerance=DEFAULT_TOLERANCE, prefix=CODE_PREFIX):
+    """``[SizeClass]`` for ``(element_id, height_mm, width_mm)`` tuples, coded in size order."""
+    if tolerance <= 0:
+        raise ValueError("The size tolerance must be positive.")
+    groups = {}
+    for element_id, height, width in panels:
+        key = (quantize(height, tolerance), quantize(width, tolerance))
+        members = groups.get(key)
+        if members is None:
+            groups[key] = [element_id]
+        else:
+            members.append(element_id)
+    classes = [SizeClass(_nominal(h, tolerance), _nominal(w, tolerance), groups[(h, w)]) for h, w in sorted(groups)]
+    digits = max(3, len(str(len(classes))))
+    for number, size_class in enumerate(classes, 1):
+        size_class.code = "{}{:0{}d}".format(prefix, number, digits)
+    return classes
+
+
+def histogram(classes, dimension):
+    """``[(nominal size, panel count)]`` of ``"height"`` or ``"width"``, by size."""
+    counts = {}
+    for size_class in classes:
+        value = getattr(size_class, dimension)
+        counts[value] = counts.get(value, 0) + size_class.count
+    return sorted(counts.items())
+
+
+def outliers(classes, max_count=1):
+    """Size classes with at most ``max_count`` panels (one-off sizes)."""
+    return [size_class for size_class in classes if size_class.count <= max_count]
+
+
+def _open_csv(path):
+    if sys.version_info[0] < 3:
+        return open(path, "wb")
+    return io.open(path, "w", encoding="utf-8", newline="")
+
+
+def write_csv(path, classes, total=None, outlier_count=1):
+    """One row per size class (``CSV_FIELDS``); ``total`` is the panel count the shares refer to."""
+    total = total or sum(size_class.count for size_class in classes) or 1
+    with _open_csv(path) as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        for size_class in classes:
+            writer.writerow([size_class.code, "{:g}".format(size_class.height), "{:g}".format(size_class.width),
+                             size_class.count, "{:.2f}".format(100.0 * size_class.count / total),
+                             "yes" if size_class.count <= outlier_count else ""])
+
+
+# Revit -----------------------------------------------------------------------
+
+def panel_snapshot(doc, code_parameter=None):
+    """Shared panel snapshot with raw Height/Width (and the size code parameter, if any)."""
+    parameters = [HEIGHT, WIDTH] + ([code_parameter] if code_parameter else [])
+    return element_snapshot.get(doc, [DB.BuiltInCategory.OST_CurtainWallPanels], parameters=parameters)
+
+
+def read_panels(snapshot, doc=None, view=None, scale=MM_PER_FOOT):
+    """``(element_id, height_mm, width_mm)`` of the snapshot's panels (only those in ``view`` if given).
+
+    Panels without a numeric Height or Width are left out.
+    """
+    if view is not None:
+        with profiling.phase("collect"):
+            rows = [snapshot.row(panel_id) for panel_id in revit_collectors.collector(doc, view).OfCategory(
+                DB.BuiltInCategory.OST_CurtainWallPanels).ToElementIds()]
+        rows = [row for row in rows if row is not None]
+    else:
+        rows = snapshot.rows()
+    heights = snapshot.values[HEIGHT]
+    widths = snapshot.values[WIDTH]
+    ids = snapshot.ids
+    panels = []
+    with profiling.phase("compute"):
+        for row in rows:
+            height = heights[row]
+            width = widths[row]
+            if isinstance(height, float) and isinstance(width, float):
+                panels.append((ids[row], height * scale, width * scale))
+    profiling.count(elements=len(panels))
+    return panels
+
+
+def code_changes(doc, snapshot, classes, parameter):
+    """``(changes, checkout, missing)`` for writing the size codes to ``parameter``.
+
+    ``changes`` are the ``(element_id, code)`` of panels whose code differs and that this
+    user can edit (checked out in bulk, see ``worksharing``); ``missing`` counts the panels
+    without the parameter.
+    """
+    absent = snapshot.MISSING
+    changes = []
+    missing = 0
+    for size_class in classes:
+        for element_id in size_class.element_ids:
+            row = snapshot.row(element_id)
+            current = snapshot.value(row, parameter) if row is not None else absent
+            if current is absent:
+                missing += 1
+            elif current != size_class.code:
+                changes.append((element_id, size_class.code))
+    checkout = worksharing.checkout(doc, [DB.ElementId(element_id) for element_id, _ in changes])
+    if checkout.blocked:
+        changes = [change for change in changes if checkout.can_edit(change[0])]
+    return changes, checkout, missing
+
+
+def write_codes(doc, changes, parameter):
+    """Write the ``code_changes`` (call inside a transaction); returns ``(written, read_only)``."""
+    written = []
+    read_only = 0
+    with profiling.phase("write"):
+        for element_id, code in changes:
+            param = doc.GetElement(DB.ElementId(element_id)).LookupParameter(parameter)
+            if param is None or param.IsReadOnly:
+                read_only += 1
+                continue
+            param.Set(code)
+            written.append((element_id, code))
+    return written, read_only
+
+
+def remember_codes(snapshot, written, parameter):
+    """Record committed codes in the snapshot (after the ``write_codes`` transaction)."""
+    for element_id, code in written:
+        snapshot.set_value(element_id, parameter, code)
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""WinForms parameter picker used by the Copy Parameter Value button.
+
+Imported only when the dialog is about to be shown, so the WinForms
+assembly is not loaded on clicks that end before it (e.g. empty selection).
+"""
+import clr
+clr.AddReference('System.Windows.Forms')
+
+from System import Array, Object
+from System.Windows.Forms import (
+    Form, ListBox, Button, DialogResult, CheckBox, Label, DockStyle, SelectionMode, Panel, TextBox
+)
+
+from gjtools.param_index import ParameterIndex
+
+
+class ParameterForm(Form):
+    def __init__(self, index, title):
+        self.Text = title
+        # Adjust the form size as needed
+        self.Width = 500  # <-- Adjust form width here
+        self.Height = 600  # <-- Adjust form height here
+
+        self.index = index  # Shared ParameterIndex, built once for both dialogs
+
+        self.search_box = TextBox()
+        self.search_box.Dock = DockStyle.Top
+        self.search_box.TextChanged += self.refresh_listbox
+        self.Controls.Add(self.search_box)
+
+        self.label = Label()
+        self.label.Text = title + " (type to filter)"
+        self.label.Dock = DockStyle.Top
+        self.Controls.Add(self.label)
+
+        # Panel to contain the ListBox and enable scrolling
+        self.panel = Panel()
+        self.panel.Dock = DockStyle.Fill
+        self.panel.AutoScroll = True
+
+        self.listbox = ListBox()
+        self.listbox.SelectionMode = SelectionMode.One  # Use the enumeration value
+        # Adjust the ListBox size as needed
+        self.listbox.Width = 460  # <-- Adjust ListBox width here
+        self.listbox.Height = 400  # <-- Adjust ListBox height here
+
+        self.panel.Controls.Add(self.listbox)
+        self.Controls.Add(self.panel)
+
+        self.show_read_only_check = CheckBox()
+        self.show_read_only_check.Text = "Show Read-Only Parameters"
+        self.show_read_only_check.Checked = True  # Default to show all parameters
+        self.show_read_only_check.Dock = DockStyle.Bottom
+        self.show_read_only_check.CheckedChanged += self.refresh_listbox
+        self.Controls.Add(self.show_read_only_check)
+
+        self.convert_check = CheckBox()
+        self.convert_check.Text = "Convert numerical values to text"
+        self.convert_check.Dock = DockStyle.Bottom
+        self.Controls.Add(self.convert_check)
+
+        self.ok_button = Button()
+        self.ok_button.Text = "OK"
+        self.ok_button.DialogResult = DialogResult.OK
+        self.ok_button.Dock = DockStyle.Bottom
+        self.Controls.Add(self.ok_button)
+
+        self.cancel_button = Button()
+        self.cancel_button.Text = "Cancel"
+        self.cancel_button.DialogResult = DialogResult.Cancel
+        self.cancel_button.Dock = DockStyle.Bottom
+        self.Controls.Add(self.cancel_button)
+
+        # Dock the list last so it fills the space left by the other controls
+        self.panel.BringToFront()
+
+        self.AcceptButton = self.ok_button
+        self.CancelButton = self.cancel_button
+        self.ActiveControl = self.search_box
+
+        # Populate ListBox with parameter names
+        self.refresh_listbox()
+
+    def populate_listbox(self, display_names):
+        # One batched update instead of a repaint per Items.Add
+        self.listbox.BeginUpdate()
+        try:
+            self.listbox.Items.Clear()
+            self.listbox.Items.AddRange(Array[Object](display_names))
+        finally:
+            self.listbox.EndUpdate()
+
+    def refresh_listbox(self, sender=None, event=None):
+        hits = self.index.filter(self.search_box.Text, self.show_read_only_check.Checked)
+        self.populate_listbox(self.index.display(hits))
+        if len(hits) == 1:
+            self.listbox.SelectedIndex = 0
+
+    @property
+    def SelectedParameter(self):
+        selected_item = self.listbox.SelectedItem
+        if selected_item:
+            # Remove "(Read-Only)" from parameter name if present
+            return ParameterIndex.strip_display(selected_item)
+        else:
+            return None
+
+    @property
+    def ConvertValues(self):
+        return self.convert_check.Checked
+
+
+def prompt_for_parameter(index, title):
+    """Prompt the user to select a parameter from the index."""
+    form = ParameterForm(index, title)
+    result = form.ShowDialog()
+
+    if result == DialogResult.OK and form.SelectedParameter:
+        return form.SelectedParameter, form.ConvertValues
+    else:
+        return None, False
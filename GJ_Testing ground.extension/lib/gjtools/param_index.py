@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Searchable parameter list used by the parameter picker dialogs.
+
+The index is built once from ``{name: is_read_only}`` and keeps a lowercase
+copy of every name, so each keystroke in the search box is a plain substring
+scan. When the user keeps typing, the previous result is narrowed instead of
+rescanning the whole schema.
+"""
+
+READ_ONLY_SUFFIX = " (Read-Only)"
+
+
+class ParameterIndex(object):
+    """Sorted parameter names with a precomputed lowercase search index."""
+
+    def __init__(self, param_info):
+        self.param_info = param_info
+        self.names = sorted(param_info.keys())
+        self.display_names = [
+            name + READ_ONLY_SUFFIX if param_info[name] else name
+            for name in self.names
+        ]
+        self._lower = [name.lower() for name in self.names]
+        self._writable = [i for i, name in enumerate(self.names) if not param_info[name]]
+        self._all = list(range(len(self.names)))
+        self._last_key = None
+        self._last_hits = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def filter(self, query="", include_read_only=True):
+        """Return the indexes of names matching ``query`` (case insensitive).
+
+        Spaces are part of the query, as parameter names may start or end
+        with one; only a query of nothing but spaces matches everything.
+        """
+        query = (query or "").lower()
+        if not query.strip():
+            query = ""
+        key = (query, include_read_only)
+        if key == self._last_key:
+            return self._last_hits
+
+        if (self._last_key is not None and query
+                and self._last_key[1] == include_read_only
+                and query.startswith(self._last_key[0])):
+            # Typing extends the previous query, so only its hits can still match
+            candidates = self._last_hits
+        else:
+            candidates = self._all if include_read_only else self._writable
+
+        if query:
+            lower = self._lower
+            hits = [i for i in candidates if query in lower[i]]
+        else:
+            hits = candidates
+
+        self._last_key = key
+        self._last_hits = hits
+        return hits
+
+    def display(self, hits):
+        """Display strings for the given hit indexes."""
+        display_names = self.display_names
+        return [display_names[i] for i in hits]
+
+    @staticmethod
+    def strip_display(display_name):
+        """Parameter name for a display string."""
+        if display_name and display_name.endswith(READ_ONLY_SUFFIX):
+            return display_name[:-len(READ_ONLY_SUFFIX)]
+        return display_name
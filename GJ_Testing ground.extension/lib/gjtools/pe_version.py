@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""File version of a Windows DLL/EXE, read straight from its PE resources.
+
+Only the headers, the section table and the RT_VERSION resource are read
+(a few seeks and a few KB), never the whole assembly, and nothing is loaded
+into the process, so locked or foreign-architecture DLLs work too.
+"""
+import os
+import struct
+
+RT_VERSION = 16
+VS_FIXEDFILEINFO_SIGNATURE = 0xFEEF04BD
+# Version blocks are small; anything larger is a corrupt directory entry
+MAX_VERSION_RESOURCE = 1 << 20
+
+
+class PEFormatError(Exception):
+    pass
+
+
+class VersionInfo(object):
+    """Fixed file/product version plus the StringFileInfo strings."""
+
+    __slots__ = ("file_version", "product_version", "strings")
+
+    def __init__(self, file_version, product_version, strings):
+        self.file_version = file_version
+        self.product_version = product_version
+        self.strings = strings
+
+    @property
+    def display_version(self):
+        """FileVersion string when the vendor set one, else the fixed version."""
+        return self.strings.get("FileVersion") or self.file_version
+
+    def __repr__(self):
+        return "VersionInfo({!r}, {!r})".format(self.file_version, self.product_version)
+
+
+def _read(f, offset, size):
+    f.seek(offset)
+    data = f.read(size)
+    if len(data) != size:
+        raise PEFormatError("Unexpected end of file at offset {}".format(offset))
+    return data
+
+
+def _find_version_resource(f):
+    """``(file_offset, size)`` of the RT_VERSION data, or None."""
+    if _read(f, 0, 2) != b"MZ":
+        raise PEFormatError("Not a PE file (missing MZ header)")
+    pe_offset = struct.unpack("<I", _read(f, 0x3C, 4))[0]
+    if _read(f, pe_offset, 4) != b"PE\0\0":
+        raise PEFormatError("Not a PE file (missing PE signature)")
+    coff = pe_offset + 4
+    section_count, = struct.unpack("<H", _read(f, coff + 2, 2))
+    optional_size, = struct.unpack("<H", _read(f, coff + 16, 2))
+    optional = coff + 20
+    magic, = struct.unpack("<H", _read(f, optional, 2))
+    if magic == 0x10B:      # PE32
+        directories = optional + 96
+    elif magic == 0x20B:    # PE32+
+        directories = optional + 112
+    else:
+        raise PEFormatError("Unknown optional header magic 0x{:X}".format(magic))
+    if directories + 3 * 8 > optional + optional_size:
+        return None
+    resource_rva, resource_size = struct.unpack("<II", _read(f, directories + 2 * 8, 8))
+    if not resource_rva:
+        return None
+
+    sections = []
+    table = _read(f, optional + optional_size, 40 * section_count)
+    for i in range(section_count):
+        virtual_size, virtual_address, raw_size, raw_pointer = struct.unpack_from("<IIII", table, 40 * i + 8)
+        sections.append((virtual_address, max(virtual_size, raw_size), raw_pointer))
+
+    def rva_to_offset(rva):
+        for virtual_address, size, raw_pointer in sections:
+            if virtual_address <= rva < virtual_address + size:
+                return rva - virtual_address + raw_pointer
+        raise PEFormatError("RVA 0x{:X} is outside every section".format(rva))
+
+    base = rva_to_offset(resource_rva)
+
+    def entries(directory_offset):
+        named, ids = struct.unpack("<HH", _read(f, base + directory_offset + 12, 4))
+        data = _read(f, base + directory_offset + 16, 8 * (named + ids))
+        return [struct.unpack_from("<II", data, 8 * i) for i in range(named + ids)]
+
+    # Resource tree: type -> name -> language -> data; take the first name and language
+    names = None
+    for name, offset in entries(0):
+        if name == RT_VERSION and offset & 0x80000000:
+            names = offset & 0x7FFFFFFF
+            break
+    if names is None:
+        return None
+    children = entries(names)
+    if not children or not children[0][1] & 0x80000000:
+        return None
+    children = entries(children[0][1] & 0x7FFFFFFF)
+    if not children or children[0][1] & 0x80000000:
+        return None
+    node = children[0][1]
+    data_rva, data_size = struct.unpack("<II", _read(f, base + node, 8))
+    if not 0 < data_size <= MAX_VERSION_RESOURCE:
+        return None
+    return rva_to_offset(data_rva), data_size
+
+
+def _align4(offset):
+    return (offset + 3) & ~3
+
+
+def _parse_block(data, offset):
+    """One VS_VERSIONINFO style block: ``(key, value_offset, value_length, value_type, end, children_offset)``."""
+    length, value_length, value_type = struct.unpack_from("<HHH", data, offset)
+    end = min(offset + length, len(data))
+    key_start = offset + 6
+    key_end = key_start
+    while key_end + 1 < end and data[key_end:key_end + 2] != b"\0\0":
+        key_end += 2
+    key = data[key_start:key_end].decode("utf-16-le", "replace")
+    value_offset = _align4(key_end + 2)
+    if value_type == 1:  # text, length in UTF-16 characters
+        value_bytes = value_length * 2
+    else:
+        value_bytes = value_length
+    return key, value_offset, value_bytes, value_type, end, _align4(value_offset + value_bytes)
+
+
+def _children(data, offset, end):
+    while offset + 6 <= end:
+        block = _parse_block(data, offset)
+        if block[4] <= offset:
+            break
+        yield block
+        offset = _align4(block[4])
+
+
+def parse_version_resource(data):
+    """Parse a raw VS_VERSIONINFO resource into a ``VersionInfo``."""
+    key, value_offset, value_bytes, _, end, children = _parse_block(data, 0)
+    if key != u"VS_VERSION_INFO":
+        raise PEFormatError("Unexpected version resource key {!r}".format(key))
+    file_version = product_version = None
+    if value_bytes >= 52:
+        fields = struct.unpack_from("<IIIIII", data, value_offset)
+        if fields[0] == VS_FIXEDFILEINFO_SIGNATURE:
+            file_version = "{}.{}.{}.{}".format(fields[2] >> 16, fields[2] & 0xFFFF, fields[3] >> 16, fields[3] & 0xFFFF)
+            product_version = "{}.{}.{}.{}".format(fields[4] >> 16, fields[4] & 0xFFFF, fields[5] >> 16, fields[5] & 0xFFFF)
+
+    strings = {}
+    for child_key, _, _, _, child_end, child_children in _children(data, children, end):
+        if child_key != u"StringFileInfo":
+            continue
+        for _, _, _, _, table_end, table_children in _children(data, child_children, child_end):
+            for name, s_offset, s_bytes, _, _, _ in _children(data, table_children, table_end):
+                value = data[s_offset:s_offset + s_bytes].decode("utf-16-le", "replace").rstrip(u"\0")
+                strings.setdefault(name, value.strip())
+    return VersionInfo(file_version, product_version, strings)
+
+
+def read_version_info(path):
+    """``VersionInfo`` of a PE file, or None when it has no version resource."""
+    with open(path, "rb") as f:
+        location = _find_version_resource(f)
+        if location is None:
+            return None
+        offset, size = location
+        return parse_version_resource(_read(f, offset, size))
+
+
+class VersionReader(object):
+    """Lazy, memoized ``read_version_info`` keyed by DLL path and (mtime, size).
+
+    Many manifests point at the same few assemblies, so each DLL is parsed at
+    most once per run. ``entries`` can be persisted by the caller.
+    """
+
+    def __init__(self, entries=None):
+        self.entries = entries if entries is not None else {}
+        self.parsed = 0
+        self.hits = 0
+
+    def version(self, path):
+        """Display version string of ``path``; raises on unreadable files."""
+        st = os.stat(path)
+        key = os.path.normcase(os.path.abspath(path))
+        entry = self.entries.get(key)
+        if entry and entry[0] == st.st_mtime and entry[1] == st.st_size:
+            self.hits += 1
+            return entry[2]
+        info = read_version_info(path)
+        version = info.display_version if info else None
+        self.entries[key] = [st.st_mtime, st.st_size, version]
+        self.parsed += 1
+        return version
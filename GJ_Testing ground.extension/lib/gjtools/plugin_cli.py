@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""Command line Plugin Checker for scheduled, Excel-free runs.
+
+    cd "GJ_Testing ground.extension/lib"
+    python -m gjtools.plugin_cli STATUS.xlsx \\\\server\\share\\reports --history history.sqlite
+"""
+import argparse
+import sys
+
+from gjtools import fleet_audit, plugin_history, plugin_reports, plugin_status, status_backends
+from gjtools.workers import DEFAULT_WORKERS
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Update the plugin STATUS workbook from per-PC reports.")
+    parser.add_argument("workbook", help="STATUS workbook (.xlsx)")
+    parser.add_argument("reports", help="folder with '<PC> - Revit Plugins <year>.txt' reports "
+                                        "and/or '<PC> - Revit Addins <year>.jsonl' audit files")
+    parser.add_argument("--sheet", default="STATUS",
+                        help="base worksheet name; 'STATUS 2025' style copies are updated too (default: STATUS)")
+    parser.add_argument("--year", help="Revit year of sheets/blocks without a year "
+                                       "(default: {})".format(plugin_status.DEFAULT_YEAR))
+    parser.add_argument("--cache", help="JSON file caching parsed reports between runs")
+    parser.add_argument("--audit-cache", help="JSON file caching parsed add-in audit files between runs")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="threads reading reports (default: %(default)s)")
+    parser.add_argument("--backend", default=status_backends.DEFAULT_BACKEND,
+                        choices=sorted(status_backends.BACKENDS),
+                        help="output backend (default: %(default)s)")
+    parser.add_argument("--history", help="SQLite database recording the status changes of every run "
+                                          "(queried with python -m gjtools.plugin_history)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    statuses, stats = plugin_reports.ingest_reports(
+        args.reports, plugin_reports.ReportCache(args.cache), args.workers)
+    print(stats)
+    for path, error in stats.errors:
+        print("Could not read {}: {}".format(path, error))
+    audit_errors = []
+    matrix, files, records = fleet_audit.aggregate(args.reports, errors=audit_errors,
+                                                   cache=plugin_reports.ReportCache(args.audit_cache),
+                                                   workers=args.workers)
+    if files:
+        fleet_audit.merge_statuses(statuses, matrix.statuses_by_year())
+        print("{} add-in audit files, {} records.".format(files, records))
+    for path, line_number, message in audit_errors:
+        print("{}:{}: {}".format(path, line_number, message))
+    if args.history:
+        with plugin_history.open_history(args.history) as history:
+            run_id, pcs, changes = history.record(statuses, source=args.reports)
+        print("History run {}: {} PCs, {} changes.".format(run_id, pcs, changes))
+    backend = status_backends.open_backend(args.backend, args.workbook)
+    try:
+        results = plugin_status.update_status_workbook(backend, statuses, args.sheet, args.year)
+        backend.save()
+    finally:
+        backend.close()
+    for sheet_name, summary in results:
+        print(plugin_status.format_summary(sheet_name, summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
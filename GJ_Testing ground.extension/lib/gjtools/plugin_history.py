@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""Plugin status history of the fleet in a local SQLite database.
+
+Every ingested ``{year: {pc: {plugin: status}}}`` is recorded with
+``record``: one transaction per run, batched inserts. Only changes are
+stored, each with the status before it, next to a ``current`` table with
+the latest status per (year, pc, plugin). Years of daily runs stay small
+and every question is an index lookup::
+
+    with plugin_history.open_history(path) as history:
+        history.record(statuses_by_year)
+        history.changes(pc="PC-0042", plugin="Enscape")   # when it came and went
+        history.coverage(year="2024")                      # share of PCs with each plugin
+
+A plugin missing from a PC's report counts as NOT INSTALLED, as in the
+STATUS sheet; PCs without a report in a run keep their statuses.
+``sqlite3`` is not part of IronPython, so it is imported on first use;
+Plugin Checker records its runs only where ``available()`` (a CPython
+engine), into the ``history_db`` option or its appdata file, and otherwise
+logs a warning with the command below. The supported way to fill the
+history is a daily CPython run of that command, e.g. a Windows scheduled
+task started in ``GJ_Testing ground.extension\\lib``::
+
+    python -m gjtools.plugin_cli STATUS.xlsx \\\\server\\share\\reports --history history.sqlite
+    schtasks /Create /SC DAILY /ST 07:00 /TN "GJ Plugin History" /TR "cmd /c cd /d <lib> && python -m gjtools.plugin_cli ..."
+
+    python -m gjtools.plugin_history changes history.sqlite --pc PC-0042 --plugin Enscape
+    python -m gjtools.plugin_history coverage history.sqlite --year 2024
+"""
+import argparse
+import sys
+import time
+
+from gjtools.plugin_status import INSTALLED, NOT_INSTALLED
+
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY, stamp REAL NOT NULL, source TEXT, pcs INTEGER, changes INTEGER);
+CREATE TABLE IF NOT EXISTS changes (
+    run_id INTEGER NOT NULL, stamp REAL NOT NULL, year TEXT NOT NULL, pc TEXT NOT NULL, plugin TEXT NOT NULL,
+    previous TEXT, status TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS changes_pc_plugin_stamp ON changes (pc, plugin, stamp);
+CREATE INDEX IF NOT EXISTS changes_plugin_stamp ON changes (plugin, stamp);
+CREATE INDEX IF NOT EXISTS changes_year_pc_plugin_stamp ON changes (year, pc, plugin, stamp, status);
+CREATE TABLE IF NOT EXISTS current (
+    year TEXT NOT NULL, pc TEXT NOT NULL, plugin TEXT NOT NULL, status TEXT NOT NULL, since REAL NOT NULL,
+    PRIMARY KEY (pc, plugin, year)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS pcs (
+    year TEXT NOT NULL, pc TEXT NOT NULL, first_seen REAL NOT NULL, last_seen REAL NOT NULL,
+    PRIMARY KEY (year, pc)) WITHOUT ROWID;
+"""
+
+
+def available():
+    """Whether ``sqlite3`` can be imported (not on IronPython)."""
+    try:
+        import sqlite3  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def open_history(path):
+    """``PluginHistory`` on the database at ``path``, created when missing."""
+    import sqlite3
+    connection = sqlite3.connect(path)
+    if connection.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        connection.executescript(SCHEMA)
+        connection.execute("PRAGMA user_version = {}".format(SCHEMA_VERSION))
+        connection.commit()
+    return PluginHistory(connection)
+
+
+def _where(conditions):
+    """``(" WHERE a = ? AND ...", values)`` for the conditions that are not None."""
+    clauses = []
+    values = []
+    for clause, value in conditions:
+        if value is not None:
+            clauses.append(clause)
+            values.append(value)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), values
+
+
+class PluginHistory(object):
+    """Recording and queries on one open history database."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def close(self):
+        self.connection.close()
+
+    def record(self, statuses_by_year, stamp=None, source=""):
+        """Store the changes against the current statuses in one transaction; returns ``(run_id, pcs, changes)``."""
+        stamp = time.time() if stamp is None else stamp
+        connection = self.connection
+        changes = []
+        seen = []
+        with connection:
+            run_id = connection.execute("INSERT INTO runs (stamp, source) VALUES (?, ?)", (stamp, source)).lastrowid
+            for year, by_pc in statuses_by_year.items():
+                known = {}
+                for pc, plugin, status in connection.execute(
+                        "SELECT pc, plugin, status FROM current WHERE year = ?", (year,)):
+                    known.setdefault(pc, {})[plugin] = status
+                for pc, statuses in by_pc.items():
+                    seen.append((year, pc, stamp, stamp))
+                    before = known.get(pc, {})
+                    for plugin in set(before).union(statuses):
+                        status = statuses.get(plugin, NOT_INSTALLED)
+                        previous = before.get(plugin)
+                        if status != previous:
+                            changes.append((run_id, stamp, year, pc, plugin, previous, status))
+            connection.executemany(
+                "INSERT INTO changes (run_id, stamp, year, pc, plugin, previous, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                changes)
+            connection.executemany(
+                "INSERT OR REPLACE INTO current (year, pc, plugin, status, since) VALUES (?, ?, ?, ?, ?)",
+                [(year, pc, plugin, status, when) for _, when, year, pc, plugin, _, status in changes])
+            connection.executemany(
+                "INSERT OR IGNORE INTO pcs (year, pc, first_seen, last_seen) VALUES (?, ?, ?, ?)", seen)
+            connection.executemany(
+                "UPDATE pcs SET last_seen = ? WHERE year = ? AND pc = ?",
+                [(stamp, year, pc) for year, pc, _, _ in seen])
+            connection.execute("UPDATE runs SET pcs = ?, changes = ? WHERE id = ?", (len(seen), len(changes), run_id))
+        return run_id, len(seen), len(changes)
+
+    def current(self, pc=None, plugin=None, year=None):
+        """``(year, pc, plugin, status, since)`` rows of the latest statuses."""
+        where, values = _where([("pc = ?", pc), ("plugin = ?", plugin), ("year = ?", year)])
+        return self.connection.execute(
+            "SELECT year, pc, plugin, status, since FROM current" + where + " ORDER BY year, pc, plugin",
+            values).fetchall()
+
+    def changes(self, pc=None, plugin=None, year=None, since=None):
+        """``(stamp, year, pc, plugin, previous, status)`` rows in time order; ``previous`` is None when first seen."""
+        where, values = _where([("pc = ?", pc), ("plugin = ?", plugin), ("year = ?", year), ("stamp >= ?", since)])
+        return self.connection.execute(
+            "SELECT stamp, year, pc, plugin, previous, status FROM changes" + where + " ORDER BY stamp",
+            values).fetchall()
+
+    def losses(self, pc=None, plugin=None, year=None, since=None):
+        """The changes where an installed plugin stopped being installed."""
+        where, values = _where([("pc = ?", pc), ("plugin = ?", plugin), ("year = ?", year), ("stamp >= ?", since),
+                                ("previous = ?", INSTALLED), ("status != ?", INSTALLED)])
+        return self.connection.execute(
+            "SELECT stamp, year, pc, plugin, previous, status FROM changes" + where + " ORDER BY stamp",
+            values).fetchall()
+
+    def coverage(self, year=None, at=None):
+        """``(year, plugin, installed_pcs, pcs, percent)``: how many of the reporting PCs have each plugin.
+
+        ``at`` (a timestamp) gives the coverage as it was then instead of now.
+        """
+        if at is None:
+            where, values = _where([("year = ?", year)])
+            state = "SELECT year, pc, plugin, status FROM current" + where
+            totals = self.connection.execute("SELECT year, COUNT(*) FROM pcs" + where + " GROUP BY year", values)
+        else:
+            where, values = _where([("stamp <= ?", at), ("year = ?", year)])
+            # SQLite takes the bare columns from the row holding MAX(stamp)
+            state = ("SELECT year, pc, plugin, status, MAX(stamp) FROM changes" + where
+                     + " GROUP BY year, pc, plugin")
+            totals = self.connection.execute(
+                "SELECT year, COUNT(*) FROM pcs" + where.replace("stamp", "first_seen") + " GROUP BY year", values)
+        totals = dict(totals.fetchall())
+        rows = self.connection.execute(
+            "SELECT year, plugin, SUM(status = ?) FROM (" + state + ") GROUP BY year, plugin ORDER BY year, plugin",
+            [INSTALLED] + values).fetchall()
+        return [(row_year, plugin, installed, totals[row_year], 100.0 * installed / totals[row_year])
+                for row_year, plugin, installed in rows]
+
+    def runs(self, limit=20):
+        """``(id, stamp, source, pcs, changes)`` of the latest runs, newest first."""
+        return self.connection.execute(
+            "SELECT id, stamp, source, pcs, changes FROM runs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+
+
+def format_stamp(stamp):
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(stamp))
+
+
+def parse_date(text):
+    """``YYYY-MM-DD`` (local midnight) to a timestamp; None stays None."""
+    if text is None:
+        return None
+    return time.mktime(time.strptime(text, "%Y-%m-%d"))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Fleet plugin status history.")
+    commands = parser.add_subparsers(dest="command")
+    runs = commands.add_parser("runs", help="latest recorded runs")
+    runs.add_argument("database")
+    runs.add_argument("--limit", type=int, default=20)
+    for name, help_text in (("current", "latest statuses"), ("changes", "status changes in time order"),
+                            ("losses", "plugins that stopped being installed")):
+        query = commands.add_parser(name, help=help_text)
+        query.add_argument("database")
+        query.add_argument("--pc")
+        query.add_argument("--plugin")
+        query.add_argument("--year")
+        if name != "current":
+            query.add_argument("--since", help="YYYY-MM-DD")
+    coverage = commands.add_parser("coverage", help="share of PCs with each plugin")
+    coverage.add_argument("database")
+    coverage.add_argument("--year")
+    coverage.add_argument("--at", help="YYYY-MM-DD (default: now)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        build_parser().print_help()
+        return 2
+    with open_history(args.database) as history:
+        if args.command == "current":
+            for year, pc, plugin, status, since in history.current(args.pc, args.plugin, args.year):
+                print("{}\t{}\t{}\t{}\tsince {}".format(year, pc, plugin, status, format_stamp(since)))
+        elif args.command == "runs":
+            for run_id, stamp, source, pcs, changes in history.runs(args.limit):
+                print("{}\t{}\t{} PCs\t{} changes\t{}".format(run_id, format_stamp(stamp), pcs, changes, source or ""))
+        elif args.command in ("changes", "losses"):
+            query = history.changes if args.command == "changes" else history.losses
+            for stamp, year, pc, plugin, previous, status in query(args.pc, args.plugin, args.year,
+                                                                    parse_date(args.since)):
+                print("{}\t{}\t{}\t{}\t{} -> {}".format(format_stamp(stamp), year, pc, plugin, previous or "-",
+                                                         status))
+        else:
+            for year, plugin, installed, pcs, percent in history.coverage(args.year, parse_date(args.at)):
+                print("{}\t{}\t{}/{}\t{:.1f}%".format(year, plugin, installed, pcs, percent))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
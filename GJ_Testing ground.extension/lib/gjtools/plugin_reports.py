@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""Ingestion of the per-PC ``<PC> - Revit Plugins <year>.txt`` reports.
+
+The report folder usually sits on a slow SMB share, so the folder is listed
+once, only files whose (mtime, size) changed since the last run are read, and
+those reads are spread over a thread pool. Parsed results are cached in a
+small JSON file keyed by path.
+"""
+import csv
+import io
+import json
+import os
+import re
+import sys
+
+from gjtools._compat import perf_counter
+from gjtools.workers import DEFAULT_WORKERS, thread_map
+
+REPORT_PATTERN = re.compile(r"^(?P<pc>.+?) - Revit Plugins (?P<year>\d{4})\.txt$", re.IGNORECASE)
+CACHE_VERSION = 2
+
+
+class IngestStats(object):
+    """Counters for one ingestion run."""
+
+    def __init__(self):
+        self.files_listed = 0
+        self.files_read = 0
+        self.cache_hits = 0
+        # Unreadable reports whose statuses were taken from the last successful read
+        self.stale = 0
+        self.errors = []
+        self.wall_time = 0.0
+
+    def __str__(self):
+        text = "{} reports: {} read, {} from cache, {} errors".format(
+            self.files_listed, self.files_read, self.cache_hits, len(self.errors))
+        if self.stale:
+            text += " ({} kept from the last run)".format(self.stale)
+        return text + " in {:.2f} s".format(self.wall_time)
+
+
+class ReportCache(object):
+    """Parsed reports keyed by path and validated by (mtime, size)."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            try:
+                with io.open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    self.entries = data.get("entries", {})
+            except (IOError, OSError, ValueError):
+                # A broken cache only costs a full re-read
+                self.entries = {}
+
+    def get(self, path, mtime, size):
+        entry = self.entries.get(path)
+        if entry and entry["mtime"] == mtime and entry["size"] == size:
+            return entry["statuses"]
+        return None
+
+    def last(self, path):
+        """Statuses of the last successful read of ``path``, whatever changed since; None if never read."""
+        entry = self.entries.get(path)
+        return entry["statuses"] if entry else None
+
+    def put(self, path, mtime, size, statuses):
+        self.entries[path] = {"mtime": mtime, "size": size, "statuses": statuses}
+        self.dirty = True
+
+    def prune(self, live_paths):
+        stale = set(self.entries) - set(live_paths)
+        for path in stale:
+            del self.entries[path]
+        self.dirty = self.dirty or bool(stale)
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        tmp_path = self.path + ".tmp"
+        with io.open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(u"{}".format(json.dumps({"version": CACHE_VERSION, "entries": self.entries})))
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rename(tmp_path, self.path)
+        self.dirty = False
+
+
+def report_key(file_name):
+    """``(pc_name, year)`` for a report file name, or None for other files."""
+    match = REPORT_PATTERN.match(file_name)
+    if not match:
+        return None
+    return match.group("pc").strip(), match.group("year")
+
+
+def list_reports(folder, key_function=report_key):
+    """``[(path, pc_name, year, mtime, size)]`` for every report, listing the folder once.
+
+    ``key_function(file_name)`` picks the files and gives their ``(pc_name, year)``.
+    """
+    reports = []
+    scandir = getattr(os, "scandir", None)
+    if scandir is not None:
+        # On Windows the directory listing already carries the stat data
+        for entry in scandir(folder):
+            key = key_function(entry.name)
+            if key and entry.is_file():
+                st = entry.stat()
+                reports.append((entry.path, key[0], key[1], st.st_mtime, st.st_size))
+    else:
+        for file_name in os.listdir(folder):
+            key = key_function(file_name)
+            if key:
+                path = os.path.join(folder, file_name)
+                st = os.stat(path)
+                reports.append((path, key[0], key[1], st.st_mtime, st.st_size))
+    return reports
+
+
+def _open_csv(path):
+    if sys.version_info[0] < 3:
+        return open(path, "rb")
+    return io.open(path, "r", encoding="utf-8-sig", newline="")
+
+
+def parse_report(path):
+    """``{plugin_name: status}`` from one report (header row, then PC,plugin,status)."""
+    statuses = {}
+    with _open_csv(path) as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        for parts in reader:
+            if len(parts) == 3:
+                statuses[parts[1].strip()] = parts[2].strip()
+    return statuses
+
+
+def ingest_reports(folder, cache=None, workers=DEFAULT_WORKERS, progress=None):
+    """Read every report in ``folder``.
+
+    Returns ``({year: {pc_name: {plugin_name: status}}}, IngestStats)``. Pass
+    a ``ReportCache`` to skip files that did not change since it was saved;
+    ``progress(done, total)`` follows the files read (see ``thread_map``).
+    A report that cannot be read is listed in ``stats.errors`` and keeps its
+    statuses from the cache, so a share hiccup does not turn a PC into NO DATA.
+    """
+    start = perf_counter()
+    stats = IngestStats()
+    cache = cache or ReportCache()
+    reports = list_reports(folder)
+    stats.files_listed = len(reports)
+
+    statuses_by_year = {}
+    to_read = []
+    for report in reports:
+        path, pc_name, year, mtime, size = report
+        cached = cache.get(path, mtime, size)
+        if cached is not None:
+            statuses_by_year.setdefault(year, {})[pc_name] = cached
+            stats.cache_hits += 1
+        else:
+            to_read.append(report)
+
+    results = thread_map(lambda report: parse_report(report[0]), to_read, workers, progress)
+    for (path, pc_name, year, mtime, size), (statuses, error) in zip(to_read, results):
+        if error is not None:
+            stats.errors.append((path, error))
+            last = cache.last(path)
+            if last is not None:
+                statuses_by_year.setdefault(year, {})[pc_name] = last
+                stats.stale += 1
+            continue
+        statuses_by_year.setdefault(year, {})[pc_name] = statuses
+        cache.put(path, mtime, size, statuses)
+        stats.files_read += 1
+
+    cache.prune([report[0] for report in reports])
+    cache.save()
+    stats.wall_time = perf_counter() - start
+    return statuses_by_year, stats
@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+"""Pure-Python layout of the Plugin Checker STATUS sheet.
+
+Everything here works on plain lists so the sheet can be read and written in
+a handful of bulk calls (one ``Range.Value2`` per block) instead of one COM
+round trip per cell.
+"""
+import re
+
+INSTALLED = "INSTALLED"
+NOT_INSTALLED = "NOT INSTALLED"
+NO_DATA = "NO DATA"
+
+# Excel colors are BGR integers
+GREEN = 5296274   # RGB(85, 255, 85)
+RED = 255         # RGB(255, 0, 0)
+GRAY = 12632256   # RGB(192, 192, 192)
+
+# Excel rejects Range addresses longer than 255 characters
+MAX_ADDRESS_LENGTH = 255
+
+
+def status_color(status):
+    if status == INSTALLED:
+        return GREEN
+    if status == NOT_INSTALLED:
+        return RED
+    return GRAY
+
+
+def column_letter(col):
+    """1-based column number to its letter, e.g. 7 -> 'G'."""
+    letters = ""
+    while col > 0:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def column_number(letters):
+    """Column letter to its 1-based number, e.g. 'G' -> 7."""
+    col = 0
+    for char in letters.upper():
+        col = col * 26 + ord(char) - 64
+    return col
+
+
+def cell_address(row, col):
+    return "{}{}".format(column_letter(col), row)
+
+
+def range_address(row1, col1, row2, col2):
+    if (row1, col1) == (row2, col2):
+        return cell_address(row1, col1)
+    return "{}:{}".format(cell_address(row1, col1), cell_address(row2, col2))
+
+
+def clean_name(value):
+    """Cell value to a stripped name, or None for blank cells."""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    name = u"{}".format(value).strip()
+    return name or None
+
+
+def build_status_grid(pc_names, plugin_columns, plugin_status):
+    """Status values for a block of PC rows by plugin columns.
+
+    ``pc_names`` has one entry per sheet row (None for blank rows) and
+    ``plugin_columns`` one plugin name per sheet column (None for blank
+    headers). Cells of blank rows or columns are None; ``write_grid`` leaves
+    them, and any formulas in them, untouched.
+    Returns ``(grid, written)`` where ``written`` is the matching grid of
+    booleans telling which cells got a fresh status.
+    """
+    grid = []
+    written = []
+    for r, pc_name in enumerate(pc_names):
+        statuses = plugin_status.get(pc_name) if pc_name else None
+        row_values = []
+        row_written = []
+        for c, plugin_name in enumerate(plugin_columns):
+            if pc_name and plugin_name:
+                if statuses is None:
+                    value = NO_DATA
+                else:
+                    value = statuses.get(plugin_name, NOT_INSTALLED)
+                row_values.append(value)
+                row_written.append(True)
+            else:
+                row_values.append(None)
+                row_written.append(False)
+        grid.append(row_values)
+        written.append(row_written)
+    return grid, written
+
+
+def _runs(names):
+    """``[(first, last)]`` indexes of the runs of consecutive non-blank ``names``."""
+    runs = []
+    start = None
+    for index, name in enumerate(names):
+        if name and start is None:
+            start = index
+        elif not name and start is not None:
+            runs.append((start, index - 1))
+            start = None
+    if start is not None:
+        runs.append((start, len(names) - 1))
+    return runs
+
+
+def write_grid(sheet, first_row, first_col, grid, pc_names, plugin_columns):
+    """Write the status cells of ``grid``: one block per run of PC rows by run of plugin columns."""
+    row_runs = _runs(pc_names)
+    for c1, c2 in _runs(plugin_columns):
+        for r1, r2 in row_runs:
+            sheet.write_block(first_row + r1, first_col + c1, [row[c1:c2 + 1] for row in grid[r1:r2 + 1]])
+
+
+def color_blocks(grid, written, first_row, first_col):
+    """Group written cells into rectangles of the same fill color.
+
+    Horizontal runs of one color are found per row, then identical runs on
+    consecutive rows are merged, so a fleet where most PCs look alike ends up
+    with a few large rectangles. Returns ``{color: [(r1, c1, r2, c2), ...]}``.
+    """
+    blocks = {}
+    open_runs = {}  # (c1, c2, color) -> index into blocks[color] of a rectangle ending on the previous row
+    for r, row_values in enumerate(grid):
+        row = first_row + r
+        runs = []
+        c = 0
+        ncols = len(row_values)
+        while c < ncols:
+            if not written[r][c]:
+                c += 1
+                continue
+            color = status_color(row_values[c])
+            start = c
+            while c + 1 < ncols and written[r][c + 1] and status_color(row_values[c + 1]) == color:
+                c += 1
+            runs.append((first_col + start, first_col + c, color))
+            c += 1
+
+        still_open = {}
+        for run in runs:
+            c1, c2, color = run
+            rects = blocks.setdefault(color, [])
+            idx = open_runs.get(run)
+            if idx is not None and rects[idx][2] == row - 1:
+                r1 = rects[idx][0]
+                rects[idx] = (r1, c1, row, c2)
+            else:
+                idx = len(rects)
+                rects.append((row, c1, row, c2))
+            still_open[run] = idx
+        open_runs = still_open
+    return blocks
+
+
+def union_addresses(rects, max_length=MAX_ADDRESS_LENGTH):
+    """Comma separated Range addresses for ``rects``, split to fit Excel's limit."""
+    chunks = []
+    current = ""
+    for r1, c1, r2, c2 in rects:
+        address = range_address(r1, c1, r2, c2)
+        if current and len(current) + 1 + len(address) > max_length:
+            chunks.append(current)
+            current = address
+        else:
+            current = current + "," + address if current else address
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+
+# Revit year of the plain "STATUS" sheet and of blocks without a year cell
+DEFAULT_YEAR = "2024"
+
+# Fallback STATUS sheet layout when no PC header cell is found:
+# plugin names in row 11 right of column F, PC names in column F below them
+HEADER_ROW = 11
+PC_COL = 6
+
+# Header cells that mark the PC name column
+PC_HEADERS = ("pc", "pc name", "pc names", "computer", "computer name", "machine", "hostname", "workstation")
+# How many rows from the top are searched for the header row
+LAYOUT_SCAN_ROWS = 40
+
+_YEAR = re.compile(r"(?<!\d)(20\d\d)(?!\d)")
+
+
+def find_year(value):
+    """Four digit Revit year in a cell value or sheet name, or None."""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    match = _YEAR.search(u"{}".format(value))
+    return match.group(1) if match else None
+
+
+class YearBlock(object):
+    """Contiguous plugin columns that belong to one Revit year."""
+
+    __slots__ = ("year", "first_col", "plugins")
+
+    def __init__(self, year, first_col):
+        self.year = year
+        self.first_col = first_col
+        self.plugins = []  # one name per column
+
+    @property
+    def last_col(self):
+        return self.first_col + len(self.plugins) - 1
+
+
+class StatusLayout(object):
+    """Where the header, the PC names and the per-year plugin columns are."""
+
+    def __init__(self, header_row, pc_col, last_row, blocks, pc_names):
+        self.header_row = header_row
+        self.pc_col = pc_col
+        self.first_pc_row = header_row + 1
+        self.last_row = last_row
+        self.blocks = blocks
+        self.pc_names = pc_names  # one entry per row from first_pc_row, None for blanks
+        self.pc_rows = {}  # PC name -> list of sheet rows
+        self.duplicates = []
+        for offset, name in enumerate(pc_names):
+            if not name:
+                continue
+            rows = self.pc_rows.setdefault(name, [])
+            if len(rows) == 1:
+                self.duplicates.append(name)
+            rows.append(self.first_pc_row + offset)
+
+    @property
+    def years(self):
+        return [block.year for block in self.blocks]
+
+
+def _find_pc_header(scan):
+    for r, row_values in enumerate(scan):
+        for c, value in enumerate(row_values):
+            name = clean_name(value)
+            if name and name.lower() in PC_HEADERS:
+                return r + 1, c + 1
+    return None
+
+
+def discover_layout(sheet, sheet_year=None):
+    """Find the STATUS layout of ``sheet`` with three bulk reads.
+
+    The header row is the one holding a PC header cell (see ``PC_HEADERS``),
+    falling back to row 11 / column F. The plugins are the headers right of
+    the PC column up to the first blank header cell, so notes columns further
+    right are never written. Year cells in the row above the header (e.g.
+    "Revit 2025") split the plugin columns into one block per year, and a year
+    cell after a blank column starts the next block; without them all plugins
+    belong to ``sheet_year``.
+    """
+    last_row = sheet.last_used_row()
+    last_col = sheet.last_used_column()
+    scan_rows = min(last_row, LAYOUT_SCAN_ROWS)
+    scan = sheet.read_block(1, 1, scan_rows, last_col) if scan_rows and last_col else []
+
+    header_row, pc_col = _find_pc_header(scan) or (HEADER_ROW, PC_COL)
+
+    def scanned(row, col):
+        if 1 <= row <= len(scan) and 1 <= col <= len(scan[row - 1]):
+            return scan[row - 1][col - 1]
+        return None
+
+    blocks = []
+    block = None
+    for col in range(pc_col + 1, last_col + 1):
+        name = clean_name(scanned(header_row, col))
+        year = find_year(scanned(header_row - 1, col))
+        if name is None:
+            block = None
+            continue
+        if block is None:
+            if blocks and not year:
+                # Right of the plugin region and not a new year block
+                continue
+            block = YearBlock(year or sheet_year, col)
+            blocks.append(block)
+        elif year and year != block.year:
+            block = YearBlock(year, col)
+            blocks.append(block)
+        block.plugins.append(name)
+
+    if last_row > header_row:
+        pc_names = [clean_name(row[0]) for row in
+                    sheet.read_block(header_row + 1, pc_col, last_row, pc_col)]
+    else:
+        pc_names = []
+    return StatusLayout(header_row, pc_col, last_row, blocks, pc_names)
+
+
+def update_status_sheet(sheet, statuses_by_year, sheet_year=None, layout=None):
+    """Write ``{year: {pc: {plugin: status}}}`` into one STATUS sheet.
+
+    Each year block is written in as few blocks as its blank rows and
+    columns allow and colored per same-status rectangle. Returns a summary
+    dict.
+    """
+    layout = layout or discover_layout(sheet, sheet_year)
+    summary = {
+        'years': [],
+        'plugins': 0,
+        'pcs': len(layout.pc_rows),
+        'no_data': 0,
+        'color_blocks': 0,
+        'duplicates': layout.duplicates,
+        'unknown_pcs': set(),
+    }
+    if not layout.pc_names:
+        return summary
+
+    for block in layout.blocks:
+        plugin_status = statuses_by_year.get(block.year, {})
+        grid, written = build_status_grid(layout.pc_names, block.plugins, plugin_status)
+        write_grid(sheet, layout.first_pc_row, block.first_col, grid, layout.pc_names, block.plugins)
+
+        colors = color_blocks(grid, written, layout.first_pc_row, block.first_col)
+        for color, rects in colors.items():
+            sheet.fill(rects, color)
+
+        summary['years'].append(block.year)
+        summary['plugins'] += len([p for p in block.plugins if p])
+        summary['no_data'] += len([n for n in layout.pc_rows if n not in plugin_status])
+        summary['color_blocks'] += sum(len(rects) for rects in colors.values())
+        summary['unknown_pcs'].update(pc for pc in plugin_status if pc not in layout.pc_rows)
+    return summary
+
+
+def update_status_rows(sheet, layout, statuses_by_year, pc_names):
+    """Rewrite only the rows of ``pc_names``, using an existing ``layout``.
+
+    Used by the watch mode: the cost is proportional to the number of PCs
+    whose report changed, not to the fleet size. Returns the number of rows
+    written.
+    """
+    rows_written = 0
+    for pc_name in pc_names:
+        for row in layout.pc_rows.get(pc_name, ()):
+            for block in layout.blocks:
+                plugin_status = statuses_by_year.get(block.year, {})
+                grid, written = build_status_grid([pc_name], block.plugins, plugin_status)
+                write_grid(sheet, row, block.first_col, grid, [pc_name], block.plugins)
+                for color, rects in color_blocks(grid, written, row, block.first_col).items():
+                    sheet.fill(rects, color)
+            rows_written += 1
+    return rows_written
+
+
+def sheets_by_year(sheet_names, base_name, default_year):
+    """``[(sheet_name, year)]`` for ``base_name`` and its per-year copies.
+
+    "STATUS" gets ``default_year``; "STATUS 2025" or "STATUS_2025" get 2025.
+    """
+    matches = []
+    for name in sheet_names:
+        if name == base_name:
+            matches.append((name, default_year))
+        elif name.startswith(base_name):
+            year = find_year(name[len(base_name):])
+            if year and name[len(base_name):].strip(" _-") == year:
+                matches.append((name, year))
+    return matches
+
+
+def update_status_workbook(backend, statuses_by_year, base_name="STATUS", default_year=None):
+    """Update every STATUS sheet of the workbook; returns ``[(sheet_name, summary)]``.
+
+    The plain "STATUS" sheet is ``default_year`` (``DEFAULT_YEAR`` when None).
+    """
+    default_year = default_year or DEFAULT_YEAR
+    sheets = sheets_by_year(backend.sheet_names, base_name, default_year)
+    if not sheets:
+        raise ValueError("No '{}' sheet found in {}".format(base_name, backend.path))
+    return [(name, update_status_sheet(backend.get_sheet(name), statuses_by_year, year))
+            for name, year in sheets]
+
+
+def format_summary(sheet_name, summary):
+    lines = ["{}: {} PCs, {} plugin columns for Revit {}, {} PC/year pairs without a report, {} color blocks.".format(
+        sheet_name, summary['pcs'], summary['plugins'],
+        ", ".join(str(y) for y in summary['years']) or "-", summary['no_data'], summary['color_blocks'])]
+    if summary['duplicates']:
+        lines.append("  PCs listed on more than one row: {}".format(
+            ", ".join(sorted(summary['duplicates']))))
+    if summary['unknown_pcs']:
+        lines.append("  Reports for PCs missing from the sheet: {}".format(
+            ", ".join(sorted(summary['unknown_pcs']))))
+    return "\n".join(lines)
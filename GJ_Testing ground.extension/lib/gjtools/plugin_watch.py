@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""Watch mode: keep the STATUS workbook current as PC reports arrive.
+
+Every ``interval`` seconds the report folder is listed with stat data only.
+New or changed reports are held until the folder has been quiet for
+``debounce`` seconds, so a burst of machines reporting at logon turns into
+one update. Each update re-parses only the changed reports and rewrites only
+the rows of those PCs, through the PC -> row index of the layout, which is
+kept in memory between cycles. Saving rewrites the whole workbook, so the
+updated rows are saved once the folder has been quiet for ``debounce``
+seconds, or at the latest ``max_delay`` seconds after the first unsaved
+update; a failed save is retried after ``max_delay``. The layout is
+discovered again when someone else saves the workbook, or when a report
+names a PC that has no row yet.
+
+The ``<PC> - Revit Addins <year>.jsonl/.csv`` audit files of version-INFO
+are watched too and fill in PCs without a TXT report, as in Plugin Checker
+(``fleet_audit.merge_statuses``, the TXT report wins).
+
+    cd "GJ_Testing ground.extension/lib"
+    python -m gjtools.plugin_watch STATUS.xlsx \\\\server\\share\\reports
+"""
+import argparse
+import os
+import sys
+import time
+
+from gjtools import fleet_audit, plugin_reports, plugin_status, status_backends
+from gjtools._compat import perf_counter
+from gjtools.workers import DEFAULT_WORKERS, thread_map
+
+DEFAULT_INTERVAL = 15.0
+DEFAULT_DEBOUNCE = 10.0
+# Never hold changes longer than this, even while reports keep arriving
+DEFAULT_MAX_DELAY = 45.0
+
+
+def log(message):
+    print("{} {}".format(time.strftime("%Y-%m-%d %H:%M:%S"), message))
+    sys.stdout.flush()
+
+
+def watched_key(file_name):
+    """``(pc_name, year)`` of a report or add-in audit file, or None for other files."""
+    return plugin_reports.report_key(file_name) or fleet_audit.audit_key(file_name)
+
+
+class FolderWatcher(object):
+    """Stat-only folder scans with debounced change batches."""
+
+    def __init__(self, folder, debounce=DEFAULT_DEBOUNCE, max_delay=DEFAULT_MAX_DELAY, clock=time.time):
+        self.folder = folder
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.clock = clock
+        self.known = {}    # path -> (pc_name, year, mtime, size) as last handed out
+        self.pending = {}  # path -> report tuple, or None when removed
+        self.first_pending = None
+        self.last_change = None
+        self.last_activity = None  # last change seen, kept across ``take``
+
+    def scan(self):
+        """List the folder once and queue what changed; returns the number of new changes."""
+        now = self.clock()
+        seen = {}
+        for path, pc_name, year, mtime, size in plugin_reports.list_reports(self.folder, watched_key):
+            seen[path] = (pc_name, year, mtime, size)
+        changes = 0
+        for path, report in seen.items():
+            if self.known.get(path) != report and self.pending.get(path) != report:
+                self.pending[path] = report
+                changes += 1
+        for path in self.known:
+            if path not in seen and self.pending.get(path, 0) is not None:
+                self.pending[path] = None
+                changes += 1
+        if changes:
+            self.last_change = self.last_activity = now
+            if self.first_pending is None:
+                self.first_pending = now
+        return changes
+
+    def quiet(self):
+        """Whether nothing is pending and no change was seen for ``debounce`` seconds."""
+        return not self.pending and (self.last_activity is None
+                                     or self.clock() - self.last_activity >= self.debounce)
+
+    def ready(self):
+        if not self.pending:
+            return False
+        now = self.clock()
+        return (now - self.last_change >= self.debounce
+                or now - self.first_pending >= self.max_delay)
+
+    def take(self):
+        """Pending changes as ``{path: report or None}``; marks them as known."""
+        batch = self.pending
+        self.pending = {}
+        self.first_pending = self.last_change = None
+        for path, report in batch.items():
+            if report is None:
+                self.known.pop(path, None)
+            else:
+                self.known[path] = report
+        return batch
+
+
+class StatusWatch(object):
+    """Applies report changes to the STATUS workbook row by row."""
+
+    def __init__(self, workbook, folder, backend_name=status_backends.DEFAULT_BACKEND,
+                 base_name="STATUS", year=None, workers=DEFAULT_WORKERS,
+                 debounce=DEFAULT_DEBOUNCE, max_delay=DEFAULT_MAX_DELAY):
+        self.workbook = workbook
+        self.backend_name = backend_name
+        self.base_name = base_name
+        self.year = year
+        self.workers = workers
+        self.watcher = FolderWatcher(folder, debounce, max_delay)
+        self.statuses_by_year = {}   # from the TXT reports
+        self.audit_statuses = {}     # from the add-in audit files
+        self.audit_cache = plugin_reports.ReportCache()
+        self.backend = None
+        self.layouts = []      # [(sheet_name, sheet, sheet_year, layout)]
+        self.unsaved_pcs = set()
+        self._unsaved_since = None
+        self._retry_at = None
+        self._saved_mtime = None
+
+    # Workbook state
+
+    def _open(self):
+        if self.backend is not None:
+            self.backend.close()
+        self.backend = status_backends.open_backend(self.backend_name, self.workbook)
+        default_year = self.year or plugin_status.DEFAULT_YEAR
+        self.layouts = []
+        for name, sheet_year in plugin_status.sheets_by_year(
+                self.backend.sheet_names, self.base_name, default_year):
+            sheet = self.backend.get_sheet(name)
+            self.layouts.append((name, sheet, sheet_year, plugin_status.discover_layout(sheet, sheet_year)))
+        if not self.layouts:
+            raise ValueError("No '{}' sheet found in {}".format(self.base_name, self.workbook))
+
+    def _rediscover(self, pcs):
+        """Discover the layouts again when one of ``pcs`` has no row yet (added to the sheet since)."""
+        if all(any(pc_name in layout.pc_rows for _, _, _, layout in self.layouts) for pc_name in pcs):
+            return
+        self.layouts = [(name, sheet, sheet_year, plugin_status.discover_layout(sheet, sheet_year))
+                        for name, sheet, sheet_year, _ in self.layouts]
+
+    def _changed_externally(self):
+        return self._saved_mtime is not None and os.path.getmtime(self.workbook) != self._saved_mtime
+
+    def _save(self):
+        try:
+            self.backend.save()
+        except (IOError, OSError) as error:
+            # Usually someone has the workbook open in Excel; try again next cycle
+            log("Could not save {} ({}), will retry.".format(self.workbook, error))
+            self._retry_at = self.watcher.clock() + self.watcher.max_delay
+            return False
+        self._saved_mtime = os.path.getmtime(self.workbook)
+        self.unsaved_pcs.clear()
+        self._unsaved_since = self._retry_at = None
+        return True
+
+    def _save_due(self):
+        """Whether to save now: the folder is quiet, or the oldest unsaved update waited ``max_delay``."""
+        now = self.watcher.clock()
+        if not self.unsaved_pcs or (self._retry_at is not None and now < self._retry_at):
+            return False
+        return self.watcher.quiet() or now - self._unsaved_since >= self.watcher.max_delay
+
+    def merged_statuses(self):
+        """The report statuses, completed by the audit files like in Plugin Checker."""
+        merged = dict((year, dict(by_pc)) for year, by_pc in self.statuses_by_year.items())
+        return fleet_audit.merge_statuses(merged, self.audit_statuses)
+
+    # Cycles
+
+    def full_refresh(self):
+        """Read every report and audit file and rewrite the whole workbook (first cycle)."""
+        self.watcher.scan()
+        batch = self.watcher.take()
+        self._apply_reports(batch)
+        self._open()
+        statuses = self.merged_statuses()
+        for name, sheet, _, layout in self.layouts:
+            summary = plugin_status.update_status_sheet(sheet, statuses, layout=layout)
+            log(plugin_status.format_summary(name, summary))
+        self.unsaved_pcs = set(pc_name for by_pc in statuses.values() for pc_name in by_pc)
+        self._unsaved_since = self.watcher.clock()
+        self._save()
+
+    def cycle(self):
+        """One poll; returns the number of rows written (0 when idle)."""
+        if self._changed_externally():
+            log("Workbook changed outside the watcher, reloading its layout.")
+            self.full_refresh()
+            return 0
+        self.watcher.scan()
+        rows = 0
+        if self.watcher.ready():
+            start = perf_counter()
+            batch = self.watcher.take()
+            pcs = self._apply_reports(batch)
+            self._rediscover(pcs)
+            statuses = self.merged_statuses()
+            for _, sheet, _, layout in self.layouts:
+                rows += plugin_status.update_status_rows(sheet, layout, statuses, pcs)
+            if pcs and not self.unsaved_pcs:
+                self._unsaved_since = self.watcher.clock()
+            self.unsaved_pcs.update(pcs)
+            log("{} changed files, {} PCs, {} rows updated in {:.2f} s.".format(
+                len(batch), len(pcs), rows, perf_counter() - start))
+        if self._save_due():
+            start = perf_counter()
+            changed = len(self.unsaved_pcs)
+            if self._save():
+                log("Saved {} updated PCs in {:.2f} s.".format(changed, perf_counter() - start))
+        return rows
+
+    def _apply_reports(self, batch):
+        """Parse changed reports into ``statuses_by_year`` and audits into ``audit_statuses``.
+
+        Returns the affected PC names.
+        """
+        pcs = set()
+        to_read = []
+        audits_changed = False
+        for path, report in batch.items():
+            if fleet_audit.audit_key(os.path.basename(path)):
+                audits_changed = True
+            elif report is None:
+                pc_name, year = plugin_reports.report_key(os.path.basename(path))
+                self.statuses_by_year.get(year, {}).pop(pc_name, None)
+                pcs.add(pc_name)
+            else:
+                to_read.append((path, report))
+        results = thread_map(lambda item: plugin_reports.parse_report(item[0]), to_read, self.workers)
+        for (path, (pc_name, year, _, _)), (statuses, error) in zip(to_read, results):
+            if error is not None:
+                log("Could not read {}: {}".format(path, error))
+                # Forget it so the next scan picks the file up again
+                self.watcher.known.pop(path, None)
+                continue
+            self.statuses_by_year.setdefault(year, {})[pc_name] = statuses
+            pcs.add(pc_name)
+        if audits_changed:
+            pcs.update(self._apply_audits())
+        return pcs
+
+    def _apply_audits(self):
+        """Aggregate the audit files again (unchanged ones from the cache); returns the PCs whose statuses changed."""
+        errors = []
+        matrix, _, _ = fleet_audit.aggregate(self.watcher.folder, errors=errors, cache=self.audit_cache,
+                                             workers=self.workers)
+        for path, line_number, message in errors:
+            log("{}:{}: {}".format(path, line_number, message))
+        before, self.audit_statuses = self.audit_statuses, matrix.statuses_by_year()
+        pcs = set()
+        for year in set(before).union(self.audit_statuses):
+            old, new = before.get(year, {}), self.audit_statuses.get(year, {})
+            pcs.update(pc_name for pc_name in set(old).union(new) if old.get(pc_name) != new.get(pc_name))
+        return pcs
+
+    def run(self, interval=DEFAULT_INTERVAL):
+        self.full_refresh()
+        log("Watching {} every {:.0f} s.".format(self.watcher.folder, interval))
+        try:
+            while True:
+                time.sleep(interval)
+                try:
+                    self.cycle()
+                except Exception as error:
+                    log("Cycle failed: {}".format(error))
+        finally:
+            if self.backend is not None:
+                self.backend.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Keep the plugin STATUS workbook current from a report folder.")
+    parser.add_argument("workbook", help="STATUS workbook (.xlsx)")
+    parser.add_argument("reports", help="folder with the '<PC> - Revit Plugins <year>.txt' reports")
+    parser.add_argument("--sheet", default="STATUS", help="base worksheet name (default: STATUS)")
+    parser.add_argument("--year", help="Revit year of sheets/blocks without a year "
+                                       "(default: {})".format(plugin_status.DEFAULT_YEAR))
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help="seconds between folder scans (default: %(default)s)")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help="quiet seconds before a batch is written (default: %(default)s)")
+    parser.add_argument("--max-delay", type=float, default=DEFAULT_MAX_DELAY,
+                        help="longest a change may wait during a burst (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="threads reading reports (default: %(default)s)")
+    parser.add_argument("--backend", default=status_backends.DEFAULT_BACKEND,
+                        choices=sorted(status_backends.BACKENDS),
+                        help="output backend (default: %(default)s)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    watch = StatusWatch(args.workbook, args.reports, args.backend, args.sheet, args.year,
+                        args.workers, args.debounce, args.max_delay)
+    try:
+        watch.run(args.interval)
+    except KeyboardInterrupt:
+        log("Stopped.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
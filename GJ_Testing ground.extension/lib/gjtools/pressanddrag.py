@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Keeps Revit's PressAndDrag option switched off without an always-on Idling handler.
+
+The setting can only change through the Options dialog (or another add-in),
+so it is checked when a document is opened, throttled when views are
+activated, and once on the first Idling tick after the Options dialog was
+shown; that Idling handler removes itself again. Every handler counts its
+invocations and cumulative time so the idle overhead can be verified.
+
+pyRevit re-runs startup scripts on reload, so ``install`` keeps the active
+guard in an AppDomain slot and unsubscribes the previous one first.
+"""
+import io
+import json
+
+from gjtools._compat import perf_counter
+
+GUARD_SLOT = "gjtools.pressanddrag.guard"
+VIEW_CHECK_INTERVAL = 2.0
+
+
+class HandlerStats(object):
+    __slots__ = ("calls", "total", "slowest")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.slowest = 0.0
+
+    def add(self, elapsed):
+        self.calls += 1
+        self.total += elapsed
+        if elapsed > self.slowest:
+            self.slowest = elapsed
+
+    def as_dict(self):
+        return {"calls": self.calls, "total_ms": round(self.total * 1000.0, 3),
+                "slowest_ms": round(self.slowest * 1000.0, 3)}
+
+
+class PressAndDragGuard(object):
+    """Event-driven PressAndDrag check for one ``UIApplication``.
+
+    ``on_reenabled()`` is called after the option was found on and switched off.
+    With ``stats_path`` the handler statistics are appended there when Revit closes.
+    """
+
+    def __init__(self, uiapp, on_reenabled=None, stats_path=None, view_interval=VIEW_CHECK_INTERVAL,
+                 clock=perf_counter):
+        self.uiapp = uiapp
+        self.app = uiapp.Application
+        self.on_reenabled = on_reenabled
+        self.stats_path = stats_path
+        self.view_interval = view_interval
+        self.clock = clock
+        self.stats = {}
+        self.checks = 0
+        self.corrections = 0
+        self.subscribed = False
+        self._last_check = None
+        self._idling_armed = False
+        self._document_opened = self._timed("DocumentOpened", self._on_document_opened)
+        self._view_activated = self._timed("ViewActivated", self._on_view_activated)
+        self._options_dialog = self._timed("DisplayingOptionsDialog", self._on_options_dialog)
+        self._idling = self._timed("Idling", self._on_idling)
+        self._closing = self._timed("ApplicationClosing", self._on_closing)
+
+    def _timed(self, name, handler):
+        stats = self.stats.setdefault(name, HandlerStats())
+        clock = self.clock
+
+        def timed_handler(sender, args):
+            start = clock()
+            try:
+                handler(sender, args)
+            finally:
+                stats.add(clock() - start)
+        return timed_handler
+
+    def subscribe(self):
+        if self.subscribed:
+            return
+        self.app.DocumentOpened += self._document_opened
+        self.uiapp.ViewActivated += self._view_activated
+        self.uiapp.DisplayingOptionsDialog += self._options_dialog
+        self.uiapp.ApplicationClosing += self._closing
+        self.subscribed = True
+
+    def unsubscribe(self):
+        if not self.subscribed:
+            return
+        self._disarm_idling()
+        self.app.DocumentOpened -= self._document_opened
+        self.uiapp.ViewActivated -= self._view_activated
+        self.uiapp.DisplayingOptionsDialog -= self._options_dialog
+        self.uiapp.ApplicationClosing -= self._closing
+        self.subscribed = False
+
+    def check(self, force=True):
+        """Switch PressAndDrag off if it is on; returns True when it had to."""
+        now = self.clock()
+        if not force and self._last_check is not None and now - self._last_check < self.view_interval:
+            return False
+        self._last_check = now
+        self.checks += 1
+        if not self.app.PressAndDragEnabled:
+            return False
+        self.app.PressAndDragEnabled = False
+        self.corrections += 1
+        if self.on_reenabled is not None:
+            self.on_reenabled()
+        return True
+
+    def _arm_idling(self):
+        if not self._idling_armed:
+            self.uiapp.Idling += self._idling
+            self._idling_armed = True
+
+    def _disarm_idling(self):
+        if self._idling_armed:
+            self.uiapp.Idling -= self._idling
+            self._idling_armed = False
+
+    def _on_document_opened(self, sender, args):
+        self.check()
+
+    def _on_view_activated(self, sender, args):
+        self.check(force=False)
+
+    def _on_options_dialog(self, sender, args):
+        # The dialog is modal; the first Idling tick comes after it closed
+        self._arm_idling()
+
+    def _on_idling(self, sender, args):
+        self._disarm_idling()
+        self.check()
+
+    def _on_closing(self, sender, args):
+        self.unsubscribe()
+        if self.stats_path:
+            try:
+                self.append_summary(self.stats_path)
+            except (IOError, OSError):
+                pass
+
+    def summary(self):
+        return {
+            "checks": self.checks,
+            "corrections": self.corrections,
+            "handlers": dict((name, stats.as_dict()) for name, stats in self.stats.items()),
+        }
+
+    def append_summary(self, path):
+        """Append ``summary()`` as one JSON line to ``path``."""
+        with io.open(path, "a", encoding="utf-8") as f:
+            f.write(u"{}\n".format(json.dumps(self.summary(), sort_keys=True)))
+
+
+def current_guard():
+    """Guard installed by the startup script in this Revit session, or None."""
+    from System import AppDomain
+    return AppDomain.CurrentDomain.GetData(GUARD_SLOT)
+
+
+def install(uiapp, on_reenabled=None, stats_path=None):
+    """Replace any previous guard with a new subscribed one and return it."""
+    from System import AppDomain
+    previous = current_guard()
+    if previous is not None:
+        previous.unsubscribe()
+    guard = PressAndDragGuard(uiapp, on_reenabled, stats_path)
+    guard.subscribe()
+    AppDomain.CurrentDomain.SetData(GUARD_SLOT, guard)
+    return guard
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""Per-phase profiling of the buttons.
+
+A button wraps its run in ``tool``; the shared helpers mark their phases
+(``collect``, ``compute``, ``checkout``, ``write``, ``commit``, ``dialog``,
+and ``output`` for emitting ``tool_log`` messages) and add
+counts such as the elements processed::
+
+    with profiling.tool(__file__) as prof:
+        with profiling.phase("collect"):
+            panels = ...
+        profiling.count(elements=len(panels))
+
+Phase times are exclusive: a nested phase pauses the one around it, and
+time outside any phase is reported as ``other``. One record per run is
+appended to a rotating JSONL file next to the startup telemetry. When
+profiling is off, ``tool`` yields ``NULL_PROFILE`` and ``phase``/``count``
+return at once, so the hooks can stay in the code. It is switched on with
+Shift+click on the Profiling Report button, or with ``GJTOOLS_PROFILE=1``.
+"""
+import os
+import sys
+from contextlib import contextmanager
+from functools import wraps
+
+from gjtools import telemetry
+from gjtools._compat import perf_counter
+
+PHASES = ("collect", "compute", "checkout", "write", "commit", "dialog", "output")
+OTHER = "other"
+PROFILE_FILE_ID = "gjtools_profile"
+CONFIG_SECTION = "GJToolsProfiling"
+ENV_VAR = "GJTOOLS_PROFILE"
+
+_active = None
+
+
+def default_path():
+    from pyrevit.coreutils import appdata
+    return appdata.get_data_file(PROFILE_FILE_ID, "jsonl")
+
+
+def _config():
+    from pyrevit import script
+    return script.get_config(CONFIG_SECTION)
+
+
+def is_enabled():
+    value = os.environ.get(ENV_VAR)
+    if value is not None:
+        return value not in ("", "0")
+    try:
+        return bool(_config().get_option("enabled", False))
+    except Exception:
+        return False
+
+
+def set_enabled(enabled):
+    from pyrevit import script
+    _config().enabled = bool(enabled)
+    script.save_config()
+
+
+class _NullPhase(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase(object):
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.profile._push(self.name)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile._pop()
+        return False
+
+
+class NullProfile(object):
+    """What ``tool`` yields while profiling is off."""
+    enabled = False
+
+    def phase(self, name):
+        return _NULL_PHASE
+
+    def count(self, **counts):
+        pass
+
+    def finish(self, error=None):
+        pass
+
+
+NULL_PROFILE = NullProfile()
+
+
+class Profile(object):
+    enabled = True
+
+    def __init__(self, name, clock=perf_counter):
+        self.name = name
+        self.clock = clock
+        self.phases = {}
+        self.counts = {}
+        self._stack = []
+        self._start = clock()
+        self.seconds = None
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def count(self, **counts):
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def _charge(self, frame, now):
+        self.phases[frame[0]] = self.phases.get(frame[0], 0.0) + now - frame[1]
+
+    def _push(self, name):
+        now = self.clock()
+        if self._stack:
+            self._charge(self._stack[-1], now)
+        self._stack.append([name, now])
+
+    def _pop(self):
+        now = self.clock()
+        self._charge(self._stack.pop(), now)
+        if self._stack:
+            self._stack[-1][1] = now
+
+    def finish(self, error=None):
+        """Stop the clock; returns the record fields (phase times in ms)."""
+        now = self.clock()
+        while self._stack:
+            self._pop()
+        self.seconds = now - self._start
+        other = self.seconds - sum(self.phases.values())
+        phases = dict((name, round(seconds * 1000.0, 3)) for name, seconds in self.phases.items())
+        if other > 0:
+            phases[OTHER] = round(other * 1000.0, 3)
+        fields = {"phases": phases, "counts": dict(self.counts)}
+        if error:
+            fields["error"] = error
+        return fields
+
+
+def tool_name(script_path_or_name):
+    if script_path_or_name.endswith(".py"):
+        return telemetry.bundle_name(script_path_or_name)
+    return script_path_or_name
+
+
+@contextmanager
+def tool(script_path_or_name, path=None):
+    """Profile one run of a button; yields the ``Profile`` (or ``NULL_PROFILE``)."""
+    global _active
+    if not is_enabled():
+        yield NULL_PROFILE
+        return
+    profile = Profile(tool_name(script_path_or_name))
+    previous, _active = _active, profile
+    error = None
+    try:
+        yield profile
+    except SystemExit:
+        # pyRevit's exitscript: a cancelled run, not a failure
+        raise
+    except BaseException:
+        error = sys.exc_info()[0].__name__
+        raise
+    finally:
+        _active = previous
+        record(profile, profile.finish(error), path)
+
+
+def record(profile, fields, path=None):
+    """Append the record of a finished ``Profile`` (``fields`` from its ``finish``)."""
+    try:
+        recorder = telemetry.Telemetry(path or default_path())
+    except Exception:
+        recorder = None
+    if recorder is not None:
+        recorder.record("profile", profile.name, profile.seconds, **fields)
+
+
+def phase(name):
+    """Context manager timing ``name`` in the active profile (no-op without one)."""
+    if _active is None:
+        return _NULL_PHASE
+    return _Phase(_active, name)
+
+
+def count(**counts):
+    if _active is not None:
+        _active.count(**counts)
+
+
+def phased(name):
+    """Decorator form of ``phase``."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with _Phase(_active, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def read_records(path):
+    """Profile records from ``path`` and its rotated predecessor."""
+    for record in telemetry.read_records([path + ".1", path]):
+        if record["kind"] == "profile":
+            yield record
+
+
+def _phase_order(name):
+    return PHASES.index(name) if name in PHASES else len(PHASES)
+
+
+def summarize(records):
+    """Per tool and phase timings plus per tool totals.
+
+    Returns ``(phase_rows, tool_rows)``:
+    ``[(tool, phase, runs, p50_ms, p90_ms, max_ms)]`` and
+    ``[(tool, runs, errors, p50_ms, p90_ms, p50_elements)]``.
+    """
+    by_phase = {}
+    by_tool = {}
+    for record in records:
+        name = record.get("name", "")
+        entry = by_tool.setdefault(name, {"ms": [], "errors": 0, "elements": []})
+        entry["ms"].append(float(record["ms"]))
+        if record.get("error"):
+            entry["errors"] += 1
+        counts = record.get("counts") or {}
+        if "elements" in counts:
+            entry["elements"].append(counts["elements"])
+        for phase_name, ms in (record.get("phases") or {}).items():
+            by_phase.setdefault((name, phase_name), []).append(float(ms))
+
+    phase_rows = []
+    for (name, phase_name), values in by_phase.items():
+        ordered = sorted(values)
+        phase_rows.append((name, phase_name, len(values), telemetry.percentile(ordered, 0.5),
+                           telemetry.percentile(ordered, 0.9), ordered[-1]))
+    phase_rows.sort(key=lambda row: (row[0], _phase_order(row[1]), row[1]))
+
+    tool_rows = []
+    for name, entry in by_tool.items():
+        ordered = sorted(entry["ms"])
+        tool_rows.append((name, len(ordered), entry["errors"], telemetry.percentile(ordered, 0.5),
+                          telemetry.percentile(ordered, 0.9), telemetry.percentile(sorted(entry["elements"]), 0.5)))
+    tool_rows.sort(key=lambda row: -row[3])
+    return phase_rows, tool_rows
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""FilteredElementCollector shortcuts shared by the buttons (Revit only)."""
+from gjtools import profiling
+from gjtools.lazy import DB
+
+
+def collector(doc, view=None):
+    if view is None:
+        return DB.FilteredElementCollector(doc)
+    return DB.FilteredElementCollector(doc, view.Id)
+
+
+def of_category(doc, category, view=None):
+    """Elements of a ``BuiltInCategory``, optionally only those visible in ``view``."""
+    with profiling.phase("collect"):
+        return collector(doc, view).OfCategory(category).ToElements()
+
+
+def of_class(doc, cls, view=None):
+    return collector(doc, view).OfClass(cls)
+
+
+def ids_by_name(doc, cls, names):
+    """``{name: ElementId}`` of the first element of ``cls`` per wanted name, in one pass."""
+    wanted = set(names)
+    found = {}
+    for element in of_class(doc, cls):
+        name = element.Name
+        if name in wanted and name not in found:
+            found[name] = element.Id
+            if len(found) == len(wanted):
+                break
+    return found
+
+
+def id_by_name(doc, cls, name):
+    return ids_by_name(doc, cls, [name]).get(name)
+
+
+def parameter_element_id(doc, name):
+    """Id of the project/shared ``ParameterElement`` called ``name``, or None."""
+    return id_by_name(doc, DB.ParameterElement, name)
+
+
+def solid_fill_pattern(doc):
+    return next((fp for fp in of_class(doc, DB.FillPatternElement) if fp.GetFillPattern().IsSolidFill), None)
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Aggregated handling of the warnings and errors of bulk transactions (Revit only).
+
+A button wraps its run in ``session``; every ``revit_transactions.transaction``
+opened meanwhile gets a failures preprocessor that counts the failures by
+definition, handles the configured ones and lets the commit go on::
+
+    with profiling.tool(__file__), revit_failures.session() as failures:
+        with transaction(doc, "Copy Parameter Values"):
+            ...
+    # failures.summary_lines(): "Elements have duplicate 'Mark' values. (warning, 512x, kept)"
+
+Actions per failure definition are ``dismiss`` (delete the warning),
+``resolve`` (apply its default resolution) and ``keep`` (left to Revit).
+Warnings and errors are kept, so they stay in the model as QA signals;
+only the definitions listed in the ``rules`` option of the
+``GJToolsFailures`` config section are dismissed or resolved. Its keys are
+failure definition GUIDs or ``BuiltInFailures`` names::
+
+    {"GeneralFailures.DuplicateValue": "dismiss"}
+
+When every warning of a commit is dismissed they go in one
+``DeleteAllWarnings`` call. The summary is logged through ``tool_log`` when
+the session ends.
+"""
+from contextlib import contextmanager
+
+from gjtools import profiling, tool_log
+from gjtools.lazy import DB
+
+DISMISS = "dismiss"
+RESOLVE = "resolve"
+KEEP = "keep"
+ACTIONS = (DISMISS, RESOLVE, KEEP)
+ACTION_NAMES = {DISMISS: "dismissed", RESOLVE: "resolved", KEEP: "kept"}
+SUMMARY_COLUMNS = ["Failure", "Severity", "Count", "Outcome"]
+CONFIG_SECTION = "GJToolsFailures"
+
+_active = None
+_preprocessor_type = None
+
+
+def configured_rules():
+    """``({definition: action}, warning_action)`` from the config section; defaults when unset."""
+    try:
+        from pyrevit import script
+        config = script.get_config(CONFIG_SECTION)
+        rules = dict(config.get_option("rules", {}) or {})
+        warnings = config.get_option("warnings", KEEP)
+    except Exception:
+        return {}, KEEP
+    return rules, warnings if warnings in ACTIONS else KEEP
+
+
+def definition_key(definition):
+    """Lowercase GUID string of a failure definition: a ``FailureDefinitionId``, GUID or ``BuiltInFailures`` name."""
+    if hasattr(definition, "Guid"):
+        return str(definition.Guid).lower()
+    definition = str(definition)
+    if "." in definition:
+        group, name = definition.split(".", 1)
+        return str(getattr(getattr(DB.BuiltInFailures, group), name).Guid).lower()
+    return definition.lower()
+
+
+class FailureEntry(object):
+    """The failures of one definition: how often they occurred and how many were handled."""
+
+    __slots__ = ("key", "description", "severity", "action", "count", "handled")
+
+    def __init__(self, key, description, severity, action):
+        self.key = key
+        self.description = description
+        self.severity = severity
+        self.action = action
+        self.count = 0
+        self.handled = 0
+
+    @property
+    def outcome(self):
+        if self.handled == self.count:
+            return ACTION_NAMES[self.action]
+        if not self.handled:
+            return ACTION_NAMES[KEEP]
+        return "{} {}, {} kept".format(self.handled, ACTION_NAMES[self.action], self.count - self.handled)
+
+
+class FailureLog(object):
+    """Failure counts of a run and the actions to take; ``preprocess`` is called by Revit per commit."""
+
+    def __init__(self, rules=None, warnings=KEEP, errors=KEEP):
+        self.rules = {}
+        for definition, action in (rules or {}).items():
+            try:
+                self.rules[definition_key(definition)] = action if action in ACTIONS else KEEP
+            except AttributeError:
+                tool_log.warning("Unknown failure definition '{}' in the failure rules.", definition)
+        self.warnings = warnings
+        self.errors = errors
+        self.entries = {}
+        # Definition key -> failures kept on the previous pass of the current commit
+        self._kept = {}
+        self._preprocessor = None
+
+    def action_for(self, key, is_warning):
+        action = self.rules.get(key)
+        if action is None:
+            return self.warnings if is_warning else self.errors
+        if action == DISMISS and not is_warning:
+            # Errors cannot be deleted, only resolved
+            return RESOLVE
+        return action
+
+    def preprocess(self, accessor):
+        """Count and handle the failures of one commit; returns the ``FailureProcessingResult``.
+
+        After ``ProceedWithCommit`` Revit calls this again with the failures
+        left, so the ones kept on the previous pass are not counted twice.
+        """
+        messages = list(accessor.GetFailureMessages())
+        result = DB.FailureProcessingResult.Continue
+        previous, self._kept = self._kept, {}
+        if not messages:
+            return result
+        warning = DB.FailureSeverity.Warning
+        dismissed = []
+        kept = self._kept
+        for message in messages:
+            key = str(message.GetFailureDefinitionId().Guid).lower()
+            entry = self.entries.get(key)
+            if entry is None:
+                # Severity and description belong to the definition: read once, not per failure
+                is_warning = message.GetSeverity() == warning
+                entry = FailureEntry(key, message.GetDescriptionText(), "warning" if is_warning else "error",
+                                     self.action_for(key, is_warning))
+                self.entries[key] = entry
+            entry.count += 1
+            if entry.action == DISMISS:
+                dismissed.append(message)
+                entry.handled += 1
+            elif entry.action == RESOLVE and message.HasResolutions():
+                accessor.ResolveFailure(message)
+                entry.handled += 1
+                result = DB.FailureProcessingResult.ProceedWithCommit
+            else:
+                kept[key] = kept.get(key, 0) + 1
+        repeated = 0
+        for key, count in previous.items():
+            count = min(count, kept.get(key, 0))
+            self.entries[key].count -= count
+            repeated += count
+        if len(dismissed) == len(messages):
+            accessor.DeleteAllWarnings()
+        else:
+            for message in dismissed:
+                accessor.DeleteWarning(message)
+        profiling.count(failures=len(messages) - repeated)
+        return result
+
+    def preprocessor(self):
+        if self._preprocessor is None:
+            self._preprocessor = preprocessor_type()(self)
+        return self._preprocessor
+
+    def attach(self, t):
+        """Let this log preprocess the failures of transaction ``t`` (before ``t.Start()``)."""
+        self._kept = {}
+        options = t.GetFailureHandlingOptions()
+        options.SetFailuresPreprocessor(self.preprocessor())
+        options.SetClearAfterRollback(True)
+        t.SetFailureHandlingOptions(options)
+
+    @property
+    def total(self):
+        return sum(entry.count for entry in self.entries.values())
+
+    def summary_rows(self):
+        """``[description, severity, count, outcome]`` per definition, most frequent first."""
+        entries = sorted(self.entries.values(), key=lambda entry: (-entry.count, entry.description))
+        return [[entry.description, entry.severity, entry.count, entry.outcome] for entry in entries]
+
+    def summary_lines(self):
+        return ["{} ({}, {}x, {})".format(*row) for row in self.summary_rows()]
+
+    def report(self):
+        """Log the summary: kept failures as warnings, handled ones as info."""
+        for description, severity, count, outcome in self.summary_rows():
+            emit = tool_log.info if outcome in (ACTION_NAMES[DISMISS], ACTION_NAMES[RESOLVE]) else tool_log.warning
+            emit("Revit {} {}x, {}: {}", severity, count, outcome, description)
+
+
+def preprocessor_type():
+    """``IFailuresPreprocessor`` implementation forwarding to a ``FailureLog`` (built on first use)."""
+    global _preprocessor_type
+    if _preprocessor_type is None:
+        class FailuresPreprocessor(DB.IFailuresPreprocessor):
+            def __init__(self, log):
+                self.log = log
+
+            def PreprocessFailures(self, accessor):
+                return self.log.preprocess(accessor)
+
+        _preprocessor_type = FailuresPreprocessor
+    return _preprocessor_type
+
+
+def current():
+    """The active session's ``FailureLog``, or None."""
+    return _active
+
+
+@contextmanager
+def session(rules=None, warnings=None, report=True):
+    """Handle the failures of every transaction in the ``with`` block; the summary is logged at the end."""
+    global _active
+    if rules is None or warnings is None:
+        configured, configured_warnings = configured_rules()
+        rules = configured if rules is None else rules
+        warnings = configured_warnings if warnings is None else warnings
+    log = FailureLog(rules, warnings)
+    previous, _active = _active, log
+    try:
+        yield log
+    finally:
+        _active = previous
+    if report:
+        log.report()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""Parameter lookups shared by the buttons (Revit only)."""
+from gjtools import profiling, worksharing
+from gjtools.lazy import DB
+
+
+def element_type(doc, element):
+    type_id = element.GetTypeId()
+    if type_id is None or type_id == DB.ElementId.InvalidElementId:
+        return None
+    return doc.GetElement(type_id)
+
+
+def lookup(element, name, doc=None):
+    """Instance parameter ``name``; falls back to the type parameter when ``doc`` is given."""
+    param = element.LookupParameter(name)
+    if param is None and doc is not None:
+        elem_type = element_type(doc, element)
+        if elem_type is not None:
+            param = elem_type.LookupParameter(name)
+    return param
+
+
+def value_string(element, name, doc=None):
+    """Display string of a parameter, or None when it is missing or empty."""
+    param = lookup(element, name, doc)
+    return param.AsValueString() if param is not None else None
+
+
+def parameter_value(param):
+    """Raw value of ``param`` according to its storage type, or None."""
+    storage = param.StorageType
+    if storage == DB.StorageType.String:
+        return param.AsString()
+    if storage == DB.StorageType.Integer:
+        return param.AsInteger()
+    if storage == DB.StorageType.Double:
+        return param.AsDouble()
+    if storage == DB.StorageType.ElementId:
+        return param.AsElementId()
+    return None
+
+
+@profiling.phased("compute")
+def parameter_info(doc, elements):
+    """``{name: is_read_only}`` over the instance and type parameters of ``elements``.
+
+    A name counts as writable when it is writable on any element.
+    """
+    profiling.count(elements=len(elements))
+    info = {}
+    types_seen = set()
+    for elem in elements:
+        sources = [elem]
+        elem_type = element_type(doc, elem)
+        if elem_type is not None:
+            type_key = elem_type.Id.IntegerValue
+            if type_key not in types_seen:
+                types_seen.add(type_key)
+                sources.append(elem_type)
+        for source in sources:
+            for param in source.Parameters:
+                name = param.Definition.Name
+                if not info.get(name, True):
+                    continue
+                info[name] = param.IsReadOnly
+    return info
+
+
+def editable_elements(doc, elements, name):
+    """``(elements, error_log)``: the elements whose parameter ``name`` this user can write.
+
+    The element carrying the parameter (instance, or its type) is checked out
+    in bulk before the transaction; elements that could not be checked out
+    are logged with the reason (owned by another user, or the checkout error).
+    """
+    carriers = []
+    for elem in elements:
+        carrier = elem
+        if elem.LookupParameter(name) is None:
+            carrier = element_type(doc, elem) or elem
+        carriers.append(carrier.Id)
+    checkout = worksharing.checkout(doc, carriers)
+    if not checkout.blocked:
+        return list(elements), []
+    editable = []
+    error_log = []
+    for elem, carrier_id in zip(elements, carriers):
+        if checkout.can_edit(carrier_id):
+            editable.append(elem)
+        else:
+            error_log.append("Element ID {} ('{}'): Not editable, {}.".format(
+                elem.Id.IntegerValue, elem.Name if hasattr(elem, 'Name') else "Unnamed Element",
+                checkout.blocked_reason(carrier_id)))
+    return editable, error_log
+
+
+@profiling.phased("write")
+def copy_parameter_values(doc, elements, src_name, dest_name, convert_values=False):
+    """Copy ``src_name`` into ``dest_name`` on every element (call inside a transaction).
+
+    Type parameters are used when the instance has none. Returns
+    ``(elements_processed, error_log)``.
+    """
+    profiling.count(elements=len(elements))
+    error_log = []
+    elements_processed = 0
+    for elem in elements:
+        elem_name = elem.Name if hasattr(elem, 'Name') else "Unnamed Element"
+        elem_id = elem.Id.IntegerValue
+
+        src_param = lookup(elem, src_name, doc)
+        dest_param = lookup(elem, dest_name, doc)
+
+        if not src_param:
+            error_log.append("Element ID {} ('{}'): Source parameter '{}' not found.".format(elem_id, elem_name, src_name))
+            continue
+        if not dest_param:
+            error_log.append("Element ID {} ('{}'): Destination parameter '{}' not found.".format(elem_id, elem_name, dest_name))
+            continue
+
+        if src_param.IsReadOnly:
+            error_log.append("Element ID {} ('{}'): Source parameter '{}' is read-only.".format(elem_id, elem_name, src_name))
+            continue
+        if dest_param.IsReadOnly:
+            error_log.append("Element ID {} ('{}'): Destination parameter '{}' is read-only.".format(elem_id, elem_name, dest_name))
+            continue
+
+        try:
+            src_value = parameter_value(src_param)
+            if src_value is None:
+                error_log.append("Element ID {} ('{}'): Source parameter '{}' has no value.".format(elem_id, elem_name, src_name))
+                continue
+
+            src_storage = src_param.StorageType
+            dest_storage = dest_param.StorageType
+            if dest_storage == src_storage:
+                dest_param.Set(src_value)
+                elements_processed += 1
+            elif dest_storage == DB.StorageType.String and convert_values:
+                dest_param.Set(str(src_value))
+                elements_processed += 1
+            else:
+                error_log.append("Element ID {} ('{}'): Type mismatch between source parameter '{}' and destination parameter '{}'.".format(
+                    elem_id, elem_name, src_name, dest_name))
+        except Exception as e:
+            error_log.append("Element ID {} ('{}'): Error - {}".format(elem_id, elem_name, str(e)))
+    return elements_processed, error_log
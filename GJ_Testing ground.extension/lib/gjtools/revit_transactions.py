@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Transaction helpers shared by the buttons (Revit only).
+
+Inside a ``revit_failures.session`` every ``transaction`` has its failures
+preprocessed by the session's ``FailureLog``.
+"""
+from contextlib import contextmanager
+
+from gjtools import profiling, revit_failures
+from gjtools.lazy import DB
+
+
+@contextmanager
+def transaction(doc, name, failures=None):
+    """Run the ``with`` block in a transaction; committed on success, rolled back on error.
+
+    ``failures`` (a ``FailureLog``) defaults to the active failures session.
+    """
+    t = DB.Transaction(doc, name)
+    failures = failures or revit_failures.current()
+    if failures is not None:
+        failures.attach(t)
+    t.Start()
+    try:
+        yield t
+    except Exception:
+        if t.HasStarted() and not t.HasEnded():
+            t.RollBack()
+        raise
+    if t.HasStarted() and not t.HasEnded():
+        with profiling.phase("commit"):
+            t.Commit()
+
+
+@contextmanager
+def sub_transaction(doc):
+    """Part of an open transaction that is rolled back alone when the block raises."""
+    st = DB.SubTransaction(doc)
+    st.Start()
+    try:
+        yield st
+    except Exception:
+        if st.HasStarted() and not st.HasEnded():
+            st.RollBack()
+        raise
+    if st.HasStarted() and not st.HasEnded():
+        st.Commit()
+
+
+@contextmanager
+def transaction_group(doc, name):
+    """Group the transactions of the ``with`` block into one undo step; all rolled back on error."""
+    group = DB.TransactionGroup(doc, name)
+    group.Start()
+    try:
+        yield group
+    except Exception:
+        if group.HasStarted() and not group.HasEnded():
+            group.RollBack()
+        raise
+    if group.HasStarted() and not group.HasEnded():
+        with profiling.phase("commit"):
+            group.Assimilate()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""Output backends for the Plugin Checker STATUS workbook.
+
+Both backends expose the same workbook interface (``sheet_names``,
+``get_sheet``, ``save``, ``close``) and the same small sheet interface used by
+``plugin_status``: ``read_block``, ``write_block``, ``last_used_row``,
+``last_used_column`` and ``fill``.
+
+* ``xlsx`` edits the file directly with ``gjtools.xlsx``. No Excel needed,
+  so it also runs unattended or on a build agent.
+* ``com`` drives Excel through ``Microsoft.Office.Interop.Excel``. It is
+  Windows/IronPython only.
+"""
+from gjtools import plugin_status
+
+DEFAULT_BACKEND = 'xlsx'
+
+
+class XlsxBackend(object):
+    name = 'xlsx'
+
+    def __init__(self, path):
+        from gjtools.xlsx import XlsxWorkbook
+        self.path = path
+        self.workbook = XlsxWorkbook(path)
+
+    @property
+    def sheet_names(self):
+        return self.workbook.sheet_names
+
+    def get_sheet(self, name):
+        return self.workbook.sheet(name)
+
+    def save(self):
+        self.workbook.save()
+
+    def close(self):
+        self.workbook.close()
+
+
+class ComSheet(object):
+    """Backend sheet interface over an Excel COM worksheet."""
+
+    def __init__(self, sheet):
+        self.sheet = sheet
+
+    def read_block(self, row1, col1, row2, col2):
+        from gjtools import excel_com
+        return excel_com.read_block(self.sheet, row1, col1, row2, col2)
+
+    def write_block(self, row1, col1, rows):
+        from gjtools import excel_com
+        excel_com.write_block(self.sheet, row1, col1, rows)
+
+    def last_used_row(self):
+        from gjtools import excel_com
+        return excel_com.last_used_row(self.sheet)
+
+    def last_used_column(self):
+        from gjtools import excel_com
+        return excel_com.last_used_column(self.sheet)
+
+    def fill(self, rects, color):
+        from gjtools import excel_com
+        excel_com.fill_addresses(self.sheet, plugin_status.union_addresses(rects), color)
+
+
+class ComBackend(object):
+    name = 'com'
+
+    def __init__(self, path):
+        from gjtools.lazy import Excel
+        self.path = path
+        self.excel_app = Excel.ApplicationClass()
+        self.excel_app.Visible = False
+        self.excel_app.ScreenUpdating = False
+        try:
+            self.workbook = self.excel_app.Workbooks.Open(path, ReadOnly=False)
+        except Exception:
+            self.excel_app.Quit()
+            raise
+        self._sheets = {}
+
+    @property
+    def sheet_names(self):
+        return [sheet.Name for sheet in self.workbook.Worksheets]
+
+    def get_sheet(self, name):
+        sheet = self._sheets.get(name)
+        if sheet is None:
+            sheet = self._sheets[name] = ComSheet(self.workbook.Worksheets(name))
+        return sheet
+
+    def save(self):
+        self.excel_app.ScreenUpdating = True
+        self.workbook.SaveAs(self.path)
+
+    def close(self):
+        self.workbook.Close(SaveChanges=False)
+        self.excel_app.Quit()
+
+
+BACKENDS = {
+    XlsxBackend.name: XlsxBackend,
+    ComBackend.name: ComBackend,
+}
+
+
+def open_backend(name, path):
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError("Unknown STATUS backend '{}', expected one of: {}".format(
+            name, ", ".join(sorted(BACKENDS))))
+    return backend_class(path)
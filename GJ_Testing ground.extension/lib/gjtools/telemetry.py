@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""Local startup and load-time telemetry.
+
+Startup hooks and buttons append one JSON line per measurement to a file in
+pyRevit's app data folder::
+
+    {"kind": "hook", "name": "disable_pressanddrag", "ms": 12.3, "session": "...", "time": "..."}
+
+``kind`` is ``hook`` (a startup script), ``session`` (Revit launch until the
+startup hooks ran) or ``bundle`` (a button from click until its code is
+loaded). The file is rotated once it grows past ``MAX_BYTES``; writing
+never raises, so telemetry cannot break Revit startup. ``summarize`` turns
+the records into per-name percentiles for the Startup Telemetry button.
+"""
+import io
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from gjtools._compat import perf_counter
+
+TELEMETRY_FILE_ID = "gjtools_telemetry"
+MAX_BYTES = 1 << 20
+
+
+def default_path():
+    from pyrevit.coreutils import appdata
+    return appdata.get_data_file(TELEMETRY_FILE_ID, "jsonl")
+
+
+def session_id():
+    """Revit process id and start time, the same for every script engine of one session."""
+    try:
+        from System.Diagnostics import Process
+    except ImportError:
+        return str(os.getpid())
+    process = Process.GetCurrentProcess()
+    return "{}-{}".format(process.Id, process.StartTime.ToString("yyyyMMddHHmmss"))
+
+
+def rotate(path, max_bytes=MAX_BYTES):
+    """Move ``path`` to ``path + '.1'`` once it is larger than ``max_bytes``."""
+    try:
+        if os.path.getsize(path) <= max_bytes:
+            return False
+    except OSError:
+        return False
+    old = path + ".1"
+    if os.path.exists(old):
+        os.remove(old)
+    os.rename(path, old)
+    return True
+
+
+class Telemetry(object):
+    def __init__(self, path, max_bytes=MAX_BYTES, session=None, clock=perf_counter):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.session = session or session_id()
+        self.clock = clock
+
+    def record(self, kind, name, seconds, **fields):
+        fields.update({
+            "kind": kind,
+            "name": name,
+            "ms": round(seconds * 1000.0, 3),
+            "session": self.session,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        try:
+            rotate(self.path, self.max_bytes)
+            with io.open(self.path, "a", encoding="utf-8") as f:
+                f.write(u"{}\n".format(json.dumps(fields, sort_keys=True)))
+        except (IOError, OSError):
+            return False
+        return True
+
+    @contextmanager
+    def timed(self, kind, name, **fields):
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.record(kind, name, self.clock() - start, **fields)
+
+
+def bundle_name(script_path):
+    """``Panel / Button`` for a bundle's ``script.py`` path."""
+    button = os.path.dirname(os.path.abspath(script_path))
+    panel = os.path.dirname(button)
+    return "{} / {}".format(os.path.splitext(os.path.basename(panel))[0],
+                            os.path.splitext(os.path.basename(button))[0])
+
+
+@contextmanager
+def bundle(script_path):
+    """Time a button from the start of its script until the ``with`` block ends."""
+    try:
+        telemetry = Telemetry(default_path())
+    except Exception:
+        telemetry = None
+    if telemetry is None:
+        yield
+        return
+    with telemetry.timed("bundle", bundle_name(script_path)):
+        yield
+
+
+def revit_uptime():
+    """Seconds since the Revit process started."""
+    from System import DateTime
+    from System.Diagnostics import Process
+    return (DateTime.Now - Process.GetCurrentProcess().StartTime).TotalSeconds
+
+
+def notify(message, title="GJ_TestingGround"):
+    """Non-modal notification (Windows toast); falls back to the output window."""
+    try:
+        from pyrevit import forms
+        forms.toast(message, title=title)
+    except Exception:
+        print("{}: {}".format(title, message))
+
+
+def read_records(paths):
+    """Telemetry records from ``paths`` (oldest file first); bad lines are skipped."""
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with io.open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and "kind" in record and "ms" in record:
+                    yield record
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = int(round(fraction * (len(sorted_values) - 1)))
+    return sorted_values[rank]
+
+
+def summarize(records):
+    """``[(kind, name, count, last_ms, p50_ms, p90_ms, max_ms)]`` sorted by kind and slowest median."""
+    by_name = {}
+    for record in records:
+        by_name.setdefault((record["kind"], record.get("name", "")), []).append(float(record["ms"]))
+    rows = []
+    for (kind, name), values in by_name.items():
+        ordered = sorted(values)
+        rows.append((kind, name, len(values), values[-1], percentile(ordered, 0.5),
+                     percentile(ordered, 0.9), ordered[-1]))
+    rows.sort(key=lambda row: (row[0], -row[4]))
+    return rows
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""Leveled, buffered messages of the buttons.
+
+Helpers log instead of printing; a button collects its messages in a
+``session`` and they are written to the output window in one go when the
+run ends (one table, or one block of text when everything is INFO)::
+
+    with profiling.tool(__file__), tool_log.session(__file__):
+        tool_log.debug("Panel {} -> {}", panel_id, comment)
+        tool_log.info("{} elements were modified.", count)
+
+Messages below the tool's level are dropped before they are formatted.
+The level is INFO unless set per tool or for all tools (Shift+click on the
+Profiling Report button) or with ``GJTOOLS_LOG_LEVEL``. With the log file
+on, every session also appends its messages to a rotating file in pyRevit's
+app data folder. Emitting is timed as the ``output`` profiling phase.
+Outside a session (command line tools) messages are printed at once.
+"""
+import io
+import os
+import time
+from contextlib import contextmanager
+
+from gjtools import profiling, telemetry
+from gjtools._compat import perf_counter
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS = dict((name.lower(), level) for level, name in LEVEL_NAMES.items())
+DEFAULT_LEVEL = INFO
+LOG_FILE_ID = "gjtools_log"
+CONFIG_SECTION = "GJToolsLogging"
+ENV_VAR = "GJTOOLS_LOG_LEVEL"
+
+_active = None
+
+
+def default_path():
+    from pyrevit.coreutils import appdata
+    return appdata.get_data_file(LOG_FILE_ID, "log")
+
+
+def parse_level(value, default=DEFAULT_LEVEL):
+    """Level for a name (``"debug"``) or number; ``default`` when unknown."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return LEVELS.get(str(value).strip().lower(), default)
+
+
+def _config():
+    from pyrevit import script
+    return script.get_config(CONFIG_SECTION)
+
+
+def level_for(name):
+    """Level of tool ``name``: environment, then its own setting, then the setting for all tools."""
+    value = os.environ.get(ENV_VAR)
+    if value:
+        return parse_level(value)
+    try:
+        config = _config()
+        tool_levels = config.get_option("tool_levels", {}) or {}
+        return parse_level(tool_levels.get(name, config.get_option("level", DEFAULT_LEVEL)))
+    except Exception:
+        return DEFAULT_LEVEL
+
+
+def set_level(level, name=None):
+    """Store ``level`` for tool ``name``, or for all tools (clearing the per tool levels)."""
+    from pyrevit import script
+    config = _config()
+    tool_levels = dict(config.get_option("tool_levels", {}) or {})
+    if name is None:
+        config.level = LEVEL_NAMES[level].lower()
+        tool_levels = {}
+    else:
+        tool_levels[name] = LEVEL_NAMES[level].lower()
+    config.tool_levels = tool_levels
+    script.save_config()
+
+
+def file_enabled():
+    try:
+        return bool(_config().get_option("file", False))
+    except Exception:
+        return False
+
+
+def set_file_enabled(enabled):
+    from pyrevit import script
+    _config().file = bool(enabled)
+    script.save_config()
+
+
+def print_emitter(name, records):
+    """Plain text, one ``print`` for the whole batch."""
+    if all(level == INFO for level, _, _ in records):
+        print("\n".join(message for _, message, _ in records))
+    else:
+        print("\n".join("{}: {}".format(LEVEL_NAMES.get(level, level), message) for level, message, _ in records))
+
+
+def output_emitter(name, records):
+    """pyRevit output window: a single table, or one block of text when everything is INFO."""
+    if all(level == INFO for level, _, _ in records):
+        print_emitter(name, records)
+        return
+    from pyrevit import script
+    script.get_output().print_table(
+        table_data=[[LEVEL_NAMES.get(level, level), message] for level, message, _ in records],
+        title=name,
+        columns=["Level", "Message"],
+    )
+
+
+def default_emitter():
+    try:
+        import pyrevit  # noqa: F401
+    except ImportError:
+        return print_emitter
+    return output_emitter
+
+
+class ToolLog(object):
+    """Buffers the messages of one run; ``flush`` emits them."""
+
+    def __init__(self, name, level=DEFAULT_LEVEL, emit=None, path=None, clock=perf_counter):
+        self.name = name
+        self.level = level
+        self.emit = emit
+        self.path = path
+        self.clock = clock
+        self.records = []
+        self.counts = {}
+        self.emit_seconds = 0.0
+
+    def enabled_for(self, level):
+        return level >= self.level
+
+    def log(self, level, message, *args):
+        if level < self.level:
+            return
+        if args:
+            message = message.format(*args)
+        self.records.append((level, message, time.time() if self.path else None))
+        self.counts[level] = self.counts.get(level, 0) + 1
+
+    def debug(self, message, *args):
+        self.log(DEBUG, message, *args)
+
+    def info(self, message, *args):
+        self.log(INFO, message, *args)
+
+    def warning(self, message, *args):
+        self.log(WARNING, message, *args)
+
+    def error(self, message, *args):
+        self.log(ERROR, message, *args)
+
+    def _write_file(self, records):
+        lines = [u"{}\t{}\t{}\t{}\n".format(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stamp)), self.name,
+                                            LEVEL_NAMES.get(level, level), message)
+                 for level, message, stamp in records]
+        try:
+            telemetry.rotate(self.path)
+            with io.open(self.path, "a", encoding="utf-8") as f:
+                f.write(u"".join(lines))
+        except (IOError, OSError):
+            return False
+        return True
+
+    def flush(self):
+        """Emit the buffered messages (and append them to the log file); returns how many."""
+        records, self.records = self.records, []
+        if not records:
+            return 0
+        start = self.clock()
+        with profiling.phase("output"):
+            (self.emit or default_emitter())(self.name, records)
+            if self.path:
+                self._write_file(records)
+        self.emit_seconds += self.clock() - start
+        return len(records)
+
+
+class _DirectLog(ToolLog):
+    """Used outside a session: prints every message at once."""
+
+    def log(self, level, message, *args):
+        if level < self.level:
+            return
+        if args:
+            message = message.format(*args)
+        print_emitter(self.name, [(level, message, None)])
+
+
+_DIRECT = _DirectLog("gjtools")
+
+
+def current():
+    """The active session's log, or one that prints right away."""
+    return _active if _active is not None else _DIRECT
+
+
+def debug(message, *args):
+    current().log(DEBUG, message, *args)
+
+
+def info(message, *args):
+    current().log(INFO, message, *args)
+
+
+def warning(message, *args):
+    current().log(WARNING, message, *args)
+
+
+def error(message, *args):
+    current().log(ERROR, message, *args)
+
+
+def _flush_quietly(log):
+    # Output must not hide the error of the run itself (a function of its own,
+    # so Python 2 still re-raises that error afterwards)
+    try:
+        log.flush()
+    except Exception:
+        pass
+
+
+@contextmanager
+def session(script_path_or_name, emit=None, level=None, path=None):
+    """Buffer the messages of one button run; they are emitted when the block ends, also on errors."""
+    global _active
+    name = profiling.tool_name(script_path_or_name)
+    if path is None and file_enabled():
+        try:
+            path = default_path()
+        except Exception:
+            path = None
+    log = ToolLog(name, level_for(name) if level is None else level, emit, path)
+    previous, _active = _active, log
+    try:
+        yield log
+    except BaseException:
+        _active = previous
+        _flush_quietly(log)
+        raise
+    _active = previous
+    log.flush()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Per-user copies of the example views behind User Creation (Revit only).
+
+Views whose ``View Category`` is ``00_Example`` are duplicated with
+detailing for each user; the copies get the user's initials in their name
+and the username as their ``View Category``. A user whose name is already
+used as a View Category is skipped.
+"""
+from gjtools.lazy import DB
+from gjtools.view_names import ViewNameIndex
+
+VIEW_CATEGORY = 'View Category'
+UNDER_DISCIPLINE = 'Under-Discipline'
+EXAMPLE_CATEGORY = '00_Example'
+WORK_IN_PROGRESS = '01_Work In Progress'
+REQUIRED_PARAMETERS = (UNDER_DISCIPLINE, VIEW_CATEGORY)
+
+
+def read_usernames(path):
+    with open(path, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def initials(username):
+    """Initials of ``DISCIPLINE_First Last`` usernames (first letters of up to three names)."""
+    name_parts = username.split('_')
+    if len(name_parts) >= 2:
+        return ''.join([token[0] for token in name_parts[1].split()][:3]).upper()
+    return 'XXX'  # Default initials if format is unexpected
+
+
+def scan_views(views):
+    """``(example_views, existing_view_categories)`` in one pass over ``views``."""
+    example_views = []
+    existing_categories = set()
+    for view in views:
+        param = view.LookupParameter(VIEW_CATEGORY)
+        if not param:
+            continue
+        value = param.AsString()
+        if value:
+            existing_categories.add(value)
+        # Exclude view templates
+        if value == EXAMPLE_CATEGORY and not view.IsTemplate:
+            example_views.append(view)
+    return example_views, existing_categories
+
+
+def missing_parameters(view):
+    return [name for name in REQUIRED_PARAMETERS if not view.LookupParameter(name)]
+
+
+def duplicate_for_user(doc, view, username, user_initials, names):
+    """Copy of ``view`` with detailing for ``username`` (call inside a transaction).
+
+    The copy is named ``<view name> <initials>``, reserved in the ``ViewNameIndex`` ``names``.
+    """
+    # Handle views with '{}' in their names
+    if '{}' in view.Name:
+        names.rename(view, view.Name.replace('{}', '*'))
+    new_view = doc.GetElement(view.Duplicate(DB.ViewDuplicateOption.WithDetailing))
+    # The user's initials instead of Revit's 'Copy 1'
+    new_view.Name = names.reserve('{} {}'.format(view.Name, user_initials))
+    new_view.LookupParameter(UNDER_DISCIPLINE).Set(WORK_IN_PROGRESS)
+    new_view.LookupParameter(VIEW_CATEGORY).Set(username)
+    return new_view
+
+
+def create_user_views(doc, usernames, example_views, existing_categories, names=None):
+    """Duplicate the example views for every new user (call inside a transaction).
+
+    ``existing_categories`` gets the new users added; ``names`` (a ``ViewNameIndex``,
+    read from ``doc`` when not given) the new view names. Returns
+    ``(created_views, skipped_users, errors)`` with ``errors`` as ``(view_name, exception)``.
+    """
+    if names is None:
+        names = ViewNameIndex.from_document(doc)
+    created = []
+    skipped = []
+    errors = []
+    for username in usernames:
+        # Check if views for this user already exist
+        if username in existing_categories:
+            skipped.append(username)
+            continue
+        user_initials = initials(username)
+        for view in example_views:
+            try:
+                created.append(duplicate_for_user(doc, view, username, user_initials, names))
+            except Exception as e:
+                errors.append((view.Name, e))
+        existing_categories.add(username)
+    return created, skipped, errors
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Unique view names without relying on Revit's name-in-use exceptions.
+
+The view names of a document are read once; every name a tool wants is
+then reserved in memory, getting a suffix when it is taken::
+
+    names = ViewNameIndex.from_document(doc)
+    new_view.Name = names.reserve("RVT_HYG_" + workset_name)   # "RVT_HYG_X (2)" if taken
+
+Names are compared without case, so a reserved name is free in Revit
+either way. The suffix is a format string for the copy number (from 2) or
+a function ``(name, number) -> candidate``. ``ViewNameIndex`` is plain
+Python; ``from_document`` and ``rename`` need a Revit document.
+"""
+from gjtools import profiling, revit_collectors
+from gjtools.lazy import DB
+
+DEFAULT_SUFFIX = " ({})"
+SUFFIXES = {"paren": " ({})", "dash": " - {}", "copy": " Copy {}"}
+
+
+class ViewNameIndex(object):
+    """Names in use, with per-name copy counters so repeated names stay O(1)."""
+
+    def __init__(self, names=(), suffix=DEFAULT_SUFFIX):
+        self.suffix = suffix
+        self._used = set(name.lower() for name in names)
+        self._next = {}
+
+    @classmethod
+    def from_document(cls, doc, suffix=DEFAULT_SUFFIX):
+        with profiling.phase("collect"):
+            return cls([view.Name for view in revit_collectors.of_class(doc, DB.View)], suffix)
+
+    def __contains__(self, name):
+        return name.lower() in self._used
+
+    def __len__(self):
+        return len(self._used)
+
+    def _candidate(self, name, number):
+        if callable(self.suffix):
+            return self.suffix(name, number)
+        return name + self.suffix.format(number)
+
+    def reserve(self, name):
+        """``name``, or the first free suffixed copy of it; the result counts as used."""
+        key = name.lower()
+        if key not in self._used:
+            self._used.add(key)
+            return name
+        number = self._next.get(key, 2)
+        candidate = self._candidate(name, number)
+        while candidate.lower() in self._used:
+            number += 1
+            candidate = self._candidate(name, number)
+        self._next[key] = number + 1
+        self._used.add(candidate.lower())
+        return candidate
+
+    def release(self, name):
+        """Forget a name whose view was deleted or renamed."""
+        self._used.discard(name.lower())
+
+    def add(self, name):
+        """Record a name Revit assigned itself (e.g. to a duplicated view)."""
+        self._used.add(name.lower())
+
+    def rename(self, view, name):
+        """Give ``view`` the reserved form of ``name`` (inside a transaction); returns it."""
+        old = view.Name
+        if name.lower() == old.lower():
+            # Only the case changes: the name stays this view's own
+            view.Name = name
+            return name
+        new = self.reserve(name)
+        view.Name = new
+        self.release(old)
+        return new
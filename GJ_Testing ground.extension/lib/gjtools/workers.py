@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Tiny thread pool that works on IronPython 2.7 as well as CPython 3.
+
+``concurrent.futures`` is not available on IronPython, so this is the one
+place the extension spreads blocking I/O (network shares, roaming profiles)
+over threads.
+"""
+import threading
+
+try:
+    import queue
+except ImportError:  # IronPython 2.7
+    import Queue as queue
+
+DEFAULT_WORKERS = 8
+
+
+def thread_map(func, items, workers=DEFAULT_WORKERS, progress=None):
+    """Call ``func`` on every item using up to ``workers`` threads.
+
+    Returns a list of ``(result, error)`` pairs in the order of ``items``;
+    an exception raised by ``func`` is returned as ``error`` instead of
+    stopping the other items. ``progress(done, total)`` is called after each
+    item, from the worker threads but never two at a time.
+    """
+    items = list(items)
+    results = [None] * len(items)
+    if not items:
+        return results
+    total = len(items)
+    workers = max(1, min(workers, total))
+    if workers == 1:
+        for index, item in enumerate(items):
+            results[index] = _call(func, item)
+            if progress is not None:
+                progress(index + 1, total)
+        return results
+
+    lock = threading.Lock()
+    done = [0]
+
+    pending = queue.Queue()
+    for index, item in enumerate(items):
+        pending.put((index, item))
+
+    def worker():
+        while True:
+            try:
+                index, item = pending.get_nowait()
+            except queue.Empty:
+                return
+            results[index] = _call(func, item)
+            if progress is not None:
+                with lock:
+                    done[0] += 1
+                    progress(done[0], total)
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def _call(func, item):
+    try:
+        return func(item), None
+    except Exception as error:
+        return None, error
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Workset and per-workset 3D view creation behind the Create Worksets button (Revit only)."""
+from gjtools import profiling, revit_collectors, tool_log
+from gjtools.view_names import ViewNameIndex
+from gjtools.lazy import DB
+from gjtools.revit_transactions import transaction
+
+VIEW_PREFIX = 'RVT_HYG_'
+
+
+def read_workset_names(path):
+    """Workset names of a list file, one per line (the ``00_<DISCIPLINE> - WorksetList.txt`` files)."""
+    with open(path, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def view_family_type(doc, family):
+    """First ``ViewFamilyType`` of ``family`` (e.g. ``ViewFamily.ThreeDimensional``), or None."""
+    for vft in revit_collectors.of_class(doc, DB.ViewFamilyType):
+        if vft.ViewFamily == family:
+            return vft
+    return None
+
+
+def user_worksets(doc):
+    """``{name: WorksetId}`` of the user worksets."""
+    return dict((ws.Name, ws.Id) for ws in DB.FilteredWorksetCollector(doc).OfKind(DB.WorksetKind.UserWorkset))
+
+
+def create_missing_worksets(doc, names, existing):
+    """Create the worksets in ``names`` missing from ``existing`` (call inside a transaction).
+
+    ``existing`` is a ``user_worksets`` table and gets the new ids; returns the created names.
+    """
+    created = []
+    for name in names:
+        if name in existing:
+            continue
+        try:
+            existing[name] = DB.Workset.Create(doc, name).Id
+            created.append(name)
+            tool_log.debug("Created workset '{}'", name)
+        except Exception as e:
+            tool_log.error("Failed to create workset '{0}': {1}", name, e)
+    return created
+
+
+@profiling.phased("write")
+def create_worksets(doc, names):
+    """Create the worksets in ``names`` that do not exist yet; returns the created names."""
+    existing = user_worksets(doc)
+    with transaction(doc, 'Create Worksets from Text File'):
+        return create_missing_worksets(doc, names, existing)
+
+
+def isolated_view(doc, workset_name, view_type, worksets, names):
+    """Isometric view showing only ``workset_name`` (call inside a transaction).
+
+    The view is named ``VIEW_PREFIX + workset_name``, reserved in the ``ViewNameIndex`` ``names``.
+    """
+    new_view = DB.View3D.CreateIsometric(doc, view_type.Id)
+    new_view.Name = names.reserve(VIEW_PREFIX + workset_name)
+    if workset_name not in worksets:
+        tool_log.warning("Workset '{0}' not found.", workset_name)
+    # One call per workset: the target visible, every other one hidden
+    for ws_name, ws_id in worksets.items():
+        visibility = DB.WorksetVisibility.Visible if ws_name == workset_name else DB.WorksetVisibility.Hidden
+        new_view.SetWorksetVisibility(ws_id, visibility)
+    return new_view
+
+
+def create_view_for_workset(doc, workset_name, view_type, worksets, names):
+    """Isometric view showing only ``workset_name``; ``worksets`` is ``user_worksets(doc)``."""
+    with transaction(doc, 'Create View for Workset: ' + workset_name):
+        return isolated_view(doc, workset_name, view_type, worksets, names)
+
+
+@profiling.phased("write")
+def create_views_for_worksets(doc, workset_names):
+    """One view per workset; the view type, workset table and view names are looked up once."""
+    if not workset_names:
+        return []
+    view_type = view_family_type(doc, DB.ViewFamily.ThreeDimensional)
+    worksets = user_worksets(doc)
+    names = ViewNameIndex.from_document(doc)
+    views = []
+    for workset_name in workset_names:
+        try:
+            if view_type is None:
+                raise Exception("No 3D ViewFamilyType found.")
+            views.append(create_view_for_workset(doc, workset_name, view_type, worksets, names))
+        except Exception as e:
+            tool_log.error("Failed to create view for workset '{0}': {1}", workset_name, e)
+    return views
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Bulk element checkout before mass writes in workshared models (Revit only).
+
+Editing an element that is not yet ours makes Revit borrow it from the
+central model, one round trip per element, and an element owned by another
+user fails only when it is written. ``checkout`` sorts all target ids up
+front instead::
+
+    result = worksharing.checkout(doc, [panel_id for panel_id, _ in updates])
+    updates = [(i, value) for i, value in updates if result.can_edit(i)]
+
+Ownership is read locally (``GetCheckoutStatus``); the elements nobody owns
+are then borrowed in one ``CheckoutElements`` call. In a model that is not
+workshared every element counts as owned.
+"""
+from gjtools import profiling
+from gjtools.lazy import DB
+
+
+class Checkout(object):
+    """Target ids split into owned (already ours), borrowed (checked out now) and blocked."""
+
+    __slots__ = ("owned", "borrowed", "blocked", "owned_by_others", "error")
+
+    def __init__(self):
+        self.owned = set()
+        self.borrowed = set()
+        self.blocked = []
+        # The blocked ids another user has checked out; the others could not be obtained
+        self.owned_by_others = set()
+        self.error = None
+
+    def can_edit(self, element_id):
+        if not isinstance(element_id, int):
+            element_id = element_id.IntegerValue
+        return element_id in self.owned or element_id in self.borrowed
+
+    def blocked_reason(self, element_id):
+        """Why ``element_id`` cannot be edited, for error logs."""
+        if not isinstance(element_id, int):
+            element_id = element_id.IntegerValue
+        if element_id in self.owned_by_others:
+            return "checked out by another user"
+        if self.error:
+            return "checkout failed: {}".format(self.error)
+        return "could not be checked out"
+
+    @property
+    def counts(self):
+        return {"owned": len(self.owned), "borrowed": len(self.borrowed), "blocked": len(self.blocked)}
+
+    def summary(self):
+        text = "{owned} owned, {borrowed} borrowed, {blocked} blocked".format(**self.counts)
+        if self.error:
+            text += " (checkout failed: {})".format(self.error)
+        return text
+
+
+def checkout(doc, element_ids):
+    """Obtain the elements of ``element_ids`` (ElementIds) for editing before a transaction opens."""
+    result = Checkout()
+    element_ids = list(element_ids)
+    if not doc.IsWorkshared:
+        result.owned.update(element_id.IntegerValue for element_id in element_ids)
+        return result
+    from System.Collections.Generic import List
+    utils = DB.WorksharingUtils
+    owned_by_me = DB.CheckoutStatus.OwnedByCurrentUser
+    owned_by_other = DB.CheckoutStatus.OwnedByOtherUser
+    candidates = []
+    seen = set()
+    with profiling.phase("checkout"):
+        for element_id in element_ids:
+            key = element_id.IntegerValue
+            if key in seen:
+                continue
+            seen.add(key)
+            status = utils.GetCheckoutStatus(doc, element_id)
+            if status == owned_by_me:
+                result.owned.add(key)
+            elif status == owned_by_other:
+                result.blocked.append(element_id)
+                result.owned_by_others.add(key)
+            else:
+                candidates.append(element_id)
+        if candidates:
+            try:
+                obtained = set(i.IntegerValue for i in utils.CheckoutElements(doc, List[DB.ElementId](candidates)))
+            except Exception as e:
+                # Central not reachable: nothing can be borrowed now
+                obtained = set()
+                result.error = str(e)
+            for element_id in candidates:
+                if element_id.IntegerValue in obtained:
+                    result.borrowed.add(element_id.IntegerValue)
+                else:
+                    result.blocked.append(element_id)
+    return result
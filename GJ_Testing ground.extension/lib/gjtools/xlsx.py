@@ -0,0 +1,447 @@
+# -*- coding: utf-8 -*-
+"""Minimal pure-Python xlsx reader/updater (zip + SpreadsheetML).
+
+Only what the STATUS workbook needs: read and write cell values and solid
+fill colors on an existing sheet, without Excel. Parts that are not touched
+are streamed from the old archive into the new one unchanged, and the edited
+sheet keeps every row, cell and style it already had.
+"""
+import bisect
+import os
+import re
+import shutil
+import sys
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+
+from gjtools.plugin_status import column_letter, column_number
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_M = "{%s}" % NS_MAIN
+_CELL_REF = re.compile(r"^([A-Z]+)(\d+)$")
+_XMLNS = re.compile(r'\sxmlns(?::([\w.-]+))?="([^"]*)"')
+
+
+class XlsxError(Exception):
+    pass
+
+
+def split_ref(ref):
+    """'G12' -> (12, 7)."""
+    match = _CELL_REF.match(ref)
+    if not match:
+        raise XlsxError("Invalid cell reference: {}".format(ref))
+    return int(match.group(2)), column_number(match.group(1))
+
+
+def bgr_to_argb(color):
+    """Excel COM color integer (BGR) to the ARGB hex string used in styles.xml."""
+    red = color & 0xFF
+    green = (color >> 8) & 0xFF
+    blue = (color >> 16) & 0xFF
+    return "FF{:02X}{:02X}{:02X}".format(red, green, blue)
+
+
+def _read_namespaces(data):
+    """Namespace declarations of the root element, in document order."""
+    head = data[:data.find(b">", data.find(b"<", data.find(b"?>") + 2)) + 1]
+    return [(prefix or "", uri) for prefix, uri in _XMLNS.findall(head.decode("utf-8"))]
+
+
+def _parse_part(data):
+    namespaces = _read_namespaces(data)
+    for prefix, uri in namespaces:
+        ET.register_namespace(prefix, uri)
+    return ET.fromstring(data), namespaces
+
+
+def _serialize_part(root, namespaces):
+    """Serialize ``root`` keeping every original namespace declaration.
+
+    ElementTree drops declarations it thinks are unused, but prefixes listed in
+    ``mc:Ignorable`` must stay declared or Excel reports the file as corrupt.
+    """
+    body = ET.tostring(root, encoding="utf-8")
+    if body.startswith(b"<?xml"):
+        body = body[body.find(b"?>") + 2:].lstrip()
+    text = body.decode("utf-8")
+    end = text.find(">")
+    start_tag = text[:end]
+    declared = set(prefix or "" for prefix, _ in _XMLNS.findall(start_tag))
+    missing = ""
+    for prefix, uri in namespaces:
+        if prefix not in declared:
+            missing += ' xmlns{}="{}"'.format(":" + prefix if prefix else "", uri)
+    if start_tag.endswith("/"):
+        start_tag = start_tag[:-1] + missing + "/"
+    else:
+        start_tag += missing
+    text = start_tag + text[end:]
+    return b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\r\n' + text.encode("utf-8")
+
+
+class XlsxSheet(object):
+    """One worksheet, loaded on first access and indexed by row and cell."""
+
+    def __init__(self, workbook, name, part):
+        self.workbook = workbook
+        self.name = name
+        self.part = part
+        self.root, self._namespaces = _parse_part(workbook.read_part(part))
+        self.sheet_data = self.root.find(_M + "sheetData")
+        self._rows = {}
+        self._cells = {}
+        for row_el in self.sheet_data.findall(_M + "row"):
+            row = int(row_el.get("r"))
+            self._rows[row] = row_el
+            for cell_el in row_el.findall(_M + "c"):
+                self._cells[split_ref(cell_el.get("r"))] = cell_el
+        self._row_numbers = sorted(self._rows)
+        self.dirty = False
+
+    # Reading
+
+    def last_used_row(self):
+        for row in reversed(self._row_numbers):
+            for cell_el in self._rows[row]:
+                if cell_el.find(_M + "v") is not None or cell_el.find(_M + "is") is not None:
+                    return row
+        return 0
+
+    def last_used_column(self, row=None):
+        """Last column holding a value, in ``row`` or anywhere on the sheet."""
+        if row is None:
+            rows = self._rows.values()
+        else:
+            rows = [self._rows[row]] if row in self._rows else []
+        last = 0
+        for row_el in rows:
+            for cell_el in row_el.findall(_M + "c"):
+                if self._value(cell_el) is not None:
+                    last = max(last, split_ref(cell_el.get("r"))[1])
+        return last
+
+    def value(self, row, col):
+        cell_el = self._cells.get((row, col))
+        return None if cell_el is None else self._value(cell_el)
+
+    def read_block(self, row1, col1, row2, col2):
+        return [[self.value(row, col) for col in range(col1, col2 + 1)]
+                for row in range(row1, row2 + 1)]
+
+    def _value(self, cell_el):
+        cell_type = cell_el.get("t", "n")
+        if cell_type == "inlineStr":
+            inline = cell_el.find(_M + "is")
+            if inline is None:
+                return None
+            return u"".join(t.text or u"" for t in inline.iter(_M + "t"))
+        v = cell_el.find(_M + "v")
+        if v is None or v.text is None:
+            return None
+        if cell_type == "s":
+            return self.workbook.shared_strings[int(v.text)]
+        if cell_type == "b":
+            return v.text == "1"
+        if cell_type in ("str", "e"):
+            return v.text
+        return float(v.text)
+
+    # Writing
+
+    def write_block(self, row1, col1, rows):
+        for r, row_values in enumerate(rows):
+            for c, value in enumerate(row_values):
+                self.set_value(row1 + r, col1 + c, value)
+
+    def set_value(self, row, col, value):
+        cell_el = self._cell(row, col)
+        for tag in ("f", "v", "is"):
+            child = cell_el.find(_M + tag)
+            if child is not None:
+                if tag == "f":
+                    self.workbook.formulas_removed = True
+                cell_el.remove(child)
+        if "t" in cell_el.attrib:
+            del cell_el.attrib["t"]
+        if value is None:
+            pass
+        elif isinstance(value, bool):
+            cell_el.set("t", "b")
+            ET.SubElement(cell_el, _M + "v").text = "1" if value else "0"
+        elif isinstance(value, float):
+            ET.SubElement(cell_el, _M + "v").text = repr(value)
+        elif isinstance(value, int):
+            ET.SubElement(cell_el, _M + "v").text = str(value)
+        else:
+            cell_el.set("t", "inlineStr")
+            text = ET.SubElement(ET.SubElement(cell_el, _M + "is"), _M + "t")
+            text.text = u"{}".format(value)
+            if text.text != text.text.strip():
+                text.set("{http://www.w3.org/XML/1998/namespace}space", "preserve")
+        self.dirty = True
+
+    def fill(self, rects, color):
+        """Solid fill ``color`` (COM BGR integer) over (r1, c1, r2, c2) rectangles."""
+        styles = self.workbook.styles
+        for r1, c1, r2, c2 in rects:
+            for row in range(r1, r2 + 1):
+                for col in range(c1, c2 + 1):
+                    cell_el = self._cell(row, col)
+                    base = int(cell_el.get("s", self._row_style(row)))
+                    cell_el.set("s", str(styles.with_fill(base, color)))
+        self.dirty = True
+
+    def _row_style(self, row):
+        row_el = self._rows.get(row)
+        if row_el is not None and row_el.get("customFormat") == "1":
+            return row_el.get("s", "0")
+        return "0"
+
+    def _cell(self, row, col):
+        cell_el = self._cells.get((row, col))
+        if cell_el is not None:
+            return cell_el
+        row_el = self._row(row)
+        cell_el = ET.Element(_M + "c", {"r": "{}{}".format(column_letter(col), row)})
+        # Cells must stay in column order inside the row
+        position = len(row_el)
+        for index, sibling in enumerate(row_el):
+            if sibling.tag == _M + "c" and split_ref(sibling.get("r"))[1] > col:
+                position = index
+                break
+        row_el.insert(position, cell_el)
+        self._cells[(row, col)] = cell_el
+        self._grow_dimension(row, col)
+        return cell_el
+
+    def _row(self, row):
+        row_el = self._rows.get(row)
+        if row_el is not None:
+            return row_el
+        position = bisect.bisect_left(self._row_numbers, row)
+        row_el = ET.Element(_M + "row", {"r": str(row)})
+        self.sheet_data.insert(position, row_el)
+        self._row_numbers.insert(position, row)
+        self._rows[row] = row_el
+        return row_el
+
+    def _grow_dimension(self, row, col):
+        dimension = self.root.find(_M + "dimension")
+        if dimension is None:
+            return
+        ref = dimension.get("ref", "A1")
+        first, _, last = ref.partition(":")
+        row1, col1 = split_ref(first)
+        row2, col2 = split_ref(last or first)
+        row1, col1 = min(row1, row), min(col1, col)
+        row2, col2 = max(row2, row), max(col2, col)
+        dimension.set("ref", "{}{}:{}{}".format(column_letter(col1), row1, column_letter(col2), row2))
+
+    def to_bytes(self):
+        return _serialize_part(self.root, self._namespaces)
+
+
+class XlsxStyles(object):
+    """styles.xml with a cache of (base style, fill color) -> new cellXfs index."""
+
+    PART = "xl/styles.xml"
+
+    def __init__(self, workbook):
+        self.root, self._namespaces = _parse_part(workbook.read_part(self.PART))
+        self.fills = self.root.find(_M + "fills")
+        self.cell_xfs = self.root.find(_M + "cellXfs")
+        self._fill_ids = {}
+        self._xf_ids = {}
+        self.dirty = False
+
+    def with_fill(self, base_xf, color):
+        key = (base_xf, color)
+        xf_id = self._xf_ids.get(key)
+        if xf_id is None:
+            fill_id = self._fill_id(color)
+            xfs = self.cell_xfs.findall(_M + "xf")
+            base = xfs[base_xf] if base_xf < len(xfs) else xfs[0]
+            if base.get("fillId") == str(fill_id):
+                xf_id = base_xf
+            else:
+                new_xf = ET.SubElement(self.cell_xfs, _M + "xf", dict(base.attrib))
+                for child in base:
+                    new_xf.append(child)
+                new_xf.set("fillId", str(fill_id))
+                new_xf.set("applyFill", "1")
+                xf_id = len(xfs)
+                self.cell_xfs.set("count", str(xf_id + 1))
+                self.dirty = True
+            self._xf_ids[key] = xf_id
+        return xf_id
+
+    def _fill_id(self, color):
+        fill_id = self._fill_ids.get(color)
+        if fill_id is None:
+            argb = bgr_to_argb(color)
+            fills = self.fills.findall(_M + "fill")
+            for index, fill in enumerate(fills):
+                pattern = fill.find(_M + "patternFill")
+                fg = pattern.find(_M + "fgColor") if pattern is not None else None
+                if (pattern is not None and pattern.get("patternType") == "solid"
+                        and fg is not None and fg.get("rgb", "").upper() == argb):
+                    fill_id = index
+                    break
+            else:
+                fill = ET.SubElement(self.fills, _M + "fill")
+                pattern = ET.SubElement(fill, _M + "patternFill", {"patternType": "solid"})
+                ET.SubElement(pattern, _M + "fgColor", {"rgb": argb})
+                ET.SubElement(pattern, _M + "bgColor", {"indexed": "64"})
+                fill_id = len(fills)
+                self.fills.set("count", str(fill_id + 1))
+                self.dirty = True
+            self._fill_ids[color] = fill_id
+        return fill_id
+
+    def to_bytes(self):
+        return _serialize_part(self.root, self._namespaces)
+
+
+class XlsxWorkbook(object):
+    """An existing .xlsx file opened for in-place updates."""
+
+    def __init__(self, path):
+        self.path = path
+        self._zip = zipfile.ZipFile(path, "r")
+        self._names = set(self._zip.namelist())
+        self._sheet_parts = self._read_sheet_parts()
+        self._sheets = {}
+        self._shared_strings = None
+        self._styles = None
+        self.formulas_removed = False
+
+    def read_part(self, name):
+        if name not in self._names:
+            raise XlsxError("{} has no part {}".format(self.path, name))
+        return self._zip.read(name)
+
+    def _read_sheet_parts(self):
+        workbook = ET.fromstring(self.read_part("xl/workbook.xml"))
+        rels = ET.fromstring(self.read_part("xl/_rels/workbook.xml.rels"))
+        targets = {}
+        for rel in rels.findall("{%s}Relationship" % NS_PKG_REL):
+            target = rel.get("Target")
+            if target.startswith("/"):
+                target = target[1:]
+            else:
+                target = "xl/" + target
+            targets[rel.get("Id")] = target
+        parts = []
+        for sheet in workbook.iter(_M + "sheet"):
+            parts.append((sheet.get("name"), targets[sheet.get("{%s}id" % NS_REL)]))
+        return parts
+
+    @property
+    def sheet_names(self):
+        return [name for name, _ in self._sheet_parts]
+
+    def sheet(self, name):
+        sheet = self._sheets.get(name)
+        if sheet is None:
+            for sheet_name, part in self._sheet_parts:
+                if sheet_name == name:
+                    sheet = self._sheets[name] = XlsxSheet(self, name, part)
+                    break
+            else:
+                raise XlsxError("Sheet '{}' not found in {}".format(name, self.path))
+        return sheet
+
+    @property
+    def shared_strings(self):
+        if self._shared_strings is None:
+            self._shared_strings = []
+            part = "xl/sharedStrings.xml"
+            if part in self._names:
+                # Stream the table: it can be the largest part of the file
+                for _, elem in ET.iterparse(self._zip.open(part)):
+                    if elem.tag == _M + "si":
+                        self._shared_strings.append(_string_item_text(elem))
+                        elem.clear()
+        return self._shared_strings
+
+    @property
+    def styles(self):
+        if self._styles is None:
+            self._styles = XlsxStyles(self)
+        return self._styles
+
+    def save(self, path=None):
+        """Write the workbook, streaming every untouched part from the original."""
+        path = path or self.path
+        replaced = {}
+        for sheet in self._sheets.values():
+            if sheet.dirty:
+                replaced[sheet.part] = sheet.to_bytes()
+        if self._styles is not None and self._styles.dirty:
+            replaced[XlsxStyles.PART] = self._styles.to_bytes()
+        dropped = set()
+        if self.formulas_removed and "xl/calcChain.xml" in self._names:
+            # A calc chain pointing at a cell that lost its formula makes Excel repair the file
+            dropped.add("xl/calcChain.xml")
+            replaced["[Content_Types].xml"] = re.sub(
+                br'<Override[^>]*PartName="/xl/calcChain.xml"[^>]*/>', b"",
+                self.read_part("[Content_Types].xml"))
+            replaced["xl/_rels/workbook.xml.rels"] = re.sub(
+                br'<Relationship[^>]*Target="[^"]*calcChain.xml"[^>]*/>', b"",
+                self.read_part("xl/_rels/workbook.xml.rels"))
+
+        handle, tmp_path = tempfile.mkstemp(suffix=".xlsx", dir=os.path.dirname(os.path.abspath(path)))
+        os.close(handle)
+        try:
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as out:
+                for info in self._zip.infolist():
+                    if info.filename in dropped:
+                        continue
+                    if info.filename in replaced:
+                        out.writestr(info, replaced[info.filename], zipfile.ZIP_DEFLATED)
+                    else:
+                        _copy_member(self._zip, out, info)
+            self._zip.close()
+            if os.path.exists(path):
+                os.remove(path)
+            os.rename(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        # Keep the loaded sheets and styles, they already match what was written
+        self.path = path
+        self._zip = zipfile.ZipFile(path, "r")
+        self._names = set(self._zip.namelist())
+        self.formulas_removed = False
+        for sheet in self._sheets.values():
+            sheet.dirty = False
+        if self._styles is not None:
+            self._styles.dirty = False
+
+    def close(self):
+        self._zip.close()
+
+
+def _string_item_text(si):
+    """Text of a shared string item, ignoring phonetic runs."""
+    t = si.find(_M + "t")
+    if t is not None:
+        return t.text or u""
+    return u"".join(r.findtext(_M + "t") or u"" for r in si.findall(_M + "r"))
+
+
+def _copy_member(source, archive, info):
+    """Stream one member between archives without recompressing it in memory at once."""
+    with source.open(info) as src:
+        if hasattr(archive, "open") and sys.version_info >= (3, 6):
+            with archive.open(info, "w") as dst:
+                shutil.copyfileobj(src, dst, 1 << 16)
+        else:
+            # IronPython 2.7 cannot open a member for writing
+            archive.writestr(info, src.read())
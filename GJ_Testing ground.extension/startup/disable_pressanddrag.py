@@ -3,26 +3,30 @@
 # Ensure the extension is properly recognized by pyRevit (avoid spaces in folder names).
 # After loading Revit, open the pyRevit output panel to confirm the startup message prints.
 
-import clr
-clr.AddReference('RevitServices')
-clr.AddReference('RevitAPI')
-clr.AddReference('RevitUI')
+from gjtools import telemetry
 
-from Autodesk.Revit.UI import TaskDialog
-from Autodesk.Revit.ApplicationServices import Application
+startup_telemetry = telemetry.Telemetry(telemetry.default_path())
 
-uiapp = __revit__
-app = uiapp.Application
+with startup_telemetry.timed("hook", "disable_pressanddrag"):
+    from Autodesk.Revit.UI import TaskDialog
+    from pyrevit.coreutils import appdata
 
-app.PressAndDragEnabled = False
-print("AllowPressAndDrag has been disabled at startup.")
+    from gjtools import pressanddrag
 
-# Display a dialog at startup to confirm script loading
-TaskDialog.Show("Startup", "PressAndDrag has been disabled.")
+    uiapp = __revit__
+    app = uiapp.Application
 
-def on_idling(sender, args):
-    if app.PressAndDragEnabled:
+    app.PressAndDragEnabled = False
+    print("AllowPressAndDrag has been disabled at startup.")
+
+    def warn_reenabled():
         TaskDialog.Show("Warning", "Using PressAndDrag is not recommended.")
-        app.PressAndDragEnabled = False
 
-uiapp.Idling += on_idling
+    # Checked on document open, view activation and after the Options dialog
+    # instead of on every Idling tick; handler counts/times are logged on exit
+    pressanddrag.install(uiapp, warn_reenabled, appdata.get_data_file("gjtools_pressanddrag_stats", "jsonl"))
+
+startup_telemetry.record("session", "Revit start to startup hooks", telemetry.revit_uptime())
+
+# A toast does not hold up the rest of Revit's startup like a modal dialog
+telemetry.notify("PressAndDrag has been disabled.", "Startup")
@@ -0,0 +1,12 @@
+# Keeps the element snapshots shared by the panel and dimension checks current.
+# The DocumentChanged handler must live in this startup engine, which pyRevit keeps
+# for the whole session; a button's engine may be gone before the next change.
+
+from gjtools import telemetry
+
+startup_telemetry = telemetry.Telemetry(telemetry.default_path())
+
+with startup_telemetry.timed("hook", "element_snapshots"):
+    from gjtools import element_snapshot
+
+    element_snapshot.install(__revit__.Application)
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""Shared setup for the benchmark scripts.
+
+Puts the extension ``lib`` folder on ``sys.path`` the same way pyRevit does,
+and provides a tiny best-of-N timer.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIB = os.path.join(ROOT, 'GJ_Testing ground.extension', 'lib')
+if LIB not in sys.path:
+    sys.path.insert(0, LIB)
+
+from gjtools._compat import perf_counter  # noqa: E402
+
+
+def best_of(func, repeat=5):
+    """Best wall time in seconds over ``repeat`` calls of ``func``."""
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        elapsed = perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def report(label, seconds, count=None):
+    line = "{:<45} {:>10.3f} ms".format(label, seconds * 1000.0)
+    if count:
+        line += "  ({:.2f} us/item)".format(seconds * 1e6 / count)
+    print(line)
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Builds minimal PE32 files carrying a version resource, for benchmarks."""
+import struct
+
+
+def _pad4(data):
+    return data + b"\0" * (-len(data) % 4)
+
+
+def _block(key, value=b"", value_type=0, children=b"", value_length=None):
+    key_bytes = _pad4(b"\0" * 6 + (key + u"\0").encode("utf-16-le"))[6:]
+    if value_length is None:
+        value_length = len(value) // 2 if value_type == 1 else len(value)
+    body = key_bytes + _pad4(value) + children
+    length = 6 + len(body)
+    return _pad4(struct.pack("<HHH", length, value_length, value_type) + body)
+
+
+def version_resource(version, strings=None):
+    major, minor, build, revision = version
+    fixed = struct.pack("<13I", 0xFEEF04BD, 0x10000,
+                        (major << 16) | minor, (build << 16) | revision,
+                        (major << 16) | minor, (build << 16) | revision,
+                        0x3F, 0, 0x40004, 2, 0, 0, 0)
+    string_blocks = b""
+    for name, value in sorted((strings or {}).items()):
+        string_blocks += _block(name, (value + u"\0").encode("utf-16-le"), 1)
+    table = _block(u"040904B0", children=string_blocks)
+    children = _block(u"StringFileInfo", children=table)
+    return _block(u"VS_VERSION_INFO", fixed, children=children)
+
+
+def make_pe(version, strings=None):
+    """Bytes of a tiny PE32 image with one .rsrc section holding RT_VERSION."""
+    section_rva = 0x1000
+    raw_pointer = 0x200
+    resource = version_resource(version, strings)
+
+    # Resource tree: root(type 16) -> name(1) -> language(0x409) -> data entry
+    def directory(entry_id, target):
+        return struct.pack("<IIHHHH", 0, 0, 0, 0, 0, 1) + struct.pack("<II", entry_id, target)
+
+    root = directory(16, 0x80000000 | 24)
+    names = directory(1, 0x80000000 | 48)
+    languages = directory(0x409, 72)
+    data_entry = struct.pack("<IIII", section_rva + 88, len(resource), 0, 0)
+    rsrc = root + names + languages + data_entry + resource
+    rsrc = rsrc + b"\0" * (-len(rsrc) % 0x200)
+
+    dos = b"MZ" + b"\0" * 0x3A + struct.pack("<I", 0x40)
+    coff = struct.pack("<HHIIIHH", 0x14C, 1, 0, 0, 0, 224, 0x2102)
+    optional = bytearray(224)
+    struct.pack_into("<H", optional, 0, 0x10B)
+    struct.pack_into("<I", optional, 92, 16)  # NumberOfRvaAndSizes
+    struct.pack_into("<II", optional, 96 + 2 * 8, section_rva, len(rsrc))
+    section = struct.pack("<8sIIIIIIHHI", b".rsrc", len(rsrc), section_rva, len(rsrc), raw_pointer,
+                          0, 0, 0, 0, 0x40000040)
+    headers = dos + b"PE\0\0" + coff + bytes(optional) + section
+    return headers + b"\0" * (raw_pointer - len(headers)) + rsrc
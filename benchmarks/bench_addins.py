@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Benchmark add-in manifest parsing and assembly version reading.
+
+Writes ``count`` synthetic ``.addin`` manifests pointing at a smaller set of
+synthetic DLLs with version resources, then times a cold audit (no cache), a
+warm audit (cache loaded from disk) and raw PE version reads.
+
+    python benchmarks/bench_addins.py [count]
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import _bench
+from _pe_fixture import make_pe
+from gjtools import addins
+from gjtools.pe_version import read_version_info
+
+MANIFEST = u"""<?xml version="1.0" encoding="utf-8"?>
+<RevitAddIns>
+  <AddIn Type="Application">
+    <Name>Plugin {index}</Name>
+    <Assembly>{assembly}</Assembly>
+    <AddInId>{guid}</AddInId>
+    <FullClassName>Vendor.Plugin{index}.App</FullClassName>
+    <VendorId>VNDR</VendorId>
+    <VendorDescription>Vendor {index}</VendorDescription>
+  </AddIn>
+</RevitAddIns>
+"""
+
+
+def make_fixture(folder, count, dll_count):
+    dlls = []
+    for i in range(dll_count):
+        path = os.path.join(folder, 'Plugin{}.dll'.format(i))
+        with open(path, 'wb') as f:
+            f.write(make_pe((2024, i % 10, i, 0), {u'FileVersion': u'2024.{}.{}'.format(i % 10, i)}))
+        dlls.append(path)
+    for i in range(count):
+        with open(os.path.join(folder, 'Plugin{}.addin'.format(i)), 'wb') as f:
+            f.write(MANIFEST.format(index=i, assembly=os.path.basename(dlls[i % dll_count]),
+                                    guid='{:08X}-0000-0000-0000-000000000000'.format(i)).encode('utf-8'))
+    return dlls
+
+
+def audit(folder, cache_path):
+    cache = addins.AddinCache(cache_path)
+    records, errors = addins.parse_addins(folder, cache)
+    versions = [record.version for record in records]
+    cache.save()
+    assert not errors, errors
+    return versions
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    folder = tempfile.mkdtemp(prefix='gj_addins_')
+    try:
+        dlls = make_fixture(folder, count, max(1, count // 3))
+        cache_path = os.path.join(folder, 'cache.json')
+
+        _bench.report('read version of {} DLLs'.format(len(dlls)),
+                      _bench.best_of(lambda: [read_version_info(p) for p in dlls]), len(dlls))
+
+        def cold():
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            return audit(folder, cache_path)
+
+        _bench.report('cold audit, {} manifests'.format(count), _bench.best_of(cold), count)
+        cold()
+        _bench.report('warm audit (cache on disk)', _bench.best_of(lambda: audit(folder, cache_path)), count)
+        print('sample versions: {}'.format(sorted(set(audit(folder, cache_path)))[:3]))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
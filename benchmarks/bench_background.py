@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Benchmark how long Plugin Checker's report ingestion blocks the UI thread.
+
+Writes synthetic plugin reports and ingests them as a ``background.Job``:
+once on the calling (UI) thread, as the button used to, and once started in
+the background, with the calling thread playing Revit's idle loop (the fake
+``ExternalEvent`` runs the finish step there). Reports the time the UI
+thread was blocked, its longest stall and the total time. Point ``folder``
+at a network share for realistic numbers.
+
+    python benchmarks/bench_background.py [count] [folder] [--workers 8]
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+import _bench
+
+import fakerevit
+fakerevit.install()
+
+from fakerevit import UI  # noqa: E402
+from gjtools import background, plugin_reports  # noqa: E402
+from bench_plugin_reports import make_reports  # noqa: E402
+
+TICK = 0.005
+
+
+def make_job(folder, workers, finished):
+    job = background.Job("Plugin Checker", finish=lambda job: finished.append(job),
+                         workers=workers, emit=lambda name, records: None)
+
+    def read_reports(job):
+        job.results["statuses"], _ = plugin_reports.ingest_reports(folder, workers=job.workers,
+                                                                   progress=job.progress)
+    job.stage("collect", "Reading plugin reports", read_reports)
+    return job
+
+
+def on_ui_thread(folder, workers):
+    finished = []
+    job = make_job(folder, workers, finished)
+    start = _bench.perf_counter()
+    job.run()
+    job.complete()
+    seconds = _bench.perf_counter() - start
+    return seconds, seconds, seconds
+
+
+def in_background(folder, workers):
+    finished = []
+    job = make_job(folder, workers, finished)
+    start = _bench.perf_counter()
+    background.start(job, window=False)
+    blocked = _bench.perf_counter() - start
+    # Revit's message loop: the UI thread stays free between idle calls
+    stall = blocked
+    last = _bench.perf_counter()
+    while not finished:
+        time.sleep(TICK)
+        UI.idle()
+        now = _bench.perf_counter()
+        stall = max(stall, now - last - TICK)
+        last = now
+    return blocked, stall, _bench.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark UI thread blocking of report ingestion.")
+    parser.add_argument("count", type=int, nargs="?", default=2000)
+    parser.add_argument("folder", nargs="?")
+    parser.add_argument("--workers", type=int, default=background.DEFAULT_WORKERS)
+    args = parser.parse_args(argv)
+    folder = args.folder or tempfile.mkdtemp(prefix="gj_reports_")
+    try:
+        if not args.folder:
+            make_reports(folder, args.count)
+        for label, strategy in (("on the UI thread", on_ui_thread), ("background job", in_background)):
+            blocked, stall, total = strategy(folder, args.workers)
+            _bench.report("{} reports, {}".format(args.count, label), total, args.count)
+            print("    UI thread blocked {:.1f} ms, longest stall {:.1f} ms".format(blocked * 1000.0,
+                                                                                  stall * 1000.0))
+    finally:
+        if not args.folder:
+            shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Cold and warm start of the ``gjtools`` modules each button imports.
+
+Cold: a fresh interpreter imports the button's modules (what the first
+click after starting Revit pays). Warm: the same modules are dropped from
+``sys.modules`` and imported again in a process where the standard library
+is already loaded (later clicks). Run it with ``ipy.exe`` to measure
+IronPython; the Revit namespaces themselves are lazy and not loaded here.
+"""
+import subprocess
+import sys
+
+import _bench
+from _bench import report
+
+BUTTONS = [
+    ("version-INFO / TEST", ["gjtools.addin_audit"]),
+    ("Plugin Checker", ["gjtools.plugin_reports", "gjtools.fleet_audit", "gjtools.status_backends"]),
+    ("Copy Parameter Value", ["gjtools.param_index", "gjtools.revit_params", "gjtools.revit_transactions"]),
+    ("Check Panel Dimensions / Filters", ["gjtools.panel_checks"]),
+]
+COLD_RUNS = 5
+WARM_RUNS = 20
+
+COLD_SCRIPT = """
+import sys
+sys.path.insert(0, {lib!r})
+from gjtools._compat import perf_counter
+start = perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = perf_counter() - start
+from gjtools import lazy
+loaded = [ns for ns in (lazy.DB, lazy.UI, lazy.WinForms, lazy.Wpf, lazy.Excel) if ns.loaded]
+sys.stdout.write("{{}} {{}}".format(elapsed, len(loaded)))
+"""
+
+
+def cold_start(modules):
+    best = None
+    for _ in range(COLD_RUNS):
+        output = subprocess.check_output(
+            [sys.executable, "-c", COLD_SCRIPT.format(lib=_bench.LIB, modules=modules)])
+        elapsed, loaded = output.decode("ascii").split()
+        if int(loaded):
+            raise AssertionError("importing {} loaded a .NET namespace".format(modules))
+        elapsed = float(elapsed)
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def warm_start(modules):
+    def run():
+        for name in [name for name in sys.modules if name.startswith("gjtools.")]:
+            del sys.modules[name]
+        for name in modules:
+            __import__(name)
+    run()
+    return _bench.best_of(run, WARM_RUNS)
+
+
+def main():
+    print("Python {}".format(sys.version.split()[0]))
+    for button, modules in BUTTONS:
+        report("{} cold".format(button), cold_start(modules))
+        report("{} warm".format(button), warm_start(modules))
+
+
+if __name__ == "__main__":
+    main()
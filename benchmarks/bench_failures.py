@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Benchmark failure handling of a bulk commit on the fake Revit API.
+
+Copies Type Mark into Mark on ``count`` elements, so every write posts a
+duplicate value warning, and commits with Revit's own per-failure
+processing, a preprocessor deleting the warnings one by one, or the
+``revit_failures`` preprocessor with a rule dismissing duplicate values
+(counted by definition, deleted at once).
+``--process-us`` is the cost of Revit processing one failure itself.
+
+    python benchmarks/bench_failures.py [count ...] [--latency-us 20] [--process-us 200]
+"""
+import argparse
+
+import _bench
+
+import fakerevit
+DB = fakerevit.install()
+
+from fakerevit import API  # noqa: E402
+from fakerevit.models import build_model  # noqa: E402
+from gjtools import revit_failures, revit_params  # noqa: E402
+from gjtools.revit_transactions import transaction  # noqa: E402
+
+COUNTS = (1000, 10000)
+
+
+class OneByOne(DB.IFailuresPreprocessor):
+    """The usual hand-written preprocessor: every warning deleted on its own."""
+
+    def PreprocessFailures(self, accessor):
+        for message in accessor.GetFailureMessages():
+            if message.GetSeverity() == DB.FailureSeverity.Warning:
+                accessor.DeleteWarning(message)
+        return DB.FailureProcessingResult.Continue
+
+
+def copy_marks(doc, elements, failures=None):
+    with transaction(doc, "Copy Parameter Values", failures):
+        revit_params.copy_parameter_values(doc, elements, "Type Mark", "Mark")
+
+
+def unhandled(doc, elements):
+    copy_marks(doc, elements)
+
+
+def one_by_one(doc, elements):
+    t = DB.Transaction(doc, "Copy Parameter Values")
+    options = t.GetFailureHandlingOptions()
+    options.SetFailuresPreprocessor(OneByOne())
+    t.SetFailureHandlingOptions(options)
+    t.Start()
+    revit_params.copy_parameter_values(doc, elements, "Type Mark", "Mark")
+    t.Commit()
+
+
+def aggregated(doc, elements):
+    copy_marks(doc, elements, revit_failures.FailureLog({"GeneralFailures.DuplicateValue": revit_failures.DISMISS}))
+
+
+def run(strategy, count):
+    model = build_model(count)
+    elements = model.elements()
+    API.reset()
+    start = _bench.perf_counter()
+    strategy(model.document, elements)
+    seconds = _bench.perf_counter() - start
+    left = len(model.document._warnings)
+    model.document.Close(False)
+    return seconds, len(elements), dict(API.calls), left
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark failure handling of a bulk commit.")
+    parser.add_argument("counts", type=int, nargs="*")
+    parser.add_argument("--latency-us", type=float, default=0.0, help="cost of one Revit API call")
+    parser.add_argument("--process-us", type=float, default=0.0, help="cost of Revit processing one failure")
+    args = parser.parse_args(argv)
+    API.set_latency(args.latency_us / 1e6, **{"Failures.process": args.process_us / 1e6})
+    for count in args.counts or COUNTS:
+        for label, strategy in (("Revit processing", unhandled), ("DeleteWarning each", one_by_one),
+                                ("revit_failures", aggregated)):
+            seconds, elements, calls, left = run(strategy, count)
+            failure_calls = sum(n for name, n in calls.items() if "Failure" in name)
+            _bench.report("{} elements, {}".format(count, label), seconds, elements)
+            print("    {} failure handling calls ({} by Revit), {} warnings left in the model".format(
+                failure_calls, calls.get("Failures.process", 0), left))
+
+
+if __name__ == "__main__":
+    main()
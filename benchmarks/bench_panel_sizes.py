@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the panel size classes behind the Panel Sizes button.
+
+Groups synthetic facades of 1k/10k/100k panels (a few hundred nominal
+sizes with small site deviations) at 1 and 5 mm tolerance, and writes the
+CSV. ``bench_revit_tools.py`` covers reading the panels from a model.
+
+    python benchmarks/bench_panel_sizes.py [count ...]
+"""
+import os
+import random
+import sys
+import tempfile
+
+import _bench
+from gjtools import panel_sizes
+
+SIZES = (1000, 10000, 100000)
+
+
+def make_panels(count, seed=3):
+    rng = random.Random(seed)
+    heights = [900.0 + 50.0 * i for i in range(30)]
+    widths = [600.0 + 25.0 * i for i in range(20)]
+    panels = []
+    for element_id in range(count):
+        height = rng.choice(heights) + rng.choice((0.0, 0.0, 0.0, 0.4, -0.3, 2.5))
+        width = rng.choice(widths) + rng.choice((0.0, 0.0, 0.2, -0.6))
+        panels.append((element_id, height, width))
+    return panels
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or SIZES
+    path = os.path.join(tempfile.gettempdir(), "bench_panel_sizes.csv")
+    for count in counts:
+        panels = make_panels(count)
+        for tolerance in (1.0, 5.0):
+            _bench.report("group {} panels, {:g} mm".format(count, tolerance),
+                          _bench.best_of(lambda: panel_sizes.group_panels(panels, tolerance)), count)
+        classes = panel_sizes.group_panels(panels, 1.0)
+        _bench.report("histograms + outliers ({} classes)".format(len(classes)),
+                      _bench.best_of(lambda: (panel_sizes.histogram(classes, "height"),
+                                              panel_sizes.histogram(classes, "width"),
+                                              panel_sizes.outliers(classes))))
+        _bench.report("write CSV", _bench.best_of(lambda: panel_sizes.write_csv(path, classes, count)))
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the parameter picker search index.
+
+Simulates an MEP schema with a few thousand parameters and a user typing a
+search term one character at a time, with and without read-only parameters.
+
+    python benchmarks/bench_param_index.py [count]
+"""
+import random
+import sys
+
+import _bench
+from gjtools.param_index import ParameterIndex
+
+WORDS = ['Duct', 'Pipe', 'Flow', 'Pressure', 'Drop', 'System', 'Type', 'Classification',
+         'Insulation', 'Thickness', 'Lining', 'Velocity', 'Size', 'Diameter', 'Mark',
+         'Comments', 'Level', 'Offset', 'Area', 'Volume', 'Electrical', 'Load']
+
+
+def make_schema(count, seed=1):
+    rng = random.Random(seed)
+    info = {}
+    while len(info) < count:
+        name = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+        name += ' {}'.format(len(info))
+        info[name] = rng.random() < 0.4
+    return info
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1500
+    info = make_schema(count)
+
+    _bench.report("build index ({} params)".format(count),
+                  _bench.best_of(lambda: ParameterIndex(info)), count)
+
+    index = ParameterIndex(info)
+    query = 'pressure drop'
+
+    def typing(include_read_only):
+        index._last_key = None
+        for i in range(1, len(query) + 1):
+            index.display(index.filter(query[:i], include_read_only))
+
+    def naive_typing():
+        for i in range(1, len(query) + 1):
+            q = query[:i]
+            [n for n in sorted(info) if q in n.lower()]
+
+    _bench.report("type '{}' incrementally".format(query), _bench.best_of(lambda: typing(True)))
+    _bench.report("same, writable only", _bench.best_of(lambda: typing(False)))
+    _bench.report("naive rescan per keystroke", _bench.best_of(naive_typing))
+
+    def toggle():
+        index._last_key = None
+        for flag in (False, True, False, True):
+            index.display(index.filter('', flag))
+
+    _bench.report("toggle read-only x4", _bench.best_of(toggle))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the plugin history store over years of daily runs.
+
+Records ``days`` daily runs of a synthetic fleet (``pcs`` PCs with
+``plugins`` plugins, a few installs and removals per day) with
+``plugin_history`` and times the queries Plugin Checker users ask: one PC's
+statuses, the changes of one plugin on one PC, the losses of a plugin, and
+the fleet coverage now and on a past date. ``--snapshots`` also stores
+every run in full in a plain indexed snapshot table for comparison.
+
+    python benchmarks/bench_plugin_history.py [--pcs 200] [--plugins 20] [--days 730] [--snapshots]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+
+import _bench
+
+from gjtools import plugin_history  # noqa: E402
+from gjtools.plugin_status import INSTALLED, NOT_INSTALLED  # noqa: E402
+
+YEAR = "2024"
+DAY = 86400.0
+START = 1.7e9
+CHURN = 0.002
+
+
+def fleet(pcs, plugins, seed=1):
+    rng = random.Random(seed)
+    names = ["Plugin {:02d}".format(i) for i in range(plugins)]
+    return rng, {"PC-{:04d}".format(i): dict((name, INSTALLED if rng.random() < 0.7 else NOT_INSTALLED)
+                                             for name in names) for i in range(pcs)}
+
+
+def next_day(rng, by_pc):
+    for statuses in by_pc.values():
+        for name, status in statuses.items():
+            if rng.random() < CHURN:
+                statuses[name] = NOT_INSTALLED if status == INSTALLED else INSTALLED
+
+
+def record_runs(path, args):
+    rng, by_pc = fleet(args.pcs, args.plugins)
+    seconds = 0.0
+    with plugin_history.open_history(path) as history:
+        for day in range(args.days):
+            next_day(rng, by_pc)
+            start = _bench.perf_counter()
+            history.record({YEAR: by_pc}, stamp=START + day * DAY)
+            seconds += _bench.perf_counter() - start
+        changes = history.connection.execute("SELECT COUNT(*) FROM changes").fetchone()[0]
+    return seconds, changes
+
+
+def record_snapshots(path, args):
+    import sqlite3
+    rng, by_pc = fleet(args.pcs, args.plugins)
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE snapshots (stamp REAL, year TEXT, pc TEXT, plugin TEXT, status TEXT)")
+    connection.execute("CREATE INDEX snapshots_pc_plugin_stamp ON snapshots (pc, plugin, stamp)")
+    connection.execute("CREATE INDEX snapshots_stamp ON snapshots (stamp)")
+    start = _bench.perf_counter()
+    for day in range(args.days):
+        next_day(rng, by_pc)
+        stamp = START + day * DAY
+        with connection:
+            connection.executemany("INSERT INTO snapshots VALUES (?, ?, ?, ?, ?)",
+                                   [(stamp, YEAR, pc, name, status) for pc, statuses in by_pc.items()
+                                    for name, status in statuses.items()])
+    seconds = _bench.perf_counter() - start
+    return connection, seconds
+
+
+def snapshot_queries(connection, args):
+    last = START + (args.days - 1) * DAY
+    middle = START + (args.days // 2) * DAY
+    coverage = ("SELECT plugin, SUM(status = ?), COUNT(*) FROM snapshots WHERE stamp = ? GROUP BY plugin")
+    return [
+        ("changes of one PC/plugin", lambda: connection.execute(
+            "SELECT stamp, status FROM snapshots WHERE pc = ? AND plugin = ? ORDER BY stamp",
+            ("PC-0001", "Plugin 03")).fetchall()),
+        ("coverage now", lambda: connection.execute(coverage, (INSTALLED, last)).fetchall()),
+        ("coverage half way", lambda: connection.execute(coverage, (INSTALLED, middle)).fetchall()),
+    ]
+
+
+def history_queries(history, args):
+    middle = START + (args.days // 2) * DAY
+    return [
+        ("current of one PC", lambda: history.current(pc="PC-0001")),
+        ("changes of one PC/plugin", lambda: history.changes(pc="PC-0001", plugin="Plugin 03")),
+        ("losses of one plugin", lambda: history.losses(plugin="Plugin 03")),
+        ("coverage now", lambda: history.coverage(year=YEAR)),
+        ("coverage half way", lambda: history.coverage(year=YEAR, at=middle)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pcs", type=int, default=200)
+    parser.add_argument("--plugins", type=int, default=20)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--snapshots", action="store_true", help="compare with full daily snapshots")
+    args = parser.parse_args()
+    folder = tempfile.mkdtemp(prefix="gjtools_history_")
+    try:
+        statuses = args.pcs * args.plugins
+        path = os.path.join(folder, "history.sqlite")
+        seconds, changes = record_runs(path, args)
+        print("{} days x {} PCs x {} plugins: {} changes stored, {:.1f} MB".format(
+            args.days, args.pcs, args.plugins, changes, os.path.getsize(path) / 1e6))
+        _bench.report("record, per daily run", seconds / args.days, statuses)
+        with plugin_history.open_history(path) as history:
+            for label, query in history_queries(history, args):
+                _bench.report("history: " + label, _bench.best_of(query))
+        if args.snapshots:
+            path = os.path.join(folder, "snapshots.sqlite")
+            connection, seconds = record_snapshots(path, args)
+            print("snapshots: {} rows, {:.1f} MB".format(args.days * statuses, os.path.getsize(path) / 1e6))
+            _bench.report("snapshots: insert, per daily run", seconds / args.days, statuses)
+            for label, query in snapshot_queries(connection, args):
+                _bench.report("snapshots: " + label, _bench.best_of(query))
+            connection.close()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Benchmark ingestion of per-PC plugin reports.
+
+Writes synthetic ``<PC> - Revit Plugins 2024.txt`` files to a temp folder and
+compares a cold sequential read, a cold threaded read and a warm cached run.
+Local disks hide most of the share latency the thread pool is meant for, so
+point ``folder`` at a network share for realistic numbers.
+
+    python benchmarks/bench_plugin_reports.py [count] [folder]
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import _bench
+from gjtools import plugin_reports
+
+PLUGINS = ['Dynamo', 'Enscape', 'pyRevit', 'BIMcollab', 'Naviate', 'DiRoots', 'Ideate']
+
+
+def make_reports(folder, count):
+    for i in range(count):
+        pc = 'PC-{:04d}'.format(i)
+        path = os.path.join(folder, '{} - Revit Plugins 2024.txt'.format(pc))
+        with open(path, 'w') as f:
+            f.write('PC,Plugin,Status\n')
+            for j, plugin in enumerate(PLUGINS):
+                f.write('{},{},{}\n'.format(pc, plugin, 'INSTALLED' if (i + j) % 3 else 'NOT INSTALLED'))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    folder = sys.argv[2] if len(sys.argv) > 2 else tempfile.mkdtemp(prefix='gj_reports_')
+    cache_path = os.path.join(tempfile.mkdtemp(prefix='gj_cache_'), 'cache.json')
+    try:
+        make_reports(folder, count)
+        for label, workers in (('cold, 1 worker', 1), ('cold, 8 workers', 8)):
+            _, stats = plugin_reports.ingest_reports(folder, workers=workers)
+            _bench.report(label, stats.wall_time, count)
+
+        plugin_reports.ingest_reports(folder, plugin_reports.ReportCache(cache_path))
+        _, stats = plugin_reports.ingest_reports(folder, plugin_reports.ReportCache(cache_path))
+        _bench.report('warm cache', stats.wall_time, count)
+        print(stats)
+    finally:
+        if len(sys.argv) <= 2:
+            shutil.rmtree(folder)
+        shutil.rmtree(os.path.dirname(cache_path))
+
+
+if __name__ == '__main__':
+    main()
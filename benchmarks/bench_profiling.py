@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Overhead of the ``gjtools.profiling`` hooks, switched off and on.
+
+Times bare ``phase``/``count`` calls and the panel dimension check on a
+10k-element fake model with and without an active profile.
+"""
+import os
+import tempfile
+
+import _bench
+from _bench import best_of, report
+
+import fakerevit
+DB = fakerevit.install()
+
+from fakerevit.models import build_model  # noqa: E402
+from gjtools import element_snapshot, panel_checks, profiling  # noqa: E402
+
+CALLS = 100000
+
+
+def hooks():
+    for _ in range(CALLS):
+        with profiling.phase("compute"):
+            pass
+        profiling.count(elements=1)
+
+
+def main():
+    log_path = os.path.join(tempfile.mkdtemp(), "profile.jsonl")
+    model = build_model(10000)
+    # As the startup script does in Revit
+    element_snapshot.install(DB.APPLICATION)
+
+    os.environ[profiling.ENV_VAR] = "0"
+    report("phase+count, profiling off", best_of(hooks, 3), CALLS)
+    report("panel_check @10000, profiling off",
+           best_of(lambda: panel_checks.check_panel_dimensions(model.document, model.active_view), 3))
+
+    os.environ[profiling.ENV_VAR] = "1"
+
+    def profiled(name, func):
+        def run():
+            with profiling.tool(name, path=log_path):
+                func()
+        return run
+
+    report("phase+count, profiling on", best_of(profiled("hooks", hooks), 3), CALLS)
+    report("panel_check @10000, profiling on", best_of(profiled(
+        "panel_check", lambda: panel_checks.check_panel_dimensions(model.document, model.active_view)), 3))
+
+    phase_rows, tool_rows = profiling.summarize(profiling.read_records(log_path))
+    for name, phase, runs, p50, p90, slowest in phase_rows:
+        print("    {:<12} {:<8} runs={} median={:.1f} ms".format(name, phase, runs, p50))
+    for name, runs, errors, p50, p90, elements in tool_rows:
+        print("    {:<12} total median={:.1f} ms, elements={}".format(name, p50, elements))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""Run the core logic of the Revit tools on synthetic models, outside Revit.
+
+Uses the ``fakerevit`` stand-in for ``Autodesk.Revit.DB``. For each tool
+and model size it records wall time, calls per Revit API member and peak
+Python memory (``tracemalloc``, CPython only), and compares them with the
+stored baseline. API call counts are deterministic, so any increase is a
+regression; time and memory are flagged beyond ``TOLERANCE`` (time only
+when it also grew by more than ``MIN_SLOWDOWN_MS``).
+
+    python benchmarks/bench_revit_tools.py [--sizes 1000 10000 100000] [--latency-us 5]
+    python benchmarks/bench_revit_tools.py --update-baseline
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import sys
+
+import _bench
+from _bench import report
+
+import fakerevit
+DB = fakerevit.install()
+
+from fakerevit import API  # noqa: E402
+from fakerevit.models import SIZES, build_model  # noqa: E402
+from gjtools import (bootstrap, dimension_rules, element_snapshot, panel_checks, panel_sizes,  # noqa: E402
+                     revit_failures, revit_params, tool_log, worksets)
+from gjtools.revit_transactions import transaction  # noqa: E402
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2.7 / IronPython
+    tracemalloc = None
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "revit_tools.json")
+DIMENSION_RULES = os.path.join(_bench.ROOT, "GJ_Testing ground.extension", "GJ_TestingGround.tab", "Filter&Stuff.panel",
+                               "Check Dimensions.pushbutton", "rules.json")
+DEFAULT_SIZES = (1000, 10000)
+DUPLICATE_VALUE = "GeneralFailures.DuplicateValue"
+TOLERANCE = 1.5
+MIN_SLOWDOWN_MS = 5.0
+
+
+def panel_check(model):
+    return lambda: panel_checks.check_panel_dimensions(model.document, model.active_view)
+
+
+def panel_check_warm(model):
+    """Second check after 1% of the panels were edited (snapshot already built)."""
+    doc = model.document
+    panel_checks.check_panel_dimensions(doc, model.active_view)
+    with transaction(doc, "Edit Panels"):
+        for panel in model.elements(DB.BuiltInCategory.OST_CurtainWallPanels)[::100]:
+            panel.LookupParameter(panel_checks.CHECK_STATUS).Set("")
+    return lambda: panel_checks.check_panel_dimensions(doc, model.active_view)
+
+
+def panel_check_busy(model):
+    """Check with 5% of the panels checked out by another user."""
+    model.lend_panels(0.05)
+    return panel_check(model)
+
+
+def panel_sizes_codes(model):
+    """Size classes of every panel, with the codes written to Comments."""
+    doc = model.document
+
+    def run():
+        snapshot = panel_sizes.panel_snapshot(doc, "Comments")
+        classes = panel_sizes.group_panels(panel_sizes.read_panels(snapshot))
+        changes, _, _ = panel_sizes.code_changes(doc, snapshot, classes, "Comments")
+        with transaction(doc, "Write Panel Size Codes"):
+            written, _ = panel_sizes.write_codes(doc, changes, "Comments")
+        panel_sizes.remember_codes(snapshot, written, "Comments")
+    return run
+
+
+def dimension_rule_sets(model):
+    """The Check Dimensions rules (the fake values are millimetres) on a model with doors, windows and ceilings."""
+    model.add_dimension_elements()
+    with io.open(DIMENSION_RULES, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    data["scale"] = 1.0
+    return dimension_rules.parse_rules(data, DIMENSION_RULES)
+
+
+def dimension_check(model):
+    rule_set = dimension_rule_sets(model)
+
+    def run():
+        with tool_log.session("bench", emit=lambda name, records: None):
+            dimension_rules.check_dimensions(model.document, rule_set, model.active_view)
+    return run
+
+
+def dimension_check_per_category(model):
+    """The same rules run one category at a time, as one script per category would."""
+    rule_set = dimension_rule_sets(model)
+    single = [dimension_rules.RuleSet([category]) for category in rule_set.categories]
+
+    def run():
+        with tool_log.session("bench", emit=lambda name, records: None):
+            for category_rules in single:
+                dimension_rules.check_dimensions(model.document, category_rules, model.active_view)
+    return run
+
+
+def parameter_info(model):
+    elements = model.elements(DB.BuiltInCategory.OST_CurtainWallPanels)
+    return lambda: revit_params.parameter_info(model.document, elements)
+
+
+def copy_parameter(model):
+    elements = model.elements()
+
+    def run():
+        editable, _ = revit_params.editable_elements(model.document, elements, "Comments")
+        with transaction(model.document, "Copy Parameter Values"):
+            revit_params.copy_parameter_values(model.document, editable, "Mark", "Comments")
+    return run
+
+
+def copy_marks(model):
+    """Type Mark copied into Mark: one duplicate value warning per element, dismissed at commit by a rule."""
+    elements = model.elements()
+
+    def run():
+        with revit_failures.session(rules={DUPLICATE_VALUE: revit_failures.DISMISS}, report=False):
+            editable, _ = revit_params.editable_elements(model.document, elements, "Mark")
+            with transaction(model.document, "Copy Parameter Values"):
+                revit_params.copy_parameter_values(model.document, editable, "Type Mark", "Mark")
+    return run
+
+
+def create_worksets(model):
+    names = ["New Workset {:02d}".format(i) for i in range(20)]
+
+    def run():
+        created = worksets.create_worksets(model.document, names)
+        worksets.create_views_for_worksets(model.document, created)
+    return run
+
+
+def check_filters(model):
+    def run():
+        panel_checks.create_check_filters(model.document, model.active_view)
+        panel_checks.remove_check_filters(model.document)
+    return run
+
+
+BOOTSTRAP_PROFILE = {
+    "name": "BENCH",
+    "worksets": ["{:03d}_TVT_WORKSET".format(i) for i in range(20)],
+    "workset_views": True,
+    "check_filters": True,
+    "users": ["ARCH_{0}nna {0}lder".format(chr(ord("A") + i)) for i in range(10)],
+}
+
+
+def bootstrap_new(model):
+    return lambda: bootstrap.run(model.document, model.active_view, BOOTSTRAP_PROFILE)
+
+
+def bootstrap_rerun(model):
+    """Second run on a bootstrapped model: every stage should be skipped."""
+    bootstrap.run(model.document, model.active_view, BOOTSTRAP_PROFILE)
+    return lambda: bootstrap.run(model.document, model.active_view, BOOTSTRAP_PROFILE)
+
+
+TOOLS = [
+    ("panel_check", panel_check),
+    ("panel_check_warm", panel_check_warm),
+    ("panel_check_busy", panel_check_busy),
+    ("panel_sizes", panel_sizes_codes),
+    ("dimension_check", dimension_check),
+    ("dimension_check_per_category", dimension_check_per_category),
+    ("parameter_info", parameter_info),
+    ("copy_parameter", copy_parameter),
+    ("copy_marks", copy_marks),
+    ("create_worksets", create_worksets),
+    ("check_filters", check_filters),
+    ("bootstrap", bootstrap_new),
+    ("bootstrap_rerun", bootstrap_rerun),
+]
+
+
+def measure(setup, size):
+    """``{"wall_ms", "api_total", "api_calls", "peak_kb"}`` of one run on a fresh model."""
+    model = build_model(size)
+    run = setup(model)
+    gc.collect()
+    API.reset()
+    start = _bench.perf_counter()
+    run()
+    wall = _bench.perf_counter() - start
+    result = {"wall_ms": round(wall * 1000.0, 3), "api_total": API.total, "api_calls": dict(API.calls)}
+    # Closing drops the document's shared element snapshots
+    model.document.Close(False)
+
+    result["peak_kb"] = None
+    if tracemalloc is not None:
+        model = build_model(size)
+        run = setup(model)
+        gc.collect()
+        tracemalloc.start()
+        run()
+        result["peak_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024.0, 1)
+        tracemalloc.stop()
+        model.document.Close(False)
+    return result
+
+
+def compare(name, size, result, baseline):
+    """Regression messages against the baseline entry (if any)."""
+    problems = []
+    if not baseline:
+        return problems
+    if result["api_total"] > baseline["api_total"]:
+        grown = sorted(api for api, count in result["api_calls"].items()
+                       if count > baseline["api_calls"].get(api, 0))
+        problems.append("{} @{}: API calls {} -> {} ({})".format(
+            name, size, baseline["api_total"], result["api_total"], ", ".join(grown)))
+    if (result["wall_ms"] > baseline["wall_ms"] * TOLERANCE
+            and result["wall_ms"] - baseline["wall_ms"] > MIN_SLOWDOWN_MS):
+        problems.append("{} @{}: wall time {:.1f} -> {:.1f} ms".format(name, size, baseline["wall_ms"], result["wall_ms"]))
+    if result["peak_kb"] and baseline.get("peak_kb") and result["peak_kb"] > baseline["peak_kb"] * TOLERANCE:
+        problems.append("{} @{}: peak memory {:.0f} -> {:.0f} KB".format(name, size, baseline["peak_kb"], result["peak_kb"]))
+    return problems
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with io.open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    with io.open(path, "w", encoding="utf-8") as f:
+        f.write(u"{}\n".format(json.dumps(results, indent=1, sort_keys=True)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Revit tools on the fake Revit API.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="model sizes (elements), e.g. {}".format(" ".join(str(s) for s in SIZES)))
+    parser.add_argument("--tools", nargs="+", choices=[name for name, _ in TOOLS], help="only these tools")
+    parser.add_argument("--latency-us", type=float, default=0.0, help="busy-wait per Revit API call")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args(argv)
+
+    API.set_latency(args.latency_us / 1e6)
+    # As the startup script does in Revit
+    element_snapshot.install(DB.APPLICATION)
+    baseline = load_baseline(args.baseline) if not args.latency_us else {}
+    results = {}
+    problems = []
+    for name, setup in TOOLS:
+        if args.tools and name not in args.tools:
+            continue
+        for size in args.sizes:
+            result = measure(setup, size)
+            results.setdefault(name, {})[str(size)] = result
+            line = "{} @{}".format(name, size)
+            report(line, result["wall_ms"] / 1000.0, size)
+            print("    {} API calls{}".format(
+                result["api_total"], ", peak {:.0f} KB".format(result["peak_kb"]) if result["peak_kb"] else ""))
+            problems.extend(compare(name, size, result, baseline.get(name, {}).get(str(size))))
+
+    if args.update_baseline:
+        merged = load_baseline(args.baseline)
+        for name, by_size in results.items():
+            merged.setdefault(name, {}).update(by_size)
+        save_baseline(args.baseline, merged)
+        print("Baseline written to {}".format(args.baseline))
+        return 0
+    for problem in problems:
+        print("REGRESSION " + problem)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
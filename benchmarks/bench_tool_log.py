@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Benchmark what tool output costs: per-line prints against ``tool_log``.
+
+The output window pays per write, so stdout is replaced by a sink that
+busy-waits ``--latency-us`` per write (0 = an in-memory buffer). Compares
+printing every line, a buffered session flushed in one write, and debug
+messages that are switched off.
+
+    python benchmarks/bench_tool_log.py [--lines 5000] [--latency-us 200]
+"""
+import argparse
+import io
+import sys
+
+import _bench
+from gjtools import tool_log
+from gjtools._compat import perf_counter
+
+
+class SlowSink(object):
+    """Stand-in for the output window: a fixed cost per write."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.writes = 0
+        self.buffer = io.StringIO()
+
+    def write(self, text):
+        self.writes += 1
+        if self.latency:
+            end = perf_counter() + self.latency
+            while perf_counter() < end:
+                pass
+        self.buffer.write(text if isinstance(text, type(u"")) else text.decode("utf-8"))
+
+    def flush(self):
+        pass
+
+
+def with_stdout(sink, func):
+    def run():
+        previous, sys.stdout = sys.stdout, sink
+        try:
+            func()
+        finally:
+            sys.stdout = previous
+    return run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark tool output.")
+    parser.add_argument("--lines", type=int, default=5000)
+    parser.add_argument("--latency-us", type=float, default=0.0, help="cost of one write to the output")
+    args = parser.parse_args(argv)
+    lines = args.lines
+    sink = SlowSink(args.latency_us / 1e6)
+
+    def per_line():
+        for i in range(lines):
+            print("Panel {}: {} x {} -> '{}'".format(i, 1200, 605, "CHECK WIDTH"))
+
+    def buffered(level):
+        def run():
+            with tool_log.session("bench", emit=tool_log.print_emitter, level=level):
+                for i in range(lines):
+                    tool_log.debug("Panel {}: {} x {} -> '{}'", i, 1200, 605, "CHECK WIDTH")
+        return run
+
+    def warnings():
+        with tool_log.session("bench", emit=tool_log.print_emitter):
+            for i in range(lines):
+                tool_log.warning("Could not read report {}", i)
+
+    repeat = 3
+    _bench.report("print per line ({} lines)".format(lines), _bench.best_of(with_stdout(sink, per_line), repeat), lines)
+    _bench.report("tool_log, debug on, one flush", _bench.best_of(with_stdout(sink, buffered(tool_log.DEBUG)), repeat),
+                  lines)
+    _bench.report("tool_log, warnings, one flush", _bench.best_of(with_stdout(sink, warnings), repeat), lines)
+    _bench.report("tool_log, debug off", _bench.best_of(with_stdout(sink, buffered(tool_log.INFO)), repeat), lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Benchmark unique view naming on the fake Revit API.
+
+Creates ``count`` isometric views whose wanted names repeat (one per
+workset, as re-running Create Worksets or two users with the same initials
+do), naming them either by trying suffixes until Revit stops throwing or by
+reserving names in a ``ViewNameIndex`` built once.
+
+    python benchmarks/bench_view_names.py [count ...]
+"""
+import sys
+
+import _bench
+
+import fakerevit
+DB = fakerevit.install()
+
+from fakerevit import API  # noqa: E402
+from fakerevit.models import build_model  # noqa: E402
+from gjtools import worksets  # noqa: E402
+from gjtools.revit_transactions import transaction  # noqa: E402
+from gjtools.view_names import ViewNameIndex  # noqa: E402
+
+COUNTS = (500, 2000)
+DISTINCT_NAMES = 20
+
+
+def wanted_names(count):
+    return [worksets.VIEW_PREFIX + "WS_{:02d}".format(i % DISTINCT_NAMES) for i in range(count)]
+
+
+def by_exceptions(doc, view_type, names):
+    errors = 0
+    with transaction(doc, "Views"):
+        for name in names:
+            view = DB.View3D.CreateIsometric(doc, view_type.Id)
+            candidate, number = name, 1
+            while True:
+                try:
+                    view.Name = candidate
+                    break
+                except DB.ArgumentException:
+                    errors += 1
+                    number += 1
+                    candidate = "{} ({})".format(name, number)
+    return errors
+
+
+def by_index(doc, view_type, names):
+    index = ViewNameIndex.from_document(doc)
+    with transaction(doc, "Views"):
+        for name in names:
+            DB.View3D.CreateIsometric(doc, view_type.Id).Name = index.reserve(name)
+    return 0
+
+
+def run(strategy, count):
+    model = build_model(1000)
+    view_type = worksets.view_family_type(model.document, DB.ViewFamily.ThreeDimensional)
+    names = wanted_names(count)
+    API.reset()
+    start = _bench.perf_counter()
+    errors = strategy(model.document, view_type, names)
+    seconds = _bench.perf_counter() - start
+    model.document.Close(False)
+    return seconds, errors, API.total
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or COUNTS
+    for count in counts:
+        for label, strategy in (("retry on exception", by_exceptions), ("ViewNameIndex", by_index)):
+            seconds, errors, calls = run(strategy, count)
+            _bench.report("{} views, {}".format(count, label), seconds, count)
+            print("    {} name collisions raised, {} API calls".format(errors, calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1000 @@
+# -*- coding: utf-8 -*-
+"""Fake ``Autodesk.Revit.DB``: the classes and members the extension touches.
+
+Behaviour follows Revit where it matters for performance and correctness:
+parameters are new wrapper objects on every lookup, model changes outside
+an open transaction raise, view names must be unique, collectors are
+evaluated when iterated, and committed changes raise ``DocumentChanged`` on
+the document's ``Application``. A ``Mark`` set to a value already used in
+its category posts a warning, which a failures preprocessor can handle at
+commit; every failure left over costs Revit's own per-failure processing.
+"""
+import itertools
+
+from fakerevit import API
+from gjtools._compat import string_types
+
+
+class InvalidOperationException(Exception):
+    pass
+
+
+class ArgumentException(Exception):
+    pass
+
+
+class _Enum(object):
+    __slots__ = ("name", "value")
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def __int__(self):
+        return self.value
+
+    def __eq__(self, other):
+        return isinstance(other, _Enum) and other.value == self.value and type(other) is type(self)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __repr__(self):
+        return "{}.{}".format(type(self).__name__, self.name)
+
+
+def _enum(name, members):
+    cls = type(name, (_Enum,), {"__slots__": ()})
+    for member, value in members:
+        setattr(cls, member, cls(member, value))
+    return cls
+
+
+BuiltInCategory = _enum("BuiltInCategory", [
+    ("OST_CurtainWallPanels", -2000170), ("OST_Walls", -2000011), ("OST_Doors", -2000023),
+    ("OST_Windows", -2000014), ("OST_GenericModel", -2000151), ("OST_Ceilings", -2000038),
+    ("OST_Views", -2000279), ("INVALID", -1)])
+StorageType = _enum("StorageType", [
+    ("String", 3), ("Integer", 1), ("Double", 2), ("ElementId", 4)])
+ViewFamily = _enum("ViewFamily", [("ThreeDimensional", 102), ("FloorPlan", 109)])
+WorksetKind = _enum("WorksetKind", [("UserWorkset", 1), ("ViewWorkset", 5)])
+CheckoutStatus = _enum("CheckoutStatus", [("OwnedByOtherUser", 0), ("OwnedByCurrentUser", 1), ("NotOwned", 2)])
+ViewDuplicateOption = _enum("ViewDuplicateOption", [("Duplicate", 0), ("WithDetailing", 1), ("AsDependent", 2)])
+WorksetVisibility = _enum("WorksetVisibility", [("Visible", 0), ("Hidden", 1), ("UseGlobalSetting", 2)])
+TransactionStatus = _enum("TransactionStatus", [
+    ("Uninitialized", 0), ("Started", 1), ("Committed", 3), ("RolledBack", 4)])
+FailureSeverity = _enum("FailureSeverity", [("NoFailure", 0), ("Warning", 1), ("Error", 2)])
+FailureProcessingResult = _enum("FailureProcessingResult", [
+    ("Continue", 0), ("ProceedWithRollBack", 1), ("ProceedWithCommit", 2)])
+
+
+class ElementId(object):
+    __slots__ = ("IntegerValue",)
+
+    def __init__(self, value):
+        self.IntegerValue = int(value)
+
+    @property
+    def Value(self):
+        return self.IntegerValue
+
+    def __eq__(self, other):
+        return isinstance(other, ElementId) and other.IntegerValue == self.IntegerValue
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.IntegerValue)
+
+    def __repr__(self):
+        return "ElementId({})".format(self.IntegerValue)
+
+
+ElementId.InvalidElementId = ElementId(-1)
+
+
+class WorksetId(ElementId):
+    __slots__ = ()
+
+
+class Category(object):
+    __slots__ = ("Id", "Name")
+
+    def __init__(self, built_in, name):
+        self.Id = ElementId(int(built_in))
+        self.Name = name
+
+
+# Parameters ---------------------------------------------------------------
+
+class Definition(object):
+    __slots__ = ("Name",)
+
+    def __init__(self, name):
+        self.Name = name
+
+
+class Parameter(object):
+    """Wrapper over one value of an element; created anew on every lookup like in Revit."""
+
+    __slots__ = ("_element", "_name", "_storage", "_read_only")
+
+    def __init__(self, element, name, storage, read_only):
+        self._element = element
+        self._name = name
+        self._storage = storage
+        self._read_only = read_only
+
+    @property
+    def Definition(self):
+        API("Parameter.Definition")
+        return Definition(self._name)
+
+    @property
+    def StorageType(self):
+        API("Parameter.StorageType")
+        return self._storage
+
+    @property
+    def IsReadOnly(self):
+        API("Parameter.IsReadOnly")
+        return self._read_only
+
+    @property
+    def HasValue(self):
+        API("Parameter.HasValue")
+        return self._element._values.get(self._name) is not None
+
+    def _value(self, storage, api_name):
+        API(api_name)
+        if self._storage != storage:
+            return None if storage in (StorageType.String, StorageType.ElementId) else 0
+        return self._element._values.get(self._name)
+
+    def AsString(self):
+        return self._value(StorageType.String, "Parameter.AsString")
+
+    def AsInteger(self):
+        return self._value(StorageType.Integer, "Parameter.AsInteger") or 0
+
+    def AsDouble(self):
+        return self._value(StorageType.Double, "Parameter.AsDouble") or 0.0
+
+    def AsElementId(self):
+        return self._value(StorageType.ElementId, "Parameter.AsElementId") or ElementId.InvalidElementId
+
+    def AsValueString(self):
+        API("Parameter.AsValueString")
+        value = self._element._values.get(self._name)
+        if value is None:
+            return None
+        if self._storage == StorageType.Double:
+            return "{:g}".format(value)
+        if self._storage == StorageType.ElementId:
+            return str(value.IntegerValue)
+        return str(value)
+
+    def Set(self, value):
+        API("Parameter.Set")
+        if self._read_only:
+            raise InvalidOperationException("The parameter is read-only.")
+        document = self._element.Document
+        document._require_transaction()
+        document._require_editable(self._element._id)
+        if self._storage == StorageType.String and not isinstance(value, string_types):
+            raise ArgumentException("Wrong value type for a text parameter.")
+        if self._name == "Mark":
+            document._mark_changed(self._element, value)
+        self._element._values[self._name] = value
+        document._changed("modified", self._element._id)
+        return True
+
+
+# Elements -----------------------------------------------------------------
+
+class Element(object):
+    """Model element with a per-category parameter schema and its own values."""
+
+    __slots__ = ("Document", "_id", "_name", "Category", "_schema", "_values", "_type_id", "__weakref__")
+
+    def __init__(self, document, name="", category=None, schema=None, values=None, type_id=None):
+        self.Document = document
+        self._id = None
+        self._name = name
+        self.Category = category
+        self._schema = schema or {}
+        self._values = values if values is not None else {}
+        self._type_id = type_id or ElementId.InvalidElementId
+
+    @property
+    def Id(self):
+        return self._id
+
+    @property
+    def Name(self):
+        API("Element.Name")
+        return self._name
+
+    @Name.setter
+    def Name(self, value):
+        API("Element.Name.set")
+        self.Document._require_transaction()
+        self._name = value
+        self.Document._changed("modified", self._id)
+
+    @property
+    def Parameters(self):
+        API("Element.Parameters")
+        return [Parameter(self, name, storage, read_only) for name, (storage, read_only) in self._schema.items()]
+
+    def LookupParameter(self, name):
+        API("Element.LookupParameter")
+        spec = self._schema.get(name)
+        if spec is None:
+            return None
+        return Parameter(self, name, spec[0], spec[1])
+
+    def GetTypeId(self):
+        API("Element.GetTypeId")
+        return self._type_id
+
+    @property
+    def WorksetId(self):
+        API("Element.WorksetId")
+        return WorksetId(self._values.get("Workset") or 0)
+
+
+class ElementType(Element):
+    __slots__ = ()
+
+
+class ParameterElement(Element):
+    __slots__ = ()
+
+
+class FillPattern(object):
+    __slots__ = ("IsSolidFill",)
+
+    def __init__(self, solid):
+        self.IsSolidFill = solid
+
+
+class FillPatternElement(Element):
+    __slots__ = ("_solid",)
+
+    def __init__(self, document, name, solid=False):
+        Element.__init__(self, document, name)
+        self._solid = solid
+
+    def GetFillPattern(self):
+        API("FillPatternElement.GetFillPattern")
+        return FillPattern(self._solid)
+
+
+class ViewFamilyType(ElementType):
+    __slots__ = ("ViewFamily",)
+
+    def __init__(self, document, name, family):
+        ElementType.__init__(self, document, name)
+        self.ViewFamily = family
+
+
+class View(Element):
+    __slots__ = ("ViewTemplateId", "IsTemplate", "_filters", "_workset_visibility")
+
+    def __init__(self, document, name, category=None, schema=None, values=None):
+        Element.__init__(self, document, name, category, schema, values)
+        self.ViewTemplateId = ElementId.InvalidElementId
+        self.IsTemplate = False
+        self._filters = {}
+        self._workset_visibility = {}
+
+    @Element.Name.setter
+    def Name(self, value):
+        API("Element.Name.set")
+        document = self.Document
+        document._require_transaction()
+        if value in document._view_names:
+            raise ArgumentException("The name '{}' is already in use.".format(value))
+        document._view_names.discard(self._name)
+        document._view_names.add(value)
+        self._name = value
+        document._changed("modified", self._id)
+
+    def AddFilter(self, filter_id):
+        API("View.AddFilter")
+        self.Document._require_transaction()
+        self._filters[filter_id] = None
+
+    def GetFilters(self):
+        API("View.GetFilters")
+        return list(self._filters)
+
+    def SetFilterOverrides(self, filter_id, overrides):
+        API("View.SetFilterOverrides")
+        self.Document._require_transaction()
+        if filter_id not in self._filters:
+            raise ArgumentException("Filter is not applied to the view.")
+        self._filters[filter_id] = overrides
+
+    def SetWorksetVisibility(self, workset_id, visibility):
+        API("View.SetWorksetVisibility")
+        self.Document._require_transaction()
+        self._workset_visibility[workset_id] = visibility
+
+    def GetWorksetVisibility(self, workset_id):
+        API("View.GetWorksetVisibility")
+        return self._workset_visibility.get(workset_id, WorksetVisibility.UseGlobalSetting)
+
+    def Duplicate(self, option):
+        API("View.Duplicate")
+        document = self.Document
+        document._require_transaction()
+        copy = 1
+        while "{} Copy {}".format(self._name, copy) in document._view_names:
+            copy += 1
+        view = type(self)(document, "{} Copy {}".format(self._name, copy), self.Category, self._schema,
+                          dict(self._values))
+        document._add(view)
+        return view.Id
+
+
+class View3D(View):
+    __slots__ = ()
+
+    @staticmethod
+    def CreateIsometric(document, view_family_type_id):
+        API("View3D.CreateIsometric")
+        document._require_transaction()
+        view = View3D(document, "{3D}")
+        document._add(view)
+        name = "{{3D}} {}".format(view.Id.IntegerValue)
+        view._name = name
+        document._view_names.add(name)
+        return view
+
+
+# Filters and graphics -----------------------------------------------------
+
+class ParameterValueProvider(object):
+    def __init__(self, parameter_id):
+        API("ParameterValueProvider")
+        self.parameter_id = parameter_id
+
+
+class FilterStringEquals(object):
+    def __init__(self):
+        API("FilterStringEquals")
+
+
+class FilterStringRule(object):
+    def __init__(self, provider, evaluator, value, case_sensitive=False):
+        API("FilterStringRule")
+        self.provider = provider
+        self.value = value
+
+
+class ElementParameterFilter(object):
+    def __init__(self, rule):
+        API("ElementParameterFilter")
+        self.rule = rule
+
+
+class ParameterFilterElement(Element):
+    __slots__ = ("_categories", "_filter")
+
+    @staticmethod
+    def Create(document, name, categories):
+        API("ParameterFilterElement.Create")
+        document._require_transaction()
+        element = ParameterFilterElement(document, name)
+        element._categories = list(categories)
+        element._filter = None
+        document._add(element)
+        return element
+
+    def SetElementFilter(self, element_filter):
+        API("ParameterFilterElement.SetElementFilter")
+        self.Document._require_transaction()
+        self._filter = element_filter
+
+
+class Color(object):
+    __slots__ = ("Red", "Green", "Blue")
+
+    def __init__(self, red, green, blue):
+        self.Red, self.Green, self.Blue = red, green, blue
+
+
+class OverrideGraphicSettings(object):
+    def __init__(self):
+        API("OverrideGraphicSettings")
+        self.settings = {}
+
+    def __getattr__(self, name):
+        if not name.startswith("Set"):
+            raise AttributeError(name)
+
+        def setter(value):
+            API("OverrideGraphicSettings." + name)
+            self.settings[name[3:]] = value
+            return self
+        return setter
+
+
+# Worksets -----------------------------------------------------------------
+
+class Workset(object):
+    __slots__ = ("Id", "Name", "Kind")
+
+    def __init__(self, workset_id, name, kind):
+        self.Id = workset_id
+        self.Name = name
+        self.Kind = kind
+
+    @staticmethod
+    def Create(document, name):
+        API("Workset.Create")
+        document._require_transaction()
+        if any(w.Name == name for w in document._worksets):
+            raise ArgumentException("Workset name is not unique.")
+        workset = Workset(WorksetId(len(document._worksets) + 1), name, WorksetKind.UserWorkset)
+        document._worksets.append(workset)
+        return workset
+
+
+class FilteredWorksetCollector(object):
+    def __init__(self, document):
+        API("FilteredWorksetCollector")
+        self._document = document
+        self._kind = None
+
+    def OfKind(self, kind):
+        API("FilteredWorksetCollector.OfKind")
+        self._kind = kind
+        return self
+
+    def __iter__(self):
+        return iter([w for w in self._document._worksets if self._kind is None or w.Kind == self._kind])
+
+    def ToWorksets(self):
+        return list(self)
+
+
+# Collectors and transactions ----------------------------------------------
+
+class ElementMulticategoryFilter(object):
+    def __init__(self, categories):
+        API("ElementMulticategoryFilter")
+        self._values = set(int(c) for c in categories)
+
+    def _passes(self, element):
+        return element.Category is not None and element.Category.Id.IntegerValue in self._values
+
+
+class FilteredElementCollector(object):
+    """Collector over ``Document`` elements; filters are applied on iteration."""
+
+    def __init__(self, document, view_id=None):
+        API("FilteredElementCollector")
+        self._document = document
+        self._view_id = view_id
+        self._filters = []
+
+    def _add(self, api_name, predicate):
+        API(api_name)
+        self._filters.append(predicate)
+        return self
+
+    def OfCategory(self, category):
+        value = int(category)
+        return self._add("FilteredElementCollector.OfCategory",
+                         lambda e: e.Category is not None and e.Category.Id.IntegerValue == value)
+
+    def OfClass(self, cls):
+        return self._add("FilteredElementCollector.OfClass", lambda e: isinstance(e, cls))
+
+    def WherePasses(self, element_filter):
+        return self._add("FilteredElementCollector.WherePasses", element_filter._passes)
+
+    def WhereElementIsNotElementType(self):
+        return self._add("FilteredElementCollector.WhereElementIsNotElementType",
+                         lambda e: not isinstance(e, ElementType))
+
+    def WhereElementIsElementType(self):
+        return self._add("FilteredElementCollector.WhereElementIsElementType",
+                         lambda e: isinstance(e, ElementType))
+
+    def _elements(self):
+        elements = self._document._elements.values()
+        if self._view_id is not None:
+            # A view shows model elements, never types or other views
+            elements = (e for e in elements
+                        if e.Category is not None and not isinstance(e, (ElementType, View)))
+        filters = self._filters
+        for element in elements:
+            if all(f(element) for f in filters):
+                yield element
+
+    def __iter__(self):
+        return self._elements()
+
+    def ToElements(self):
+        API("FilteredElementCollector.ToElements")
+        return list(self._elements())
+
+    def ToElementIds(self):
+        API("FilteredElementCollector.ToElementIds")
+        return [e.Id for e in self._elements()]
+
+    def FirstElement(self):
+        API("FilteredElementCollector.FirstElement")
+        return next(self._elements(), None)
+
+    def GetElementCount(self):
+        API("FilteredElementCollector.GetElementCount")
+        return sum(1 for _ in self._elements())
+
+
+class Transaction(object):
+    def __init__(self, document, name=""):
+        API("Transaction")
+        self._document = document
+        self._name = name
+        self._status = TransactionStatus.Uninitialized
+        self._options = FailureHandlingOptions()
+
+    def GetFailureHandlingOptions(self):
+        API("Transaction.GetFailureHandlingOptions")
+        return self._options
+
+    def SetFailureHandlingOptions(self, options):
+        API("Transaction.SetFailureHandlingOptions")
+        self._options = options
+
+    def Start(self):
+        API("Transaction.Start")
+        if self._document._transaction is not None:
+            raise InvalidOperationException("A transaction is already open.")
+        self._document._transaction = self
+        self._document._changes = {"added": set(), "modified": set(), "deleted": set()}
+        self._document._failures = []
+        self._status = TransactionStatus.Started
+        return self._status
+
+    def _end(self, status):
+        if self._status != TransactionStatus.Started:
+            raise InvalidOperationException("The transaction has not been started.")
+        self._document._transaction = None
+        self._status = status
+        return status
+
+    def Commit(self):
+        API("Transaction.Commit")
+        changes = self._document._changes
+        failures = self._document._failures
+        if failures:
+            preprocessor = self._options._preprocessor
+            if preprocessor is not None:
+                accessor = FailuresAccessor(failures)
+                # After ProceedWithCommit Revit preprocesses the remaining failures again
+                while preprocessor.PreprocessFailures(accessor) == FailureProcessingResult.ProceedWithCommit:
+                    accessor = FailuresAccessor(accessor._messages)
+                failures = accessor._messages
+            for failure in failures:
+                # Revit's own failure processing: collected, shown and stored one by one
+                API("Failures.process")
+            if any(failure._severity == FailureSeverity.Error for failure in failures):
+                self.RollBack()
+                return self._status
+            self._document._warnings.extend(failures)
+        status = self._end(TransactionStatus.Committed)
+        if any(changes.values()):
+            self._document.Application.DocumentChanged._raise(
+                self._document.Application, DocumentChangedEventArgs(self._document, changes, [self._name]))
+        return status
+
+    def RollBack(self):
+        API("Transaction.RollBack")
+        self._document._discard_added(self._document._changes["added"])
+        return self._end(TransactionStatus.RolledBack)
+
+    def HasStarted(self):
+        return self._status != TransactionStatus.Uninitialized
+
+    def HasEnded(self):
+        return self._status in (TransactionStatus.Committed, TransactionStatus.RolledBack)
+
+    def GetStatus(self):
+        return self._status
+
+
+class SubTransaction(object):
+    """Part of the open transaction; a roll back only removes the elements added since ``Start``."""
+
+    def __init__(self, document):
+        API("SubTransaction")
+        self._document = document
+        self._status = TransactionStatus.Uninitialized
+        self._first_id = None
+
+    def Start(self):
+        API("SubTransaction.Start")
+        self._document._require_transaction()
+        self._first_id = self._document._next_id
+        self._status = TransactionStatus.Started
+        return self._status
+
+    def _end(self, status):
+        if self._status != TransactionStatus.Started:
+            raise InvalidOperationException("The sub-transaction has not been started.")
+        self._status = status
+        return status
+
+    def Commit(self):
+        API("SubTransaction.Commit")
+        return self._end(TransactionStatus.Committed)
+
+    def RollBack(self):
+        API("SubTransaction.RollBack")
+        added = self._document._changes["added"]
+        rolled_back = set(i for i in added if i.IntegerValue >= self._first_id)
+        added -= rolled_back
+        self._document._discard_added(rolled_back)
+        return self._end(TransactionStatus.RolledBack)
+
+    def HasStarted(self):
+        return self._status != TransactionStatus.Uninitialized
+
+    def HasEnded(self):
+        return self._status in (TransactionStatus.Committed, TransactionStatus.RolledBack)
+
+
+class TransactionGroup(object):
+    """Several transactions as one undo step; a roll back removes the elements they added."""
+
+    def __init__(self, document, name=""):
+        API("TransactionGroup")
+        self._document = document
+        self._name = name
+        self._status = TransactionStatus.Uninitialized
+        self._first_id = None
+
+    def Start(self):
+        API("TransactionGroup.Start")
+        if self._document._transaction is not None:
+            raise InvalidOperationException("A transaction is open.")
+        self._first_id = self._document._next_id
+        self._status = TransactionStatus.Started
+        return self._status
+
+    def _end(self, status):
+        if self._status != TransactionStatus.Started:
+            raise InvalidOperationException("The transaction group has not been started.")
+        if self._document._transaction is not None:
+            raise InvalidOperationException("A transaction of the group is still open.")
+        self._status = status
+        return status
+
+    def Assimilate(self):
+        API("TransactionGroup.Assimilate")
+        return self._end(TransactionStatus.Committed)
+
+    def RollBack(self):
+        API("TransactionGroup.RollBack")
+        status = self._end(TransactionStatus.RolledBack)
+        self._document._discard_added(
+            [ElementId(i) for i in self._document._elements if i >= self._first_id])
+        return status
+
+    def HasStarted(self):
+        return self._status != TransactionStatus.Uninitialized
+
+    def HasEnded(self):
+        return self._status in (TransactionStatus.Committed, TransactionStatus.RolledBack)
+
+
+class _Event(object):
+    """.NET event: ``+=``/``-=`` handlers called with ``(sender, args)``."""
+
+    def __init__(self):
+        self._handlers = []
+
+    def __iadd__(self, handler):
+        self._handlers.append(handler)
+        return self
+
+    def __isub__(self, handler):
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+        return self
+
+    def _raise(self, sender, args):
+        for handler in list(self._handlers):
+            handler(sender, args)
+
+
+class Application(object):
+    def __init__(self):
+        self.Username = "bench.user"
+        self.DocumentChanged = _Event()
+        self.DocumentClosing = _Event()
+
+
+# One per session, as in Revit
+APPLICATION = Application()
+
+
+class DocumentClosingEventArgs(object):
+    def __init__(self, document):
+        self.Document = document
+
+
+class DocumentChangedEventArgs(object):
+    def __init__(self, document, changes, names=()):
+        self._document = document
+        self._changes = changes
+        self._names = list(names)
+
+    def GetDocument(self):
+        return self._document
+
+    def GetAddedElementIds(self):
+        return list(self._changes["added"])
+
+    def GetModifiedElementIds(self):
+        return list(self._changes["modified"] - self._changes["added"] - self._changes["deleted"])
+
+    def GetDeletedElementIds(self):
+        return list(self._changes["deleted"] - self._changes["added"])
+
+    def GetTransactionNames(self):
+        return list(self._names)
+
+
+_document_hashes = itertools.count(1)
+
+
+class Document(object):
+    def __init__(self, title="Synthetic", workshared=True, application=None, path=""):
+        self.Title = title
+        self.PathName = path
+        self.IsValidObject = True
+        self.IsWorkshared = workshared
+        self.Application = application or APPLICATION
+        self._elements = {}
+        self._next_id = 1000
+        self._transaction = None
+        self._changes = None
+        self._hash = next(_document_hashes)
+        self._view_names = set()
+        self._worksets = []
+        # Element id -> user name of the elements owned in a workshared model
+        self._owners = {}
+        self._failures = []
+        self._warnings = []
+        # Category id -> {Mark: element count}, built on the first Mark change
+        self._marks = None
+        self._project_info = None
+
+    def GetHashCode(self):
+        return self._hash
+
+    def Equals(self, other):
+        return self is other
+
+    @property
+    def ProjectInformation(self):
+        API("Document.ProjectInformation")
+        if self._project_info is None:
+            self._project_info = Element(self, "Project Information")
+            self._project_info._id = ElementId(1)
+        return self._project_info
+
+    def Close(self, save_modified=False):
+        API("Document.Close")
+        self.Application.DocumentClosing._raise(self.Application, DocumentClosingEventArgs(self))
+        self.IsValidObject = False
+        return True
+
+    def _changed(self, kind, element_id):
+        if self._transaction is not None:
+            self._changes[kind].add(element_id)
+
+    @property
+    def IsModifiable(self):
+        return self._transaction is not None
+
+    def _require_transaction(self):
+        if self._transaction is None:
+            raise InvalidOperationException("Modification of the document is forbidden outside a transaction.")
+
+    def _require_editable(self, element_id):
+        if not self.IsWorkshared:
+            return
+        owner = self._owners.get(element_id.IntegerValue)
+        if owner is None:
+            # Editing borrows the element: one round trip to central
+            API("Worksharing.borrow")
+            self._owners[element_id.IntegerValue] = self.Application.Username
+        elif owner != self.Application.Username:
+            raise InvalidOperationException("The element is owned by {}.".format(owner))
+
+    def _mark_changed(self, element, value):
+        if self._marks is None:
+            self._marks = {}
+            for other in self._elements.values():
+                mark = other._values.get("Mark")
+                if mark and other.Category is not None and "Mark" in other._schema:
+                    counts = self._marks.setdefault(other.Category.Id.IntegerValue, {})
+                    counts[mark] = counts.get(mark, 0) + 1
+        counts = self._marks.setdefault(element.Category.Id.IntegerValue if element.Category else 0, {})
+        old = element._values.get("Mark")
+        if old:
+            counts[old] = counts.get(old, 1) - 1
+        if value:
+            counts[value] = counts.get(value, 0) + 1
+            if counts[value] > 1:
+                self._failures.append(FailureMessageAccessor(
+                    BuiltInFailures.GeneralFailures.DuplicateValue, FailureSeverity.Warning, [element._id]))
+
+    def _add(self, element):
+        element._id = ElementId(self._next_id)
+        self._next_id += 1
+        self._elements[element._id.IntegerValue] = element
+        self._changed("added", element._id)
+        if self._transaction is not None and self.IsWorkshared:
+            # Elements created in a session belong to its user
+            self._owners[element._id.IntegerValue] = self.Application.Username
+        if isinstance(element, View):
+            self._view_names.add(element._name)
+        return element
+
+    def _discard_added(self, element_ids):
+        for element_id in element_ids:
+            element = self._elements.pop(element_id.IntegerValue, None)
+            if isinstance(element, View):
+                self._view_names.discard(element._name)
+
+    def GetElement(self, element_id):
+        API("Document.GetElement")
+        if element_id is None:
+            return None
+        return self._elements.get(element_id.IntegerValue)
+
+    def Delete(self, element_id):
+        API("Document.Delete")
+        self._require_transaction()
+        element = self._elements.pop(element_id.IntegerValue, None)
+        if element is None:
+            raise ArgumentException("Element does not exist.")
+        self._changed("deleted", element_id)
+        if isinstance(element, View):
+            self._view_names.discard(element._name)
+        return [element_id]
+
+
+# Failures -------------------------------------------------------------------
+
+class FailureDefinitionId(object):
+    __slots__ = ("Guid",)
+
+    def __init__(self, guid):
+        self.Guid = guid
+
+
+class _FailureGroup(object):
+    def __init__(self, **definitions):
+        for name, guid in definitions.items():
+            setattr(self, name, FailureDefinitionId(guid))
+
+
+class BuiltInFailures(object):
+    GeneralFailures = _FailureGroup(DuplicateValue="b4176cef-6086-45a8-a066-c3fd424c9412")
+    OverlapFailures = _FailureGroup(DuplicateInstances="00dd9ba5-c4ee-4bd9-a5a8-5a2d9f3fbc46")
+
+
+DESCRIPTIONS = {
+    BuiltInFailures.GeneralFailures.DuplicateValue.Guid: "Elements have duplicate 'Mark' values.",
+    BuiltInFailures.OverlapFailures.DuplicateInstances.Guid: "There are identical instances in the same place.",
+}
+
+
+class IFailuresPreprocessor(object):
+    def PreprocessFailures(self, accessor):
+        raise NotImplementedError
+
+
+class FailureHandlingOptions(object):
+    def __init__(self):
+        self._preprocessor = None
+        self._clear_after_rollback = False
+
+    def SetFailuresPreprocessor(self, preprocessor):
+        self._preprocessor = preprocessor
+        return self
+
+    def SetClearAfterRollback(self, clear):
+        self._clear_after_rollback = clear
+        return self
+
+
+class FailureMessageAccessor(object):
+    __slots__ = ("_definition", "_severity", "_element_ids")
+
+    def __init__(self, definition, severity, element_ids):
+        self._definition = definition
+        self._severity = severity
+        self._element_ids = element_ids
+
+    def GetFailureDefinitionId(self):
+        API("FailureMessageAccessor.GetFailureDefinitionId")
+        return self._definition
+
+    def GetSeverity(self):
+        API("FailureMessageAccessor.GetSeverity")
+        return self._severity
+
+    def GetDescriptionText(self):
+        API("FailureMessageAccessor.GetDescriptionText")
+        return DESCRIPTIONS.get(self._definition.Guid, "Failure {}".format(self._definition.Guid))
+
+    def GetFailingElementIds(self):
+        API("FailureMessageAccessor.GetFailingElementIds")
+        return list(self._element_ids)
+
+    def HasResolutions(self):
+        API("FailureMessageAccessor.HasResolutions")
+        return False
+
+
+class FailuresAccessor(object):
+    def __init__(self, messages):
+        self._messages = list(messages)
+
+    def GetFailureMessages(self):
+        API("FailuresAccessor.GetFailureMessages")
+        return list(self._messages)
+
+    def DeleteWarning(self, message):
+        API("FailuresAccessor.DeleteWarning")
+        if message._severity != FailureSeverity.Warning:
+            raise InvalidOperationException("Only warnings can be deleted.")
+        self._messages.remove(message)
+
+    def DeleteAllWarnings(self):
+        API("FailuresAccessor.DeleteAllWarnings")
+        self._messages = [m for m in self._messages if m._severity != FailureSeverity.Warning]
+
+    def ResolveFailure(self, message):
+        API("FailuresAccessor.ResolveFailure")
+        raise InvalidOperationException("The failure has no resolutions.")
+
+
+# Worksharing ----------------------------------------------------------------
+
+class WorksharingUtils(object):
+    @staticmethod
+    def GetCheckoutStatus(document, element_id):
+        API("WorksharingUtils.GetCheckoutStatus")
+        owner = document._owners.get(element_id.IntegerValue)
+        if owner is None:
+            return CheckoutStatus.NotOwned
+        if owner == document.Application.Username:
+            return CheckoutStatus.OwnedByCurrentUser
+        return CheckoutStatus.OwnedByOtherUser
+
+    @staticmethod
+    def CheckoutElements(document, element_ids):
+        API("WorksharingUtils.CheckoutElements")
+        user = document.Application.Username
+        checked_out = []
+        for element_id in element_ids:
+            owner = document._owners.setdefault(element_id.IntegerValue, user)
+            if owner == user:
+                checked_out.append(element_id)
+        return checked_out
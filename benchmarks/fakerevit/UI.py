@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Fake ``Autodesk.Revit.UI``: external events.
+
+``ExternalEvent.Raise`` may be called from any thread and only queues the
+handler; ``idle`` plays Revit's idle loop on the UI thread and runs the
+handlers raised since, with the ``UIApplication`` as argument.
+"""
+import threading
+
+from fakerevit import API
+
+_pending = []
+_lock = threading.Lock()
+
+ExternalEventRequest = type("ExternalEventRequest", (object,), {"Accepted": 0, "Pending": 1, "Denied": 2})
+
+
+class IExternalEventHandler(object):
+    def Execute(self, uiapp):
+        raise NotImplementedError
+
+    def GetName(self):
+        raise NotImplementedError
+
+
+class UIApplication(object):
+    pass
+
+
+UI_APPLICATION = UIApplication()
+
+
+class ExternalEvent(object):
+    def __init__(self, handler):
+        self._handler = handler
+        self._disposed = False
+
+    @staticmethod
+    def Create(handler):
+        API("ExternalEvent.Create")
+        return ExternalEvent(handler)
+
+    def Raise(self):
+        API("ExternalEvent.Raise")
+        if self._disposed:
+            return ExternalEventRequest.Denied
+        with _lock:
+            if self._handler in _pending:
+                return ExternalEventRequest.Pending
+            _pending.append(self._handler)
+        return ExternalEventRequest.Accepted
+
+    def Dispose(self):
+        self._disposed = True
+
+
+def idle():
+    """Run the handlers raised so far (on the calling thread); returns how many ran."""
+    with _lock:
+        handlers = list(_pending)
+        del _pending[:]
+    for handler in handlers:
+        handler.Execute(UI_APPLICATION)
+    return len(handlers)
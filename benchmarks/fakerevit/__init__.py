@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Pure-Python stand-in for the part of the Revit API the extension uses.
+
+``install()`` registers ``Autodesk.Revit.DB`` and ``Autodesk.Revit.UI``
+(plus no-op ``clr`` and a minimal ``System.Collections.Generic``) in
+``sys.modules``, so ``gjtools`` code runs unchanged on any Python. Every API member counts its calls in
+``API.calls`` and can be given a per-call latency to mimic the cost of
+crossing into Revit.
+"""
+import sys
+import types
+
+from gjtools._compat import perf_counter
+
+
+class ApiMeter(object):
+    """Per-API call counter with optional busy-wait latency (seconds)."""
+
+    def __init__(self):
+        self.calls = {}
+        self.latency = {}
+        self.default_latency = 0.0
+
+    def reset(self):
+        self.calls = {}
+
+    def set_latency(self, default=0.0, **per_api):
+        self.default_latency = default
+        self.latency = dict(per_api)
+
+    def __call__(self, name):
+        calls = self.calls
+        calls[name] = calls.get(name, 0) + 1
+        delay = self.latency.get(name, self.default_latency)
+        if delay:
+            end = perf_counter() + delay
+            while perf_counter() < end:
+                pass
+
+    @property
+    def total(self):
+        return sum(self.calls.values())
+
+
+API = ApiMeter()
+
+
+class _GenericList(object):
+    """``List[T](items)`` of ``System.Collections.Generic``; a Python list here."""
+
+    def __getitem__(self, item_type):
+        return list
+
+
+def install():
+    """Register the fake modules; returns the fake ``Autodesk.Revit.DB`` module."""
+    from fakerevit import DB, UI
+    if sys.modules.get("Autodesk.Revit.DB") is DB:
+        return DB
+
+    clr = types.ModuleType("clr")
+    clr.AddReference = lambda name: None
+    autodesk = types.ModuleType("Autodesk")
+    revit = types.ModuleType("Autodesk.Revit")
+    autodesk.Revit = revit
+    revit.DB = DB
+    revit.UI = UI
+    system = types.ModuleType("System")
+    collections = types.ModuleType("System.Collections")
+    generic = types.ModuleType("System.Collections.Generic")
+    generic.List = _GenericList()
+    system.Collections = collections
+    collections.Generic = generic
+
+    sys.modules.update({
+        "clr": clr,
+        "Autodesk": autodesk,
+        "Autodesk.Revit": revit,
+        "Autodesk.Revit.DB": DB,
+        "Autodesk.Revit.UI": UI,
+        "System": system,
+        "System.Collections": collections,
+        "System.Collections.Generic": generic,
+    })
+    return DB
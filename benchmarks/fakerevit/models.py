@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Deterministic synthetic models for the fake Revit API.
+
+``build_model(size)`` returns a ``Model`` with ``size`` model elements:
+mostly curtain panels (Height/Width/CHECK_STATUS, as the panel tools
+expect), walls and doors, with one element type per 100 instances, a few
+views, fill patterns, the CHECK_STATUS parameter element and user worksets.
+Nothing is checked out, except the share of panels ``other_owned`` gives
+to another user. ``Model.add_dimension_elements`` adds the windows, generic
+models and ceilings the dimension rules check, and gives the doors typed
+Width/Height.
+"""
+import random
+
+from fakerevit import DB
+
+SIZES = (1000, 10000, 100000)
+
+PANEL_HEIGHTS = (1200.0, 1205.0, 1210.0, 1203.0, 987.5, 2400.0, 2401.0)
+PANEL_WIDTHS = (600.0, 605.0, 610.0, 602.0, 1250.0, 1248.0)
+
+String, Integer, Double = DB.StorageType.String, DB.StorageType.Integer, DB.StorageType.Double
+
+COMMON = {
+    "Comments": (String, False),
+    "Mark": (String, False),
+    "Phase Created": (Integer, True),
+    "Workset": (Integer, True),
+}
+SCHEMAS = {
+    "panel": dict(COMMON, **{"Height": (Double, True), "Width": (Double, True), "Area": (Double, True),
+                             "CHECK_STATUS": (String, False)}),
+    "wall": dict(COMMON, **{"Length": (Double, True), "Volume": (Double, True), "Unconnected Height": (Double, False)}),
+    "door": dict(COMMON, **{"Head Height": (Double, False), "Frame Type": (String, False)}),
+    "type": {"Type Mark": (String, False), "Cost": (Double, False), "Type Comments": (String, False),
+             "Description": (String, False)},
+}
+OPENING_WIDTHS = (800.0, 900.0, 1000.0, 913.0)
+OPENING_HEIGHTS = (2100.0, 2125.0)
+CEILING_HEIGHTS = (2600.0, 2700.0, 2750.0, 2755.0, 3000.0)
+DIMENSIONS = {"Width": (Double, True), "Height": (Double, True)}
+CHECKED = {"CHECK_STATUS": (String, False)}
+DIMENSION_CATEGORIES = [
+    ("window", DB.BuiltInCategory.OST_Windows, "Windows", dict(COMMON, **CHECKED)),
+    ("generic", DB.BuiltInCategory.OST_GenericModel, "Generic Models",
+     dict(COMMON, **dict(CHECKED, Width=(Double, False), Length=(Double, False)))),
+    ("ceiling", DB.BuiltInCategory.OST_Ceilings, "Ceilings",
+     dict(COMMON, **dict(CHECKED, **{"Height Offset From Level": (Double, False)}))),
+]
+CATEGORIES = [
+    ("panel", DB.BuiltInCategory.OST_CurtainWallPanels, "Curtain Panels", 0.6),
+    ("wall", DB.BuiltInCategory.OST_Walls, "Walls", 0.3),
+    ("door", DB.BuiltInCategory.OST_Doors, "Doors", 0.1),
+]
+
+
+class Model(object):
+    def __init__(self, document, active_view, size):
+        self.document = document
+        self.active_view = active_view
+        self.size = size
+
+    def elements(self, category=None):
+        return [e for e in self.document._elements.values()
+                if e.Category is not None and not isinstance(e, (DB.ElementType, DB.View))
+                and (category is None or e.Category.Id.IntegerValue == int(category))]
+
+    def lend_panels(self, share, user="other.user", seed=1):
+        """Give ``share`` of the curtain panels to ``user`` (checked out by someone else)."""
+        rng = random.Random(seed)
+        for panel in self.elements(DB.BuiltInCategory.OST_CurtainWallPanels):
+            if rng.random() < share:
+                self.document._owners[panel.Id.IntegerValue] = user
+
+    def add_dimension_elements(self, share=0.05, seed=2):
+        """Add ``share`` of the model size each as windows, generic models and ceilings.
+
+        Their types and the door types get Width/Height, the doors a CHECK_STATUS; values are millimetres.
+        """
+        rng = random.Random(seed)
+        document = self.document
+        type_schema = dict(SCHEMAS["type"], **DIMENSIONS)
+        door_schema = dict(SCHEMAS["door"], **CHECKED)
+
+        def sized(element_type):
+            element_type._schema = type_schema
+            element_type._values.update(Width=rng.choice(OPENING_WIDTHS), Height=rng.choice(OPENING_HEIGHTS))
+            return element_type
+
+        door = int(DB.BuiltInCategory.OST_Doors)
+        for element in list(document._elements.values()):
+            if element.Category is None or element.Category.Id.IntegerValue != door:
+                continue
+            if isinstance(element, DB.ElementType):
+                sized(element)
+            else:
+                element._schema = door_schema
+                element._values["CHECK_STATUS"] = ""
+        count = max(1, int(round(self.size * share)))
+        for key, built_in, label, schema in DIMENSION_CATEGORIES:
+            category = DB.Category(built_in, label)
+            type_ids = []
+            for t in range(max(1, count // 100)):
+                element_type = sized(DB.ElementType(document, "{} Type {}".format(label, t), category, None, {
+                    "Type Mark": "T{}".format(t), "Cost": 0.0, "Type Comments": None, "Description": label}))
+                type_ids.append(document._add(element_type).Id)
+            for n in range(count):
+                values = {"Comments": None, "Mark": "{}-{}".format(key[0].upper(), n), "Phase Created": 1,
+                          "Workset": rng.randint(1, 10), "CHECK_STATUS": ""}
+                if key == "generic":
+                    values.update(Width=float(rng.randint(1, 40) * 25), Length=float(rng.randint(10, 200) * 10))
+                elif key == "ceiling":
+                    values["Height Offset From Level"] = rng.choice(CEILING_HEIGHTS)
+                document._add(DB.Element(document, "{} {}".format(label, n), category, schema, values,
+                                         type_ids[n % len(type_ids)]))
+
+
+def build_model(size, seed=0, worksets=10, views=20, other_owned=0.0):
+    """``other_owned`` is the share of panels another user has checked out."""
+    rng = random.Random(seed)
+    document = DB.Document("Synthetic {}".format(size))
+    add = document._add
+
+    for i in range(worksets):
+        document._worksets.append(DB.Workset(DB.WorksetId(i + 1), "WS_{:02d}".format(i), DB.WorksetKind.UserWorkset))
+    add(DB.ViewFamilyType(document, "Floor Plan", DB.ViewFamily.FloorPlan))
+    add(DB.ViewFamilyType(document, "3D View", DB.ViewFamily.ThreeDimensional))
+    add(DB.ParameterElement(document, "CHECK_STATUS"))
+    for i in range(10):
+        add(DB.FillPatternElement(document, "Pattern {}".format(i), solid=(i == 7)))
+
+    view_category = DB.Category(DB.BuiltInCategory.OST_Views, "Views")
+    view_schema = {"View Category": (String, False), "Under-Discipline": (String, False)}
+    active_view = None
+    for i in range(views):
+        view = add(DB.View(document, "Level {} Plan".format(i), view_category, view_schema,
+                           {"View Category": "00_Example" if i % 5 == 0 else "Working", "Under-Discipline": ""}))
+        active_view = active_view or view
+
+    for key, built_in, label, share in CATEGORIES:
+        category = DB.Category(built_in, label)
+        count = int(round(size * share))
+        type_ids = []
+        for t in range(max(1, count // 100)):
+            element_type = add(DB.ElementType(document, "{} Type {}".format(label, t), category, SCHEMAS["type"], {
+                "Type Mark": "T{}".format(t), "Cost": float(rng.randint(10, 500)), "Type Comments": None,
+                "Description": "{} type".format(label)}))
+            type_ids.append(element_type.Id)
+        schema = SCHEMAS[key]
+        for n in range(count):
+            values = {"Comments": None, "Mark": "{}-{}".format(key[0].upper(), n), "Phase Created": 1,
+                      "Workset": rng.randint(1, worksets)}
+            if key == "panel":
+                height = rng.choice(PANEL_HEIGHTS)
+                width = rng.choice(PANEL_WIDTHS)
+                values.update({"Height": height, "Width": width, "Area": height * width / 1e6, "CHECK_STATUS": ""})
+            elif key == "wall":
+                values.update({"Length": float(rng.randint(500, 12000)), "Volume": rng.random() * 10,
+                               "Unconnected Height": 3000.0})
+            else:
+                values.update({"Head Height": 2100.0, "Frame Type": "F{}".format(n % 4)})
+            add(DB.Element(document, "{} {}".format(label, n), category, schema, values, type_ids[n % len(type_ids)]))
+    model = Model(document, active_view, size)
+    if other_owned:
+        model.lend_panels(other_owned, seed=seed + 1)
+    return model